@@ -0,0 +1,69 @@
+"""Benchmark cold import + load of the LUNOS coding catalog.
+
+Compares the precompiled JSON artifact against parsing the YAML source. Each
+sample runs in a fresh interpreter so module imports (json vs. PyYAML) are
+included in the measured time.
+
+    python benchmarks/bench_catalog_load.py [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = Path(__file__).parent.parent
+
+# the integration package imports no Home Assistant modules at import time
+SNIPPET = """
+import time
+start = time.perf_counter()
+from custom_components.lunos import catalog
+codings = {loader}
+assert codings, 'catalog did not load'
+print(time.perf_counter() - start)
+"""
+
+LOADERS = {
+    'compiled json': 'catalog.load_compiled_codings()',
+    'yaml': 'catalog.normalize_codings(catalog.load_yaml_codings())',
+}
+
+
+def sample(loader: str) -> float:
+    """Run one cold-start sample in a fresh interpreter and return seconds."""
+    code = SNIPPET.format(loader=loader)
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True,
+        check=True,
+        cwd=REPO_DIR,
+        text=True,
+    )
+    return float(result.stdout.strip())
+
+
+def main() -> None:
+    """Run the benchmark and print median/min timings per path."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    results = {}
+    for name, loader in LOADERS.items():
+        timings = [sample(loader) for _ in range(args.runs)]
+        results[name] = statistics.median(timings)
+        print(
+            f'{name:>14}: median {results[name] * 1000:7.2f} ms  '
+            f'min {min(timings) * 1000:7.2f} ms  ({args.runs} runs)'
+        )
+
+    speedup = results['yaml'] / results['compiled json']
+    print(f'compiled catalog is {speedup:.1f}x faster than parsing YAML')
+
+
+if __name__ == '__main__':
+    main()
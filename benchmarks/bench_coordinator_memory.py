@@ -0,0 +1,130 @@
+"""Benchmark the memory held and allocated by the coordinator's relay-derived state.
+
+Compares the previous LunosData layout (a regular dataclass rebuilt on every
+relay update, carrying the per-entry static data: model config, relay state
+map, fan speeds and a freshly copied vent mode list) against the slotted state
+updated in place, whose static data stays in the shared compiled profile.
+
+For N simulated entries of the same coding it reports the bytes retained per
+entry and the bytes allocated per relay update, both measured with tracemalloc:
+
+    python benchmarks/bench_coordinator_memory.py [--entries N] [--updates N]
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.lunos.catalog import load_compiled_codings  # noqa: E402
+from custom_components.lunos.coordinator import LunosData  # noqa: E402
+from custom_components.lunos.profile import compile_profile  # noqa: E402
+
+CODING = 'e2-usa'
+RELAY_STATES = (('off', 'off'), ('on', 'off'), ('off', 'on'), ('on', 'on'))
+
+
+@dataclass
+class LegacyLunosData:
+    """The previous coordinator data layout, rebuilt on every relay update."""
+
+    current_speed: str | None = None
+    w1_state: str | None = None
+    w2_state: str | None = None
+    model_config: dict[str, Any] = field(default_factory=dict)
+    relay_state_map: dict[str, Any] = field(default_factory=dict)
+    fan_speeds: list[str] = field(default_factory=list)
+    vent_modes: list[str] = field(default_factory=list)
+
+
+class LegacyEntry:
+    """Per-entry state as the previous coordinator held it."""
+
+    __slots__ = ('data', 'fan_speeds', 'model_config', 'profile', 'relay_state_map')
+
+    def __init__(self, model_config: dict[str, Any]) -> None:
+        self.profile = compile_profile(CODING, model_config)
+        self.model_config = model_config
+        self.relay_state_map = self.profile.relay_states
+        self.fan_speeds = list(self.profile.fan_speeds)
+        self.data = self.update('off', 'off')
+
+    def update(self, w1_state: str, w2_state: str) -> LegacyLunosData:
+        self.data = LegacyLunosData(
+            current_speed=self.profile.speed_for_relays(w1_state, w2_state),
+            w1_state=w1_state,
+            w2_state=w2_state,
+            model_config=self.model_config,
+            relay_state_map=self.relay_state_map,
+            fan_speeds=self.fan_speeds,
+            vent_modes=list(self.profile.vent_modes),
+        )
+        return self.data
+
+
+class SlottedEntry:
+    """Per-entry state as the coordinator holds it now."""
+
+    __slots__ = ('data', 'profile')
+
+    def __init__(self, model_config: dict[str, Any]) -> None:
+        self.profile = compile_profile(CODING, model_config)
+        self.data = LunosData()
+        self.update('off', 'off')
+
+    def update(self, w1_state: str, w2_state: str) -> LunosData:
+        state = self.data
+        state.current_speed = self.profile.speed_for_relays(w1_state, w2_state)
+        state.w1_state = w1_state
+        state.w2_state = w2_state
+        state.updated = time.time()
+        return state
+
+
+def measure(entry_type: type, model_config: dict[str, Any], entries: int, updates: int) -> None:
+    """Print the retained bytes per entry and the bytes allocated per update."""
+    # compile (and cache) the shared profile outside the measurement
+    compile_profile(CODING, model_config)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    simulated = [entry_type(model_config) for _ in range(entries)]
+    retained = tracemalloc.take_snapshot().compare_to(before, 'filename')
+    retained_bytes = sum(stat.size_diff for stat in retained)
+
+    # the replaced data is freed right away, so sample the peak around each update
+    allocated = 0
+    for index in range(updates):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        simulated[index % entries].update(*RELAY_STATES[index % len(RELAY_STATES)])
+        allocated += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    print(
+        f'{entry_type.__name__:>12}: {retained_bytes / entries:7.1f} B retained per entry  '
+        f'{allocated / updates:7.1f} B allocated per update'
+    )
+
+
+def main() -> None:
+    """Run the benchmark for both layouts."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=500)
+    parser.add_argument('--updates', type=int, default=5000)
+    args = parser.parse_args()
+
+    model_config = load_compiled_codings()[CODING]
+    measure(LegacyEntry, model_config, args.entries, args.updates)
+    measure(SlottedEntry, model_config, args.entries, args.updates)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark the state attribute bytes the recorder stores per fan speed change.
+
+Cycles a LUNOS fan (e2-usa coding, relays echoing each command) through its
+speeds and encodes every fan state change the way the recorder writes it to the
+state attributes table, with and without the integration's unrecorded static
+attributes (the 'before' column only excludes what the fan component does).
+
+Runs under pytest for the Home Assistant test fixtures:
+
+    python -m pytest benchmarks/bench_recorder_attributes.py -s -q -p no:cacheprovider
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import os
+import statistics
+from unittest.mock import patch
+
+from homeassistant.components.fan import FanEntity
+from homeassistant.components.recorder.db_schema import StateAttributes
+from homeassistant.const import EVENT_STATE_CHANGED, SERVICE_TURN_OFF, SERVICE_TURN_ON
+from homeassistant.core import Event, HomeAssistant, ServiceCall, State
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.lunos.const import (
+    CONF_CONTROLLER_CODING,
+    CONF_FAN_COUNT,
+    CONF_RELAY_W1,
+    CONF_RELAY_W2,
+    DOMAIN,
+)
+
+TRANSITIONS = int(os.environ.get('BENCH_TRANSITIONS', '40'))
+
+# off, low, medium, high
+PERCENTAGES = (0, 33, 66, 100)
+
+
+def _recorded_bytes(event: Event, unrecorded: frozenset[str] | None = None) -> int:
+    """Return the size of the attributes the recorder stores for a state change."""
+    if unrecorded is not None:
+        state = event.data['new_state']
+        state_info = {**state.state_info, 'unrecorded_attributes': unrecorded}
+        new_state = State(state.entity_id, state.state, state.attributes, state_info=state_info)
+        event = Event(event.event_type, {**event.data, 'new_state': new_state})
+    return len(StateAttributes.shared_attrs_bytes_from_event(event, None))
+
+
+@pytest.mark.usefixtures('enable_custom_integrations')
+async def test_bench_recorder_attributes(hass: HomeAssistant) -> None:
+    """Compare the recorded attribute bytes per transition before and after."""
+    hass.states.async_set('switch.bench_w1', 'off')
+    hass.states.async_set('switch.bench_w2', 'on')
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title='bench',
+        unique_id='switch.bench_w1_switch.bench_w2',
+        data={
+            'name': 'bench',
+            CONF_RELAY_W1: 'switch.bench_w1',
+            CONF_RELAY_W2: 'switch.bench_w2',
+            CONF_CONTROLLER_CODING: 'e2-usa',
+            CONF_FAN_COUNT: 2,
+        },
+    )
+    entry.add_to_hass(hass)
+
+    async def _async_switch(call: ServiceCall) -> None:
+        state = 'on' if call.service == SERVICE_TURN_ON else 'off'
+        hass.loop.call_soon(hass.states.async_set, call.data['entity_id'], state)
+
+    hass.services.async_register('switch', SERVICE_TURN_ON, _async_switch)
+    hass.services.async_register('switch', SERVICE_TURN_OFF, _async_switch)
+
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    entity_id = er.async_get(hass).async_get_entity_id('fan', DOMAIN, entry.unique_id)
+
+    # the controller's toggle detection window only adds wall-clock time here
+    shadow = entry.runtime_data.coordinator.controller_shadow
+    changes = async_capture_events(hass, EVENT_STATE_CHANGED)
+    with patch.object(shadow, 'delay_before', return_value=0):
+        for index in range(TRANSITIONS):
+            await hass.services.async_call(
+                'fan',
+                'set_percentage',
+                {'entity_id': entity_id, 'percentage': PERCENTAGES[index % len(PERCENTAGES)]},
+                blocking=True,
+            )
+            await hass.async_block_till_done()
+            async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+            await hass.async_block_till_done()
+
+    fan_changes = [event for event in changes if event.data['entity_id'] == entity_id]
+    component_only = FanEntity._entity_component_unrecorded_attributes
+    before = statistics.mean(_recorded_bytes(event, component_only) for event in fan_changes)
+    after = statistics.mean(_recorded_bytes(event) for event in fan_changes)
+    print(
+        f'recorded attributes: {before:.0f} B -> {after:.0f} B per state change '
+        f'({len(fan_changes)} state changes over {TRANSITIONS} transitions)'
+    )
@@ -0,0 +1,94 @@
+"""Benchmark confirmed relay writes: entity service path vs. direct MQTT transport.
+
+Both paths run against the in-process broker stand-in from tests/mqtt_broker.py
+with a relay that echoes each command immediately, so the numbers are the
+integration + Home Assistant overhead per confirmed write:
+
+- entity: switch.turn_on service -> (MQTT switch stand-in) publish -> state topic
+  -> entity state written -> state_changed event awaited by the writer
+- mqtt: publish to the command topic -> echo taken straight from the state topic
+
+Runs under pytest for the Home Assistant test fixtures:
+
+    python -m pytest benchmarks/bench_relay_transport.py -s -q -p no:cacheprovider
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import time
+
+from homeassistant.components.mqtt import ReceiveMessage
+from homeassistant.const import SERVICE_TURN_OFF, SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, ServiceCall
+
+from custom_components.lunos.mqtt_relay import (
+    COMMAND_PAYLOADS,
+    MqttRelayTopics,
+    MqttRelayWriter,
+    parse_state_payload,
+)
+from custom_components.lunos.relay import RelayWriter
+from tests.mqtt_broker import LocalBroker
+
+WRITES = int(os.environ.get('BENCH_WRITES', '500'))
+
+RELAY = 'switch.lunos_w1'
+TOPICS = MqttRelayTopics('cmnd/lunos/POWER1', 'stat/lunos/POWER1')
+
+
+async def _async_add_mqtt_switch(hass: HomeAssistant, broker: LocalBroker) -> None:
+    """Stand in for an MQTT switch entity: services publish, the state topic sets the state."""
+
+    async def _async_command(call: ServiceCall) -> None:
+        await broker.async_publish(hass, TOPICS.command_topic, COMMAND_PAYLOADS[call.service])
+
+    def _state_received(msg: ReceiveMessage) -> None:
+        hass.states.async_set(RELAY, parse_state_payload(msg.payload) or STATE_OFF)
+
+    hass.services.async_register('switch', SERVICE_TURN_ON, _async_command)
+    hass.services.async_register('switch', SERVICE_TURN_OFF, _async_command)
+    await broker.async_subscribe(hass, TOPICS.state_topic, _state_received)
+    hass.states.async_set(RELAY, STATE_OFF)
+
+
+async def _measure(writer: RelayWriter) -> list[float]:
+    """Return the seconds taken by each of WRITES alternating confirmed writes."""
+    timings = []
+    for index in range(WRITES):
+        method, state = (
+            (SERVICE_TURN_ON, STATE_ON) if index % 2 == 0 else (SERVICE_TURN_OFF, STATE_OFF)
+        )
+        start = time.perf_counter()
+        await writer.async_write('switch', method, RELAY, state)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(name: str, timings: list[float]) -> float:
+    """Print median/p90 of the timings and return the median."""
+    median = statistics.median(timings)
+    p90 = statistics.quantiles(timings, n=10)[-1]
+    print(
+        f'{name:>7}: median {median * 1e6:8.1f} µs  p90 {p90 * 1e6:8.1f} µs  '
+        f'({len(timings)} writes)'
+    )
+    return median
+
+
+async def test_bench_relay_transport(hass: HomeAssistant) -> None:
+    """Compare the per-write overhead of the entity service path and direct MQTT."""
+    broker = LocalBroker(hass)
+    broker.add_relay(TOPICS.command_topic, TOPICS.state_topic)
+    await _async_add_mqtt_switch(hass, broker)
+
+    with broker.patch_mqtt():
+        entity = _report('entity', await _measure(RelayWriter(hass, 'bench')))
+
+        writer = MqttRelayWriter(hass, 'bench', {RELAY: TOPICS})
+        await writer.async_setup()
+        mqtt = _report('mqtt', await _measure(writer))
+        writer.async_shutdown()
+
+    print(f'direct MQTT writes are {entity / mqtt:.1f}x faster than the entity service path')
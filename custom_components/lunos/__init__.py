@@ -1,28 +1,30 @@
 """LUNOS Heat Recovery Ventilation Fan Control for Home Assistant.
 
 https://github.com/rsnodgrass/hass-lunos
+
+Home Assistant is only imported inside the setup functions, so the offline
+catalog CLI (python -m custom_components.lunos.catalog) runs without it.
 """
 
 from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any
-
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.typing import ConfigType
+from typing import TYPE_CHECKING, Any, Final
 
-from .const import DOMAIN
-from .helpers import load_lunos_codings
+from .const import CONF_UNI_CODE, DOMAIN, SERVICE_RELOAD_CODINGS, SIGNAL_CODINGS_UPDATED
 
 if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+    from homeassistant.helpers.typing import ConfigType
+
+    from .controller import ControllerSettings
     from .coordinator import LunosCoordinator
 
 LOG = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.FAN]
+PLATFORMS: Final[list[str]] = ['fan']  # Platform.FAN
 
 
 @dataclass
@@ -31,6 +33,7 @@ class LunosRuntimeData:
 
     coordinator: LunosCoordinator
     coding_config: dict[str, Any]
+    controller: ControllerSettings | None = None
 
 
 type LunosConfigEntry = ConfigEntry[LunosRuntimeData]
@@ -38,6 +41,19 @@ type LunosConfigEntry = ConfigEntry[LunosRuntimeData]
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up LUNOS from YAML configuration (deprecated)."""
+    from homeassistant.core import SupportsResponse
+
+    async def _async_reload_codings(call: ServiceCall) -> ServiceResponse:
+        """Handle the reload_codings service call."""
+        return await async_reload_codings(call.hass)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RELOAD_CODINGS,
+        _async_reload_codings,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
     # YAML configuration is deprecated, but we still support import
     if DOMAIN in config:
         LOG.warning(
@@ -58,12 +74,20 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
 async def async_setup_entry(hass: HomeAssistant, entry: LunosConfigEntry) -> bool:
     """Set up LUNOS from a config entry."""
+    from .controller import dip_states_from_config
     from .coordinator import LunosCoordinator
+    from .helpers import async_get_controller_index, async_get_lunos_codings
 
-    # load coding configurations
-    coding_config = await hass.async_add_executor_job(load_lunos_codings)
+    # load coding configurations (shared by all entries and flows)
+    coding_config = await async_get_lunos_codings(hass)
     LOG.info('LUNOS controller codings supported: %s', list(coding_config.keys()))
 
+    # resolve the physical 5/UNI coding and DIP switches, if the installer entered them
+    controller_index = await async_get_controller_index(hass)
+    controller = controller_index.resolve(
+        entry.data.get(CONF_UNI_CODE), dip_states_from_config(entry.data)
+    )
+
     # create coordinator
     coordinator = LunosCoordinator(hass, entry, coding_config)
     await coordinator.async_config_entry_first_refresh()
@@ -72,6 +96,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: LunosConfigEntry) -> boo
     entry.runtime_data = LunosRuntimeData(
         coordinator=coordinator,
         coding_config=coding_config,
+        controller=controller,
     )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -82,3 +107,60 @@ async def async_setup_entry(hass: HomeAssistant, entry: LunosConfigEntry) -> boo
 async def async_unload_entry(hass: HomeAssistant, entry: LunosConfigEntry) -> bool:
     """Unload a config entry."""
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: LunosConfigEntry) -> None:
+    """Delete the stored relay latencies of a removed config entry."""
+    from .latency import RelayLatency
+
+    await RelayLatency(hass, entry.entry_id).async_remove()
+
+
+async def async_reload_codings(hass: HomeAssistant) -> dict[str, Any]:
+    """Reload the coding catalog and apply it only to entries whose coding changed.
+
+    Affected entries get their new profile pushed into the existing coordinator
+    and fan entity; nothing is torn down and the relays are not re-subscribed.
+    Entries are compared against the profile they are running, since the shared
+    catalog cache may already have picked up the edited files (e.g. when a config
+    flow was opened after the edit).
+    """
+    from homeassistant.config_entries import ConfigEntryState
+    from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+    from . import catalog
+    from .controller import dip_states_from_config
+    from .helpers import DATA_CODING_CACHE, async_get_controller_index, async_get_lunos_codings
+
+    cache = hass.data.get(DATA_CODING_CACHE)
+    old_codings = cache.codings if cache is not None else None
+    old_codings = old_codings or {}
+
+    coding_config = await async_get_lunos_codings(hass, force=True)
+    controller_index = await async_get_controller_index(hass)
+    changed = catalog.diff_codings(old_codings, coding_config)
+
+    updated: list[str] = []
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.state is not ConfigEntryState.LOADED:
+            continue
+
+        runtime_data: LunosRuntimeData = entry.runtime_data
+        runtime_data.coding_config = coding_config
+        controller = controller_index.resolve(
+            entry.data.get(CONF_UNI_CODE), dip_states_from_config(entry.data)
+        )
+
+        coordinator = runtime_data.coordinator
+        profile_changed = coordinator.apply_coding_config(coding_config)
+        if profile_changed:
+            changed.add(coordinator.controller_coding)
+        elif controller == runtime_data.controller:
+            continue
+
+        runtime_data.controller = controller
+        async_dispatcher_send(hass, SIGNAL_CODINGS_UPDATED.format(entry.entry_id))
+        updated.append(entry.entry_id)
+
+    LOG.info('Reloaded LUNOS codings: changed=%s, updated entries=%s', sorted(changed), updated)
+    return {'changed_codings': sorted(changed), 'updated_entries': updated}
@@ -0,0 +1,543 @@
+"""Bundled LUNOS coding catalog: YAML source and precompiled JSON artifact.
+
+The integration ships lunos-codings.yaml (model codings) and lunos-40269.yaml
+(5/UNI-FR controller DIP switches and codes) as the human-edited sources of
+truth, and lunos-codings.json as a validated, normalized snapshot of both. Loading the
+snapshot only needs the standard library; the YAML file is parsed (and PyYAML
+imported) only when the snapshot is missing or its recorded source hash is stale.
+
+This module intentionally has no Home Assistant imports so it can be used
+offline (e.g. in CI) to validate, compile and query the catalog:
+
+    python -m custom_components.lunos.catalog validate [--strict]
+    python -m custom_components.lunos.catalog compile [--check]
+    python -m custom_components.lunos.catalog query --feature supports_summer_vent --min-cmh high=38
+"""
+
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import hashlib
+import json
+from pathlib import Path
+import sys
+from typing import Any, Final
+
+from .const import CFM_TO_CMH, CODINGS_PATH, COMPILED_CODINGS_PATH, CONTROLLERS_PATH
+
+LOG = logging.getLogger(__name__)
+
+CATALOG_SCHEMA_VERSION = 2
+
+NUMBER: Final = (int, float)
+
+# speeds that may appear in a coding's behavior or speeds list
+CATALOG_SPEEDS: Final = ('off', 'silent', 'low', 'medium', 'high', 'turbo')
+
+# strict schema: every key a coding may contain and its allowed value types
+CODING_SCHEMA: Final[dict[str, type | tuple[type, ...]]] = {
+    'name': str,
+    'description': str,
+    'model_number': str,
+    'controller_coding': (int, str),
+    'default_fan_count': int,
+    'cycle_seconds': int,
+    'summer_vent_cycle_seconds': int,
+    'four_speed': bool,
+    'supports_off': bool,
+    'supports_summer_vent': bool,
+    'supports_exhaust_only': bool,
+    'supports_filter_reminder': bool,
+    'supports_turbo_mode': bool,
+    'heat_recovery_efficiency': NUMBER,
+    'peak_efficiency': NUMBER,
+    'max_cmh': NUMBER,
+    'max_watts': NUMBER,
+    'specific_power_consumption': NUMBER,
+    'humidity_recovery_min': NUMBER,
+    'humidity_recovery_max': NUMBER,
+    'speeds': list,
+    'behavior': dict,
+}
+REQUIRED_CODING_KEYS: Final = ('name',)
+
+BEHAVIOR_SCHEMA: Final[dict[str, type | tuple[type, ...]]] = {
+    'cfm': NUMBER,
+    'cmh': NUMBER,
+    'decibel': NUMBER,
+    'watts': NUMBER,
+    'supports_exhaust_only': bool,
+}
+
+# legacy/misspelled keys and their canonical replacement
+CODING_ALIASES: Final[dict[str, str]] = {'power_consumption': 'max_watts'}
+BEHAVIOR_ALIASES: Final[dict[str, str]] = {
+    'chm': 'cmh',
+    'cmg': 'cmh',
+    'db': 'decibel',
+    'dB': 'decibel',
+}
+
+# airflow given in both units may differ by this much before being reported
+AIRFLOW_TOLERANCE: Final = 0.15
+
+
+@dataclass
+class ValidationResult:
+    """Problems found while validating a coding catalog."""
+
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Return True if no errors were found."""
+        return not self.errors
+
+
+def source_hash(path: Path) -> str:
+    """Return the sha256 hex digest of a catalog source file."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_yaml_codings(path: Path = CODINGS_PATH) -> dict[str, Any]:
+    """Parse the codings YAML source (slow path, imports PyYAML on demand)."""
+    import yaml
+
+    with path.open() as file:
+        return yaml.safe_load(file) or {}
+
+
+def load_compiled_catalog(path: Path = COMPILED_CODINGS_PATH) -> dict[str, Any] | None:
+    """Load the compiled artifact, or None if it is missing or has another schema.
+
+    The artifact holds both the codings and the controller tables; check each
+    part against its source with compiled_codings()/compiled_controllers().
+    """
+    try:
+        artifact: dict[str, Any] = json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        LOG.debug('No usable compiled LUNOS catalog at %s', path)
+        return None
+
+    if artifact.get('schema_version') != CATALOG_SCHEMA_VERSION:
+        LOG.info('Compiled LUNOS catalog %s has an unsupported schema; ignoring', path)
+        return None
+    return artifact
+
+
+def _fresh_section(artifact: dict[str, Any], source: Path, key: str) -> dict[str, Any] | None:
+    """Return a section of the artifact if it is current for its source file."""
+    section: dict[str, Any] = artifact.get(key, {})
+    try:
+        expected = source_hash(source)
+    except OSError:
+        # source not shipped; trust the artifact
+        return section
+
+    if artifact.get('sources', {}).get(source.name) != expected:
+        LOG.info('Compiled LUNOS catalog is stale versus %s', source.name)
+        return None
+    return section
+
+
+def compiled_codings(
+    artifact: dict[str, Any], source: Path = CODINGS_PATH
+) -> dict[str, Any] | None:
+    """Return the codings of a loaded artifact, or None if stale versus the source."""
+    return _fresh_section(artifact, source, 'codings')
+
+
+def compiled_controllers(
+    artifact: dict[str, Any], source: Path = CONTROLLERS_PATH
+) -> dict[str, Any] | None:
+    """Return the controller tables of a loaded artifact, or None if stale."""
+    return _fresh_section(artifact, source, 'controllers')
+
+
+def load_compiled_codings(
+    path: Path = COMPILED_CODINGS_PATH,
+    source: Path = CODINGS_PATH,
+) -> dict[str, Any] | None:
+    """Load the precompiled codings, or None if missing or stale versus the source."""
+    artifact = load_compiled_catalog(path)
+    if artifact is None:
+        return None
+    return compiled_codings(artifact, source)
+
+
+def load_compiled_controllers(
+    path: Path = COMPILED_CODINGS_PATH,
+    source: Path = CONTROLLERS_PATH,
+) -> dict[str, Any] | None:
+    """Load the precompiled controller tables, or None if missing or stale."""
+    artifact = load_compiled_catalog(path)
+    if artifact is None:
+        return None
+    return compiled_controllers(artifact, source)
+
+
+def _type_name(expected: type | tuple[type, ...]) -> str:
+    """Return a readable name for an expected type (or tuple of types)."""
+    if isinstance(expected, tuple):
+        return ' or '.join(t.__name__ for t in expected)
+    return expected.__name__
+
+
+def _check_type(value: Any, expected: type | tuple[type, ...]) -> bool:
+    """Return True if value matches the expected type (bools are not numbers)."""
+    if isinstance(value, bool) and expected is not bool:
+        return False
+    return isinstance(value, expected)
+
+
+def _validate_behavior(coding: str, speed: str, behavior: Any, result: ValidationResult) -> None:
+    """Validate the behavior of one speed of a coding."""
+    where = f'{coding}.behavior.{speed}'
+    if speed not in CATALOG_SPEEDS:
+        result.errors.append(f'{where}: unknown speed (expected one of {CATALOG_SPEEDS})')
+    if not isinstance(behavior, dict):
+        result.errors.append(f'{where}: expected a mapping, got {type(behavior).__name__}')
+        return
+
+    for key, value in behavior.items():
+        canonical = BEHAVIOR_ALIASES.get(key) or key
+        if canonical != key:
+            result.warnings.append(f'{where}: "{key}" is deprecated, use "{canonical}"')
+        expected = BEHAVIOR_SCHEMA.get(canonical)
+        if expected is None:
+            result.errors.append(f'{where}: unknown key "{key}"')
+        elif not _check_type(value, expected):
+            result.errors.append(f'{where}.{key}: expected {_type_name(expected)}, got {value!r}')
+
+    cfm = behavior.get('cfm')
+    cmh = next((behavior[k] for k in ('cmh', 'chm', 'cmg') if k in behavior), None)
+    if cfm is None and cmh is None:
+        result.warnings.append(f'{where}: no airflow (cfm or cmh) specified')
+    elif cfm is not None and cmh and _check_type(cfm, NUMBER) and _check_type(cmh, NUMBER):
+        converted = cfm * CFM_TO_CMH
+        if abs(converted - cmh) / cmh > AIRFLOW_TOLERANCE:
+            result.warnings.append(
+                f'{where}: cfm={cfm} ({converted:.1f} cmh) disagrees with cmh={cmh}'
+            )
+
+
+def validate_codings(codings: Any) -> ValidationResult:
+    """Validate a coding catalog against the strict schema."""
+    result = ValidationResult()
+    if not isinstance(codings, dict):
+        result.errors.append(f'catalog: expected a mapping, got {type(codings).__name__}')
+        return result
+
+    for coding, config in codings.items():
+        if not isinstance(config, dict):
+            result.errors.append(f'{coding}: expected a mapping, got {type(config).__name__}')
+            continue
+
+        for key in REQUIRED_CODING_KEYS:
+            if key not in config:
+                result.errors.append(f'{coding}: missing required key "{key}"')
+
+        for key, value in config.items():
+            if key == 'high_supports_exhaust_only':
+                result.warnings.append(
+                    f'{coding}: "{key}" is deprecated, use "supports_exhaust_only" in behavior.high'
+                )
+                continue
+            canonical = CODING_ALIASES.get(key) or key
+            if canonical != key:
+                result.warnings.append(f'{coding}: "{key}" is deprecated, use "{canonical}"')
+            expected = CODING_SCHEMA.get(canonical)
+            if expected is None:
+                result.errors.append(f'{coding}: unknown key "{key}"')
+            elif not _check_type(value, expected):
+                result.errors.append(
+                    f'{coding}.{key}: expected {_type_name(expected)}, got {value!r}'
+                )
+
+        behaviors = config.get('behavior')
+        if behaviors is None:
+            result.warnings.append(f'{coding}: no behavior; airflow will not be reported')
+        elif isinstance(behaviors, dict):
+            for speed, behavior in behaviors.items():
+                _validate_behavior(coding, speed, behavior, result)
+
+        speeds = config.get('speeds')
+        if isinstance(speeds, list):
+            for speed in speeds:
+                if speed not in CATALOG_SPEEDS:
+                    result.errors.append(f'{coding}.speeds: unknown speed "{speed}"')
+                elif isinstance(behaviors, dict) and speed not in behaviors:
+                    result.warnings.append(f'{coding}.speeds: "{speed}" has no behavior')
+
+    return result
+
+
+def normalize_coding(config: dict[str, Any]) -> dict[str, Any]:
+    """Return a copy of a coding with legacy/misspelled keys made canonical."""
+    normalized: dict[str, Any] = {}
+    for key, value in config.items():
+        if key in ('behavior', 'high_supports_exhaust_only'):
+            continue
+        normalized[CODING_ALIASES.get(key, key)] = value
+
+    behaviors = config.get('behavior')
+    if isinstance(behaviors, dict):
+        normalized['behavior'] = {
+            speed: {BEHAVIOR_ALIASES.get(key, key): value for key, value in behavior.items()}
+            if isinstance(behavior, dict)
+            else behavior
+            for speed, behavior in behaviors.items()
+        }
+
+    if config.get('high_supports_exhaust_only'):
+        high = normalized.setdefault('behavior', {}).setdefault('high', {})
+        high['supports_exhaust_only'] = True
+
+    return normalized
+
+
+def normalize_codings(codings: dict[str, Any]) -> dict[str, Any]:
+    """Return a copy of the catalog with every coding normalized."""
+    return {
+        coding: normalize_coding(config) if isinstance(config, dict) else config
+        for coding, config in codings.items()
+    }
+
+
+def _deep_merge(base: dict[str, Any], overlay: dict[str, Any]) -> dict[str, Any]:
+    """Return base with overlay merged over it (nested mappings are merged, not replaced)."""
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def merge_codings(codings: dict[str, Any], overlay: dict[str, Any]) -> dict[str, Any]:
+    """Return the catalog with a (normalized) user overlay deep-merged per coding key.
+
+    Codings only present in the overlay are added; for codings in both, the
+    overlay's keys (and individual speed behaviors) replace the built-in ones.
+    """
+    merged = dict(codings)
+    for coding, config in overlay.items():
+        base = merged.get(coding)
+        if isinstance(base, dict) and isinstance(config, dict):
+            merged[coding] = _deep_merge(base, config)
+        else:
+            merged[coding] = config
+    return merged
+
+
+def diff_codings(old: dict[str, Any], new: dict[str, Any]) -> set[str]:
+    """Return the coding keys that were added, removed or changed between two catalogs."""
+    return {coding for coding in old.keys() | new.keys() if old.get(coding) != new.get(coding)}
+
+
+def _switch_state(state: Any) -> str:
+    """Return a DIP switch state as '+', '0' or '-' (YAML parses 0 as an int)."""
+    return str(state)
+
+
+def normalize_controllers(data: dict[str, Any]) -> dict[str, Any]:
+    """Normalize the 5/UNI controller tables into string-keyed JSON friendly data.
+
+    The YAML source mixes int and str keys (codes 0-9 and A-E, switch state 0
+    next to '+'/'-') and uses both 'type' and 'fan' for the fan of a code.
+    """
+    controllers: dict[str, Any] = {}
+    for controller in data.get('lunos') or []:
+        codes = {}
+        for code, config in (controller.get('codes') or {}).items():
+            codes[str(code)] = {
+                'fan': config.get('fan', config.get('type')),
+                'program': config.get('program'),
+                'cfm': list(config.get('cfm') or []),
+                'paired': config.get('paired', True),
+            }
+        controllers[str(controller['number'])] = {
+            'type': controller.get('type'),
+            'dip': {
+                str(position): {_switch_state(state): meaning for state, meaning in states.items()}
+                for position, states in (controller.get('dip') or {}).items()
+            },
+            'codes': codes,
+        }
+    return controllers
+
+
+def build_compiled_catalog(
+    source: Path = CODINGS_PATH,
+    controllers_source: Path = CONTROLLERS_PATH,
+) -> dict[str, Any]:
+    """Build the compiled catalog artifact from the YAML sources."""
+    return {
+        'schema_version': CATALOG_SCHEMA_VERSION,
+        'sources': {
+            source.name: source_hash(source),
+            controllers_source.name: source_hash(controllers_source),
+        },
+        'codings': normalize_codings(load_yaml_codings(source)),
+        'controllers': normalize_controllers(load_yaml_codings(controllers_source)),
+    }
+
+
+def write_compiled_catalog(
+    path: Path = COMPILED_CODINGS_PATH,
+    source: Path = CODINGS_PATH,
+    controllers_source: Path = CONTROLLERS_PATH,
+) -> dict[str, Any]:
+    """Regenerate the compiled catalog artifact next to the YAML sources."""
+    artifact = build_compiled_catalog(source, controllers_source)
+    path.write_text(json.dumps(artifact, separators=(',', ':'), ensure_ascii=False) + '\n')
+    return artifact
+
+
+def _cmh(behavior: dict[str, Any]) -> float | None:
+    """Return the airflow of a normalized behavior in cubic meters/hour."""
+    if behavior.get('cmh') is not None:
+        return float(behavior['cmh'])
+    if behavior.get('cfm') is not None:
+        return float(behavior['cfm']) * CFM_TO_CMH
+    return None
+
+
+class CatalogIndex:
+    """In-memory index answering feature and airflow queries over a catalog."""
+
+    def __init__(self, codings: dict[str, Any]) -> None:
+        """Index normalized codings by boolean feature and per-speed airflow."""
+        features: dict[str, set[str]] = {}
+        airflow: dict[str, list[tuple[float, str]]] = {}
+
+        for coding, config in codings.items():
+            for key, value in config.items():
+                if value is True:
+                    features.setdefault(key, set()).add(coding)
+            for speed, behavior in (config.get('behavior') or {}).items():
+                cmh = _cmh(behavior)
+                if cmh is not None:
+                    airflow.setdefault(speed, []).append((cmh, coding))
+
+        self.codings = codings
+        self.features = {key: frozenset(value) for key, value in features.items()}
+        self.airflow = {speed: sorted(entries) for speed, entries in airflow.items()}
+
+    def with_feature(self, feature: str) -> frozenset[str]:
+        """Return the codings that have a boolean feature enabled."""
+        return self.features.get(feature, frozenset())
+
+    def with_min_cmh(self, speed: str, min_cmh: float) -> frozenset[str]:
+        """Return the codings delivering at least min_cmh at a speed."""
+        entries = self.airflow.get(speed, [])
+        start = bisect_left(entries, (min_cmh, ''))
+        return frozenset(coding for _, coding in entries[start:])
+
+    def query(
+        self,
+        features: tuple[str, ...] = (),
+        min_cmh: dict[str, float] | None = None,
+    ) -> list[str]:
+        """Return the codings matching every feature and minimum airflow."""
+        matches = set(self.codings)
+        for feature in features:
+            matches &= self.with_feature(feature)
+        for speed, value in (min_cmh or {}).items():
+            matches &= self.with_min_cmh(speed, value)
+        return sorted(matches)
+
+
+def _parse_min_cmh(value: str) -> tuple[str, float]:
+    """Parse a SPEED=CMH command line argument."""
+    import argparse
+
+    speed, _, cmh = value.partition('=')
+    try:
+        return speed, float(cmh)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f'expected SPEED=CMH, got {value!r}') from err
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Validate, compile or query the coding catalog from the command line."""
+    import argparse  # CLI only; kept off the integration's import path
+
+    parser = argparse.ArgumentParser(
+        prog='python -m custom_components.lunos.catalog',
+        description='Validate, compile and query the LUNOS coding catalog.',
+    )
+    parser.add_argument('--source', type=Path, default=CODINGS_PATH, help='codings YAML file')
+    parser.add_argument(
+        '--controllers', type=Path, default=CONTROLLERS_PATH, help='5/UNI controller YAML file'
+    )
+    commands = parser.add_subparsers(dest='command')
+
+    validate = commands.add_parser('validate', help='validate the catalog schema')
+    validate.add_argument('--strict', action='store_true', help='treat warnings as errors')
+
+    compile_ = commands.add_parser('compile', help='validate and write the compiled catalog')
+    compile_.add_argument('--output', type=Path, default=COMPILED_CODINGS_PATH)
+    compile_.add_argument(
+        '--check', action='store_true', help='fail if the compiled catalog is out of date'
+    )
+
+    query = commands.add_parser('query', help='list codings matching all criteria')
+    query.add_argument('--feature', action='append', default=[], help='e.g. supports_off')
+    query.add_argument(
+        '--min-cmh',
+        action='append',
+        default=[],
+        type=_parse_min_cmh,
+        metavar='SPEED=CMH',
+        help='minimum airflow at a speed, e.g. high=38',
+    )
+
+    args = parser.parse_args(argv)
+    command = args.command or 'compile'
+
+    codings = load_yaml_codings(args.source)
+    result = validate_codings(codings)
+    for warning in result.warnings:
+        print(f'warning: {warning}', file=sys.stderr)
+    for error in result.errors:
+        print(f'error: {error}', file=sys.stderr)
+
+    if command == 'validate':
+        failed = not result.ok or (args.strict and result.warnings)
+        print(
+            f'{len(codings)} codings, {len(result.errors)} errors, {len(result.warnings)} warnings'
+        )
+        return 1 if failed else 0
+
+    if not result.ok:
+        return 1
+
+    if command == 'query':
+        index = CatalogIndex(normalize_codings(codings))
+        for coding in index.query(tuple(args.feature), dict(args.min_cmh)):
+            print(f'{coding}\t{codings[coding].get("name", coding)}')
+        return 0
+
+    output = getattr(args, 'output', COMPILED_CODINGS_PATH)
+    if getattr(args, 'check', False):
+        controllers = normalize_controllers(load_yaml_codings(args.controllers))
+        if (
+            load_compiled_codings(output, args.source) != normalize_codings(codings)
+            or load_compiled_controllers(output, args.controllers) != controllers
+        ):
+            print(f'{output.name} is out of date; run compile', file=sys.stderr)
+            return 1
+        return 0
+
+    compiled = write_compiled_catalog(output, args.source, args.controllers)
+    print(f'Wrote {len(compiled["codings"])} codings to {output.name}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Per-fan command queue serializing LUNOS relay writes.
+
+The LUNOS controller interprets relay changes by their timing, so writes for
+one controller must never interleave. Every speed change and mode macro for a
+fan goes through a single queue drained by one worker task:
+
+- speed requests are coalesced latest-wins: a request that is still waiting
+  behind the running command is replaced by a newer one (its callers are
+  released once the newer request has been applied)
+- macros (e.g. the W1/W2 toggle sequences) are never coalesced and run to
+  completion before the next command starts
+
+The queue is owned by the entry's coordinator, so queued commands and the
+metrics survive the fan entity being removed and re-added.
+"""
+
+from __future__ import annotations
+
+import logging
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+LOG = logging.getLogger(__name__)
+
+type Command = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class CommandQueueStats:
+    """Counters describing how requests flowed through a command queue."""
+
+    requested: int = 0  # speed requests submitted
+    coalesced: int = 0  # speed requests superseded by a newer one before being applied
+    applied: int = 0  # speed requests actually applied to the relays
+    macros: int = 0  # mode macros run
+    failed: int = 0  # commands that raised
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters as a dict (for diagnostics and attributes)."""
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class _QueuedCommand:
+    """A command waiting in the queue and the callers waiting for it."""
+
+    name: str
+    run: Command
+    coalesce: bool
+    waiters: list[asyncio.Future[None]] = field(default_factory=list)
+
+
+class LunosCommandQueue:
+    """Single worker queue for one LUNOS controller's relay commands."""
+
+    def __init__(self, hass: HomeAssistant, name: str) -> None:
+        """Initialize the queue."""
+        self._hass = hass
+        self._name = name
+        self._commands: deque[_QueuedCommand] = deque()
+        self._worker: asyncio.Task[None] | None = None
+        self._running: str | None = None
+        self.stats = CommandQueueStats()
+
+    @property
+    def pending(self) -> tuple[str, ...]:
+        """Return the names of the commands waiting to run."""
+        return tuple(command.name for command in self._commands)
+
+    @property
+    def running(self) -> str | None:
+        """Return the name of the command being applied, if any."""
+        return self._running
+
+    @property
+    def idle(self) -> bool:
+        """Return True if nothing is queued or running."""
+        return self._worker is None or self._worker.done()
+
+    async def async_request_speed(self, speed: str, run: Command) -> None:
+        """Queue a speed change, replacing a newer-than-running speed request (latest wins)."""
+        self.stats.requested += 1
+        future: asyncio.Future[None] = self._hass.loop.create_future()
+
+        tail = self._commands[-1] if self._commands else None
+        if tail is not None and tail.coalesce:
+            LOG.debug("LUNOS '%s' speed request %s replaces %s", self._name, speed, tail.name)
+            self.stats.coalesced += 1
+            tail.name = speed
+            tail.run = run
+            tail.waiters.append(future)
+        else:
+            self._commands.append(_QueuedCommand(speed, run, coalesce=True, waiters=[future]))
+
+        self._ensure_worker()
+        await future
+
+    async def async_run_macro(self, name: str, run: Command) -> None:
+        """Queue a macro that runs atomically (never coalesced or interleaved)."""
+        self.stats.macros += 1
+        future: asyncio.Future[None] = self._hass.loop.create_future()
+        self._commands.append(_QueuedCommand(name, run, coalesce=False, waiters=[future]))
+        self._ensure_worker()
+        await future
+
+    def _ensure_worker(self) -> None:
+        """Start the worker task if it is not already draining the queue."""
+        # a worker started eagerly may drain the queue and finish before it is assigned
+        if self._worker is None or self._worker.done():
+            self._worker = self._hass.async_create_background_task(
+                self._async_drain(), f'lunos_command_queue_{self._name}'
+            )
+
+    async def _async_drain(self) -> None:
+        """Run queued commands one at a time until the queue is empty."""
+        try:
+            while self._commands:
+                command = self._commands.popleft()
+                self._running = command.name
+                try:
+                    await command.run()
+                except asyncio.CancelledError:
+                    for waiter in command.waiters:
+                        waiter.cancel()
+                    raise
+                except Exception as err:  # reported to every waiting caller
+                    self.stats.failed += 1
+                    LOG.error("LUNOS '%s' command %s failed: %s", self._name, command.name, err)
+                    _resolve(command.waiters, err)
+                else:
+                    if command.coalesce:
+                        self.stats.applied += 1
+                    _resolve(command.waiters)
+                finally:
+                    self._running = None
+        finally:
+            if self._worker is asyncio.current_task():
+                self._worker = None
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return the queue metrics for diagnostics."""
+        return {
+            **self.stats.as_dict(),
+            'pending': list(self.pending),
+            'running': self._running,
+        }
+
+    def async_shutdown(self) -> None:
+        """Cancel the worker and release every waiting caller."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        while self._commands:
+            for waiter in self._commands.popleft().waiters:
+                waiter.cancel()
+
+
+def _resolve(waiters: list[asyncio.Future[None]], err: Exception | None = None) -> None:
+    """Complete the futures of callers waiting on a command."""
+    for waiter in waiters:
+        if waiter.done():
+            continue  # the caller was cancelled
+        if err is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(err)
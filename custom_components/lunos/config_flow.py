@@ -9,16 +9,19 @@ from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.selector import (
+    BooleanSelector,
     EntitySelector,
     EntitySelectorConfig,
     NumberSelector,
     NumberSelectorConfig,
     NumberSelectorMode,
+    SelectOptionDict,
     SelectSelector,
     SelectSelectorConfig,
     SelectSelectorMode,
     TextSelector,
     TextSelectorConfig,
+    TextSelectorType,
 )
 import voluptuous as vol
 
@@ -26,11 +29,23 @@ from .const import (
     CONF_CONTROLLER_CODING,
     CONF_DEFAULT_SPEED,
     CONF_FAN_COUNT,
+    CONF_FILTER_RESET_SCRIPT,
+    CONF_MQTT_W1_COMMAND_TOPIC,
+    CONF_MQTT_W1_STATE_TOPIC,
+    CONF_MQTT_W2_COMMAND_TOPIC,
+    CONF_MQTT_W2_STATE_TOPIC,
+    CONF_NON_BLOCKING,
+    CONF_PAIR_WINDOW,
     CONF_RELAY_W1,
     CONF_RELAY_W2,
+    CONF_SUMMER_VENT_SCRIPT,
+    CONF_UNI_CODE,
     DEFAULT_CONTROLLER_CODING,
     DEFAULT_NAME,
+    DEFAULT_NON_BLOCKING,
+    DEFAULT_PAIR_WINDOW,
     DEFAULT_SPEED,
+    DEVICE_SCRIPT_DOMAINS,
     DOMAIN,
     SPEED_HIGH,
     SPEED_LOW,
@@ -38,16 +53,86 @@ from .const import (
     SPEED_OFF,
     SPEED_SILENT,
 )
-from .helpers import get_coding_options, load_lunos_codings
+from .controller import DIP_CONF_KEYS, ControllerCode, ControllerIndex
+from .helpers import (
+    async_get_controller_index,
+    async_get_lunos_codings,
+    coding_for_controller_code,
+    get_coding_options,
+)
 
 LOG = logging.getLogger(__name__)
 
 CONF_NAME = 'name'
 
+# optional direct MQTT transport (see mqtt_relay.py)
+MQTT_TOPIC_KEYS = (
+    CONF_MQTT_W1_COMMAND_TOPIC,
+    CONF_MQTT_W1_STATE_TOPIC,
+    CONF_MQTT_W2_COMMAND_TOPIC,
+    CONF_MQTT_W2_STATE_TOPIC,
+)
+
+
+def _controller_code_label(code: ControllerCode) -> str:
+    """Return a dropdown label describing a 5/UNI coding switch position."""
+    label = f'{code.code}: {code.program or code.fan or "?"}'
+    if code.cfm:
+        label += f' ({"/".join(str(cfm) for cfm in code.cfm)} cfm)'
+    return label
+
+
+def _build_controller_schema(
+    controller_index: ControllerIndex | None,
+    defaults: dict[str, Any],
+) -> dict[Any, Any]:
+    """Build the optional physical 5/UNI coding and DIP switch fields."""
+    if controller_index is None or not controller_index.codes:
+        return {}
+
+    fields: dict[Any, Any] = {
+        vol.Optional(
+            CONF_UNI_CODE,
+            description={'suggested_value': defaults.get(CONF_UNI_CODE)},
+        ): SelectSelector(
+            SelectSelectorConfig(
+                options=[
+                    SelectOptionDict(value=code.code, label=_controller_code_label(code))
+                    for code in controller_index.codes
+                ],
+                mode=SelectSelectorMode.DROPDOWN,
+            ),
+        ),
+    }
+    for position, key in DIP_CONF_KEYS.items():
+        fields[vol.Optional(key, description={'suggested_value': defaults.get(key)})] = (
+            SelectSelector(
+                SelectSelectorConfig(
+                    options=[
+                        SelectOptionDict(value=state, label=f'{state} {meaning}')
+                        for state, meaning in controller_index.dip_options(position).items()
+                    ],
+                    mode=SelectSelectorMode.DROPDOWN,
+                ),
+            )
+        )
+    return fields
+
+
+def _apply_controller_code(user_input: dict[str, Any], coding_config: dict[str, Any]) -> None:
+    """Select the catalog coding matching the physical coding switch, if one was chosen."""
+    code = user_input.get(CONF_UNI_CODE)
+    if not code:
+        return
+    coding = coding_for_controller_code(coding_config, code, user_input.get(CONF_CONTROLLER_CODING))
+    if coding is not None:
+        user_input[CONF_CONTROLLER_CODING] = coding
+
 
 def _build_user_schema(
     coding_options: list[str],
     defaults: dict[str, Any] | None = None,
+    controller_index: ControllerIndex | None = None,
 ) -> vol.Schema:
     """Build the schema for user configuration step."""
     defaults = defaults or {}
@@ -57,7 +142,7 @@ def _build_user_schema(
             vol.Required(
                 CONF_NAME,
                 default=defaults.get(CONF_NAME, DEFAULT_NAME),
-            ): TextSelector(TextSelectorConfig(type='text')),
+            ): TextSelector(TextSelectorConfig(type=TextSelectorType.TEXT)),
             vol.Required(
                 CONF_RELAY_W1,
                 default=defaults.get(CONF_RELAY_W1),
@@ -107,6 +192,45 @@ def _build_user_schema(
                     translation_key='fan_speed',
                 ),
             ),
+            vol.Optional(
+                CONF_NON_BLOCKING,
+                description={
+                    'suggested_value': defaults.get(CONF_NON_BLOCKING, DEFAULT_NON_BLOCKING)
+                },
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_PAIR_WINDOW,
+                description={
+                    'suggested_value': defaults.get(CONF_PAIR_WINDOW, DEFAULT_PAIR_WINDOW)
+                },
+            ): NumberSelector(
+                NumberSelectorConfig(
+                    min=0,
+                    max=2,
+                    step=0.05,
+                    unit_of_measurement='s',
+                    mode=NumberSelectorMode.BOX,
+                ),
+            ),
+            vol.Optional(
+                CONF_FILTER_RESET_SCRIPT,
+                description={'suggested_value': defaults.get(CONF_FILTER_RESET_SCRIPT)},
+            ): EntitySelector(
+                EntitySelectorConfig(domain=list(DEVICE_SCRIPT_DOMAINS)),
+            ),
+            vol.Optional(
+                CONF_SUMMER_VENT_SCRIPT,
+                description={'suggested_value': defaults.get(CONF_SUMMER_VENT_SCRIPT)},
+            ): EntitySelector(
+                EntitySelectorConfig(domain=list(DEVICE_SCRIPT_DOMAINS)),
+            ),
+            **{
+                vol.Optional(key, description={'suggested_value': defaults.get(key)}): TextSelector(
+                    TextSelectorConfig(type=TextSelectorType.TEXT)
+                )
+                for key in MQTT_TOPIC_KEYS
+            },
+            **_build_controller_schema(controller_index, defaults),
         }
     )
 
@@ -116,19 +240,14 @@ class LunosConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
-    def __init__(self) -> None:
-        """Initialize the config flow."""
-        self._coding_config: dict[str, Any] = {}
-
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         """Handle the initial step."""
         errors: dict[str, str] = {}
 
-        # load coding configurations
-        if not self._coding_config:
-            self._coding_config = await self.hass.async_add_executor_job(load_lunos_codings)
-
-        coding_options = get_coding_options(self._coding_config)
+        # load coding configurations (cached across all flows and entries)
+        coding_config = await async_get_lunos_codings(self.hass)
+        coding_options = get_coding_options(coding_config)
+        controller_index = await async_get_controller_index(self.hass)
 
         if user_input is not None:
             # validate relays are different
@@ -143,6 +262,7 @@ class LunosConfigFlow(ConfigFlow, domain=DOMAIN):
 
                 # convert fan_count to int (NumberSelector returns float)
                 user_input[CONF_FAN_COUNT] = int(user_input.get(CONF_FAN_COUNT, 2))
+                _apply_controller_code(user_input, coding_config)
 
                 return self.async_create_entry(
                     title=user_input[CONF_NAME],
@@ -151,7 +271,7 @@ class LunosConfigFlow(ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id='user',
-            data_schema=_build_user_schema(coding_options),
+            data_schema=_build_user_schema(coding_options, controller_index=controller_index),
             errors=errors,
         )
 
@@ -198,17 +318,15 @@ class LunosOptionsFlow(OptionsFlow):
     def __init__(self, config_entry: ConfigEntry) -> None:
         """Initialize options flow."""
         self._config_entry = config_entry
-        self._coding_config: dict[str, Any] = {}
 
     async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         """Manage the options."""
         errors: dict[str, str] = {}
 
-        # load coding configurations
-        if not self._coding_config:
-            self._coding_config = await self.hass.async_add_executor_job(load_lunos_codings)
-
-        coding_options = get_coding_options(self._coding_config)
+        # load coding configurations (cached across all flows and entries)
+        coding_config = await async_get_lunos_codings(self.hass)
+        coding_options = get_coding_options(coding_config)
+        controller_index = await async_get_controller_index(self.hass)
 
         if user_input is not None:
             # validate relays are different
@@ -217,6 +335,7 @@ class LunosOptionsFlow(OptionsFlow):
             else:
                 # convert fan_count to int
                 user_input[CONF_FAN_COUNT] = int(user_input.get(CONF_FAN_COUNT, 2))
+                _apply_controller_code(user_input, coding_config)
 
                 # update config entry data
                 self.hass.config_entries.async_update_entry(
@@ -230,6 +349,6 @@ class LunosOptionsFlow(OptionsFlow):
 
         return self.async_show_form(
             step_id='init',
-            data_schema=_build_user_schema(coding_options, current_data),
+            data_schema=_build_user_schema(coding_options, current_data, controller_index),
             errors=errors,
         )
@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Final
 
 DOMAIN: Final = 'lunos'
 DEFAULT_NAME: Final = 'LUNOS Ventilation'
 DEFAULT_LUNOS_NAME: Final = DEFAULT_NAME
 
+# bundled coding catalog sources and the precompiled artifact (see catalog.py)
+CODINGS_PATH: Final = Path(__file__).parent / 'lunos-codings.yaml'
+CONTROLLERS_PATH: Final = Path(__file__).parent / 'lunos-40269.yaml'
+COMPILED_CODINGS_PATH: Final = Path(__file__).parent / 'lunos-codings.json'
+
+# optional user codings deep-merged over the bundled catalog (in the HA config dir)
+CODINGS_OVERLAY_FILENAME: Final = 'lunos_codings.yaml'
+
 # Fan speed constants
 SPEED_TURBO: Final = 'turbo'
 SPEED_HIGH: Final = 'high'
@@ -41,14 +50,25 @@ PRESET_TURBO: Final = SPEED_TURBO
 SPEED_CHANGE_DELAY_SECONDS: Final = 4
 DELAY_BETWEEN_FLIPS: Final = 0.100
 MINIMUM_DELAY_BETWEEN_STATE_CHANGES: Final = 4.0
+# all flips of a mode command must reach the controller within this window
+TOGGLE_WINDOW: Final = 3.0
+
+# confirmed relay writes: wait this long for the relay to report the new state,
+# then re-send up to RELAY_WRITE_RETRIES times (backoff doubles after each retry)
+RELAY_ECHO_TIMEOUT: Final = 2.0
+RELAY_WRITE_RETRIES: Final = 2
+RELAY_RETRY_BACKOFF: Final = 0.5
 
 # Entity attribute keys
 ATTR_CFM: Final = 'cfm'  # note: even when off some LUNOS fans still circulate air
 ATTR_CMHR: Final = 'cmh'
+ATTR_CONTROLLER_CFM: Final = 'controller_cfm'  # rated airflow per the 5/UNI coding switch
 ATTR_DB: Final = 'dB'
 ATTR_MODEL_NAME: Final = 'model'
 ATTR_WATTS: Final = 'watts'
 ATTR_SPEED: Final = 'speed'
+ATTR_PENDING: Final = 'pending'  # relay writes for a non-blocking speed change are outstanding
+ATTR_PENDING_SPEED: Final = 'pending_speed'
 UNKNOWN: Final = 'Unknown'
 
 # Ventilation mode attributes
@@ -63,6 +83,11 @@ DEFAULT_VENT_MODE: Final = VENT_ECO
 SERVICE_CLEAR_FILTER_REMINDER: Final = 'clear_filter_reminder'
 SERVICE_TURN_ON_SUMMER_VENTILATION: Final = 'turn_on_summer_ventilation'
 SERVICE_TURN_OFF_SUMMER_VENTILATION: Final = 'turn_off_summer_ventilation'
+SERVICE_RELOAD_CODINGS: Final = 'reload_codings'
+SERVICE_SET_AIRFLOW: Final = 'set_airflow'
+
+# dispatched (with the config entry id) after a codings reload changed an entry's profile
+SIGNAL_CODINGS_UPDATED: Final = f'{DOMAIN}_codings_updated_{{}}'
 
 # Configuration keys
 CONF_CONTROLLER_CODING: Final = 'controller_coding'
@@ -71,6 +96,27 @@ CONF_RELAY_W2: Final = 'relay_w2'
 CONF_DEFAULT_SPEED: Final = 'default_speed'
 CONF_DEFAULT_FAN_COUNT: Final = 'default_fan_count'
 CONF_FAN_COUNT: Final = 'fan_count'
+CONF_NON_BLOCKING: Final = 'non_blocking'  # speed services return before the relays are written
+DEFAULT_NON_BLOCKING: Final = False
+# seconds a relay change waits for the partner relay before the derived speed is committed
+CONF_PAIR_WINDOW: Final = 'pair_window'
+DEFAULT_PAIR_WINDOW: Final = 0.5
+# optional script/button entities running a mode's flip sequence on the relay device itself
+CONF_FILTER_RESET_SCRIPT: Final = 'filter_reset_script'
+CONF_SUMMER_VENT_SCRIPT: Final = 'summer_vent_script'
+DEVICE_SCRIPT_DOMAINS: Final = ('script', 'button')
+DEVICE_SCRIPT_DURATION: Final = 1.0  # upper bound for a device-side flip sequence to finish
+# optional direct MQTT transport: relay command/state topics (e.g. Tasmota cmnd/.../POWER1)
+CONF_MQTT_W1_COMMAND_TOPIC: Final = 'mqtt_w1_command_topic'
+CONF_MQTT_W1_STATE_TOPIC: Final = 'mqtt_w1_state_topic'
+CONF_MQTT_W2_COMMAND_TOPIC: Final = 'mqtt_w2_command_topic'
+CONF_MQTT_W2_STATE_TOPIC: Final = 'mqtt_w2_state_topic'
+
+# Physical 5/UNI-FR controller settings (coding switch and DIP switches 1-3)
+CONF_UNI_CODE: Final = 'uni_code'
+CONF_DIP_INTERVAL: Final = 'dip_interval'
+CONF_DIP_TIME_DELAY: Final = 'dip_time_delay'
+CONF_DIP_HUMIDITY: Final = 'dip_humidity'
 
 # Unit conversion
 CFM_TO_CMH: Final = 1.69901  # 1 cubic feet/minute = 1.69901 cubic meters/hour
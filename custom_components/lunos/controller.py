@@ -0,0 +1,188 @@
+"""Lookup index for the LUNOS 5/UNI-FR (40269) controller tables.
+
+lunos-40269.yaml documents what each DIP switch position means and the airflow
+of every rotary coding switch position (0-E) of the 5/UNI-FR controller. The
+index below is precomputed once from the compiled catalog so that resolving an
+installer's physical settings is a constant time dictionary lookup.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Final
+
+from .const import (
+    CONF_DIP_HUMIDITY,
+    CONF_DIP_INTERVAL,
+    CONF_DIP_TIME_DELAY,
+    SPEED_HIGH,
+    SPEED_LOW,
+    SPEED_MEDIUM,
+    SPEED_OFF,
+    SPEED_SILENT,
+)
+
+DEFAULT_CONTROLLER: Final = '40269'
+
+SWITCH_STATES: Final = ('+', '0', '-')
+DEFAULT_SWITCH_STATE: Final = '0'
+
+# what each DIP switch position controls (used as attribute names)
+DIP_FUNCTIONS: Final[dict[str, str]] = {
+    '1': 'interval',
+    '2': 'time_delay',
+    '3': 'humidity_control',
+    '4': 'fan_length',
+}
+
+# entity attributes describing the controller settings (see ControllerSettings.attributes)
+CONTROLLER_ATTRIBUTES: Final = frozenset({'controller_code', *DIP_FUNCTIONS.values()})
+
+# config entry keys holding the installer's DIP switch states
+DIP_CONF_KEYS: Final[dict[str, str]] = {
+    '1': CONF_DIP_INTERVAL,
+    '2': CONF_DIP_TIME_DELAY,
+    '3': CONF_DIP_HUMIDITY,
+}
+
+# position of each relay speed in a coding's airflow table
+RELAY_SPEED_INDEX: Final[dict[str, int]] = {
+    SPEED_OFF: 0,
+    SPEED_SILENT: 0,
+    SPEED_LOW: 1,
+    SPEED_MEDIUM: 2,
+    SPEED_HIGH: 3,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ControllerCode:
+    """One rotary coding switch position of the controller."""
+
+    code: str
+    fan: str | None
+    program: str | None
+    paired: bool
+    cfm: tuple[float, ...]
+
+    def cfm_for(self, speed: str | None) -> float | None:
+        """Return the rated airflow (cfm) for a relay speed."""
+        index = RELAY_SPEED_INDEX.get(speed)  # type: ignore[arg-type]
+        if index is None or index >= len(self.cfm):
+            return None
+        return self.cfm[index]
+
+
+@dataclass(frozen=True, slots=True)
+class DipSetting:
+    """Meaning of one DIP switch position in one state."""
+
+    position: str
+    state: str
+    function: str
+    meaning: str
+
+
+@dataclass(frozen=True, slots=True)
+class ControllerSettings:
+    """Resolved physical settings (coding switch + DIP switches) of a controller."""
+
+    code: ControllerCode
+    dip: tuple[DipSetting, ...]
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return the static entity attributes describing these settings."""
+        attributes: dict[str, Any] = {'controller_code': self.code.code}
+        for setting in self.dip:
+            attributes[setting.function] = setting.meaning
+        return attributes
+
+
+class ControllerIndex:
+    """Precomputed (code, DIP position, switch state) index of a controller."""
+
+    def __init__(self, controllers: dict[str, Any], number: str = DEFAULT_CONTROLLER) -> None:
+        """Build the index from the normalized controller tables."""
+        controller = controllers.get(number, {})
+        self.number = number
+        self.type: str | None = controller.get('type')
+
+        self._codes: dict[str, ControllerCode] = {
+            code: ControllerCode(
+                code=code,
+                fan=config.get('fan'),
+                program=config.get('program'),
+                paired=config.get('paired', True),
+                cfm=tuple(config.get('cfm') or ()),
+            )
+            for code, config in (controller.get('codes') or {}).items()
+        }
+
+        self._dip: dict[tuple[str, str], DipSetting] = {}
+        for position, states in (controller.get('dip') or {}).items():
+            function = DIP_FUNCTIONS.get(position, f'dip_{position}')
+            for state, meaning in states.items():
+                self._dip[position, state] = DipSetting(position, state, function, meaning)
+
+        self._index: dict[tuple[str, str, str], tuple[ControllerCode, DipSetting]] = {
+            (code, position, state): (controller_code, setting)
+            for code, controller_code in self._codes.items()
+            for (position, state), setting in self._dip.items()
+        }
+
+    @property
+    def codes(self) -> tuple[ControllerCode, ...]:
+        """Return all coding switch positions."""
+        return tuple(self._codes.values())
+
+    def code(self, code: str | None) -> ControllerCode | None:
+        """Return a coding switch position."""
+        return self._codes.get(str(code)) if code is not None else None
+
+    def dip_options(self, position: str) -> dict[str, str]:
+        """Return the meaning of each state of a DIP switch position."""
+        return {
+            state: self._dip[position, state].meaning
+            for state in SWITCH_STATES
+            if (position, state) in self._dip
+        }
+
+    def lookup(
+        self, code: str, position: str, state: str
+    ) -> tuple[ControllerCode, DipSetting] | None:
+        """Return the coding and DIP setting for (code, DIP position, switch state)."""
+        return self._index.get((code, position, state))
+
+    def resolve(
+        self, code: str | None, dip_states: Mapping[str, str] | None = None
+    ) -> ControllerSettings | None:
+        """Resolve the physical coding switch and DIP switch states of an installation."""
+        if code is None:
+            return None
+
+        dip_states = dip_states or {}
+        controller_code: ControllerCode | None = None
+        settings: list[DipSetting] = []
+        for position in DIP_CONF_KEYS:
+            state = dip_states.get(position, DEFAULT_SWITCH_STATE)
+            found = self._index.get((str(code), position, state))
+            if found is None:
+                continue
+            controller_code, setting = found
+            settings.append(setting)
+
+        if controller_code is None:
+            controller_code = self.code(code)
+        if controller_code is None:
+            return None
+        return ControllerSettings(code=controller_code, dip=tuple(settings))
+
+
+def dip_states_from_config(data: Mapping[str, Any]) -> dict[str, str]:
+    """Return the DIP switch states stored in a config entry's data."""
+    return {
+        position: str(data.get(key, DEFAULT_SWITCH_STATE))
+        for position, key in DIP_CONF_KEYS.items()
+    }
@@ -3,46 +3,57 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+import time
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_OFF, STATE_ON
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
+from .command_queue import LunosCommandQueue
 from .const import (
     CONF_CONTROLLER_CODING,
-    CONF_DEFAULT_FAN_COUNT,
     CONF_FAN_COUNT,
+    CONF_MQTT_W1_COMMAND_TOPIC,
+    CONF_MQTT_W1_STATE_TOPIC,
+    CONF_MQTT_W2_COMMAND_TOPIC,
+    CONF_MQTT_W2_STATE_TOPIC,
+    CONF_PAIR_WINDOW,
     CONF_RELAY_W1,
     CONF_RELAY_W2,
     DEFAULT_CONTROLLER_CODING,
-    SPEED_HIGH,
-    SPEED_LOW,
-    SPEED_MEDIUM,
-    SPEED_OFF,
-    SPEED_SILENT,
+    DEFAULT_PAIR_WINDOW,
 )
+from .latency import RelayLatency
+from .profile import ModelProfile, compile_profile
+from .relay import RelayWriter
+from .sequencer import ToggleSequencer
+from .shadow import ControllerShadow
+from .transition import SLOT_UNAVAILABLE, W1, W2, relay_slot
 
 if TYPE_CHECKING:
-    from homeassistant.core import Event
+    from datetime import datetime
+
+    from homeassistant.core import Event, EventStateChangedData
 
 LOG = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class LunosData:
-    """Data class for LUNOS coordinator state."""
+    """Relay-derived state of a LUNOS controller.
+
+    One instance per coordinator is updated in place on every relay change;
+    the static per-entry data (speeds, ventilation modes, relay state map) is
+    the coordinator's shared ModelProfile.
+    """
 
     current_speed: str | None = None
     w1_state: str | None = None
     w2_state: str | None = None
-    model_config: dict[str, Any] = field(default_factory=dict)
-    relay_state_map: dict[str, list[str]] = field(default_factory=dict)
-    fan_speeds: list[str] = field(default_factory=list)
-    vent_modes: list[str] = field(default_factory=list)
+    updated: float | None = None  # time.time() of the last update
 
 
 class LunosCoordinator(DataUpdateCoordinator[LunosData]):
@@ -51,7 +62,13 @@ class LunosCoordinator(DataUpdateCoordinator[LunosData]):
     This coordinator monitors the W1/W2 relay states and determines the
     current fan speed based on their states. Since the LUNOS controller
     is managed by physical relays, we use push-based updates by listening
-    to state changes on the relay entities.
+    to state changes on the relay entities. It is the only subscriber to
+    the relay entities: entities derive their state from its data.
+
+    Speed changes that move both relays arrive as two state changes a few
+    hundred milliseconds apart. A relay change is therefore held for a short
+    pair window: the data is updated once the partner relay changed too, or
+    when the window ends, so the intermediate speed is never published.
     """
 
     def __init__(
@@ -64,6 +81,7 @@ class LunosCoordinator(DataUpdateCoordinator[LunosData]):
         super().__init__(
             hass,
             LOG,
+            config_entry=entry,
             name=f'LUNOS {entry.title}',
             # no update_interval since we use push updates from relay state changes
         )
@@ -77,55 +95,110 @@ class LunosCoordinator(DataUpdateCoordinator[LunosData]):
             CONF_CONTROLLER_CODING, DEFAULT_CONTROLLER_CODING
         )
 
-        # get model configuration
+        # get model configuration (compiled once into a shared immutable profile)
         self._model_config = coding_config.get(self._controller_coding, {})
-        self._fan_count: int = entry.data.get(
-            CONF_FAN_COUNT,
-            self._model_config.get(CONF_DEFAULT_FAN_COUNT, 2),
+        self._profile = compile_profile(
+            self._controller_coding,
+            self._model_config,
+            entry.data.get(CONF_FAN_COUNT),
+        )
+        self._fan_count: int = self._profile.fan_count
+
+        # relay-derived state, updated in place (static data lives in the profile)
+        self._state = LunosData()
+
+        # relay state change subscription (from setup until shutdown)
+        self._unsub_state_change: CALLBACK_TYPE | None = None
+
+        # relays changed since the data was last updated, held for the partner relay
+        self._pair_window: float = entry.data.get(CONF_PAIR_WINDOW, DEFAULT_PAIR_WINDOW)
+        self._changed_relays: set[int] = set()
+        self._unsub_pair_window: CALLBACK_TYPE | None = None
+
+        # relay writes for this controller (kept here so it outlives the fan entity)
+        self._command_queue = LunosCommandQueue(hass, entry.title)
+        self._relay_latency = RelayLatency(hass, entry.entry_id)
+        self._relay_writer = self._build_relay_writer()
+        self._toggle_sequencer = ToggleSequencer(hass, entry.title)
+        self._controller_shadow = ControllerShadow(turbo=self._profile.supports_turbo_mode)
+
+    @callback
+    def apply_coding_config(self, coding_config: dict[str, Any]) -> bool:
+        """Switch to a reloaded coding catalog, returning True if this entry's profile changed.
+
+        Only the compiled profile and the data derived from it are replaced; the
+        relay subscriptions and the last relay states are kept.
+        """
+        self.coding_config = coding_config
+        model_config = coding_config.get(self._controller_coding, {})
+        profile = compile_profile(
+            self._controller_coding, model_config, self.entry.data.get(CONF_FAN_COUNT)
         )
+        if profile is self._profile:
+            return False
+
+        LOG.info('LUNOS coding %s changed; updating %s', self._controller_coding, self.name)
+        self._model_config = model_config
+        self._profile = profile
+        self._fan_count = profile.fan_count
+        self._controller_shadow.turbo = profile.supports_turbo_mode
+
+        if self.data is not None:
+            self.async_set_updated_data(
+                self._update_state(self._state.w1_state, self._state.w2_state)
+            )
+        return True
+
+    def _update_state(self, w1_state: str | None, w2_state: str | None) -> LunosData:
+        """Update the relay-derived state in place for the given relay states."""
+        state = self._state
+        state.current_speed = self._determine_speed_from_states(w1_state, w2_state)
+        state.w1_state = w1_state
+        state.w2_state = w2_state
+        state.updated = time.time()
+        return state
+
+    def _build_relay_writer(self) -> RelayWriter:
+        """Return the relay writer, publishing directly to MQTT for relays with topics."""
+        data = self.entry.data
+        topics = {
+            entity_id: (str(data[command_key]), str(data[state_key]))
+            for entity_id, command_key, state_key in (
+                (self._relay_w1, CONF_MQTT_W1_COMMAND_TOPIC, CONF_MQTT_W1_STATE_TOPIC),
+                (self._relay_w2, CONF_MQTT_W2_COMMAND_TOPIC, CONF_MQTT_W2_STATE_TOPIC),
+            )
+            if data.get(command_key) and data.get(state_key)
+        }
+        if not topics:
+            return RelayWriter(self.hass, self.entry.title, latency=self._relay_latency)
 
-        # build relay state map
-        self._relay_state_map = self._build_relay_state_map()
-        self._fan_speeds = list(self._relay_state_map.keys())
-
-        # initialize unsub callback
-        self._unsub_state_change: callback | None = None
-
-    def _build_relay_state_map(self) -> dict[str, list[str]]:
-        """Build the mapping from speed names to W1/W2 relay states."""
-        supports_off = self._model_config.get('supports_off', True)
-
-        if supports_off:
-            return {
-                SPEED_OFF: [STATE_OFF, STATE_OFF],
-                SPEED_LOW: [STATE_ON, STATE_OFF],
-                SPEED_MEDIUM: [STATE_OFF, STATE_ON],
-                SPEED_HIGH: [STATE_ON, STATE_ON],
-            }
-        else:
-            # 4-speed fans that cannot be fully turned off
-            return {
-                SPEED_SILENT: [STATE_OFF, STATE_OFF],
-                SPEED_LOW: [STATE_ON, STATE_OFF],
-                SPEED_MEDIUM: [STATE_OFF, STATE_ON],
-                SPEED_HIGH: [STATE_ON, STATE_ON],
-            }
+        from .mqtt_relay import MqttRelayTopics, MqttRelayWriter
+
+        return MqttRelayWriter(
+            self.hass,
+            self.entry.title,
+            {entity_id: MqttRelayTopics(*pair) for entity_id, pair in topics.items()},
+            latency=self._relay_latency,
+        )
+
+    async def _async_setup(self) -> None:
+        """Restore the measured relay latencies, set up the relay transport and listeners."""
+        await self._relay_latency.async_load()
+        await self._relay_writer.async_setup()
+
+        # setup listeners to track changes to the W1/W2 relays
+        if self._unsub_state_change is None:
+            self._unsub_state_change = async_track_state_change_event(
+                self.hass,
+                [self._relay_w1, self._relay_w2],
+                self._handle_relay_state_change,
+            )
 
     async def _async_update_data(self) -> LunosData:
         """Fetch data from relays and determine current state."""
         w1_state = self._get_relay_state(self._relay_w1)
         w2_state = self._get_relay_state(self._relay_w2)
-        current_speed = self._determine_speed_from_states(w1_state, w2_state)
-
-        return LunosData(
-            current_speed=current_speed,
-            w1_state=w1_state,
-            w2_state=w2_state,
-            model_config=self._model_config,
-            relay_state_map=self._relay_state_map,
-            fan_speeds=self._fan_speeds,
-            vent_modes=self._get_vent_modes(),
-        )
+        return self._update_state(w1_state, w2_state)
 
     def _get_relay_state(self, entity_id: str) -> str | None:
         """Get the current state of a relay entity."""
@@ -139,43 +212,22 @@ class LunosCoordinator(DataUpdateCoordinator[LunosData]):
         self, w1_state: str | None, w2_state: str | None
     ) -> str | None:
         """Determine the fan speed based on W1/W2 relay states."""
-        if w1_state is None or w2_state is None:
-            return None
-
-        current_state = [w1_state, w2_state]
-        for speed, relay_states in self._relay_state_map.items():
-            if current_state == relay_states:
-                LOG.debug('Determined LUNOS speed=%s from W1/W2=%s', speed, current_state)
-                return speed
-
-        LOG.warning(
-            'Could not determine speed from relay states: W1=%s, W2=%s',
-            w1_state,
-            w2_state,
-        )
-        return None
-
-    def _get_vent_modes(self) -> list[str]:
-        """Get available ventilation modes based on model configuration."""
-        from .const import VENT_ECO, VENT_EXHAUST_ONLY, VENT_SUMMER
-
-        modes = [VENT_ECO]
-        if self._model_config.get('supports_summer_vent'):
-            modes.append(VENT_SUMMER)
-        if self._model_config.get('supports_exhaust_only'):
-            modes.append(VENT_EXHAUST_ONLY)
-        return modes
-
-    async def async_added_to_hass(self) -> None:
-        """Set up state change listeners when added to hass."""
-        self._unsub_state_change = async_track_state_change_event(
-            self.hass,
-            [self._relay_w1, self._relay_w2],
-            self._handle_relay_state_change,
-        )
+        slot = relay_slot(w1_state, w2_state)
+        speed = self._profile.speed_table[slot]
+        if speed is not None:
+            LOG.debug('Determined LUNOS speed=%s from W1/W2=%s/%s', speed, w1_state, w2_state)
+        elif slot == SLOT_UNAVAILABLE:
+            LOG.debug('LUNOS relays unavailable: W1=%s, W2=%s', w1_state, w2_state)
+        elif w1_state is not None and w2_state is not None:  # missing relays already logged
+            LOG.warning(
+                'Could not determine speed from relay states: W1=%s, W2=%s',
+                w1_state,
+                w2_state,
+            )
+        return speed
 
     @callback
-    def _handle_relay_state_change(self, event: Event) -> None:
+    def _handle_relay_state_change(self, event: Event[EventStateChangedData]) -> None:
         """Handle state changes in W1/W2 relays."""
         entity_id = event.data.get('entity_id')
         new_state = event.data.get('new_state')
@@ -187,14 +239,89 @@ class LunosCoordinator(DataUpdateCoordinator[LunosData]):
         from_state = old_state.state if old_state else None
         to_state = new_state.state
 
-        if from_state != to_state:
-            LOG.info(
-                'Relay %s changed: %s -> %s, refreshing LUNOS state',
-                entity_id,
-                from_state,
-                to_state,
+        # attribute-only changes do not change the speed
+        if from_state == to_state:
+            return
+
+        # the controller sees this edge; later writes must not extend it into a toggle
+        relay = W1 if entity_id == self._relay_w1 else W2
+        self._controller_shadow.observe_edge(relay)
+        LOG.info(
+            'Relay %s changed: %s -> %s, updating LUNOS state',
+            entity_id,
+            from_state,
+            to_state,
+        )
+
+        # commit once the partner relay changed as well, or when the pair window ends
+        self._changed_relays.add(relay)
+        if self._pair_window <= 0 or len(self._changed_relays) > 1:
+            self._async_commit_relay_states()
+        elif self._unsub_pair_window is None:
+            self._unsub_pair_window = async_call_later(
+                self.hass, self._pair_window, self._async_pair_window_ended
             )
-            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _async_pair_window_ended(self, _now: datetime) -> None:
+        """Commit a relay change whose partner relay did not follow within the window."""
+        self._unsub_pair_window = None
+        self._async_commit_relay_states()
+
+    @callback
+    def _async_commit_relay_states(self) -> None:
+        """Update the data from the current relay states."""
+        self._cancel_pair_window()
+        self._changed_relays.clear()
+
+        # derived synchronously from the state machine rather than via a (debounced) refresh
+        self.async_set_updated_data(
+            self._update_state(
+                self._get_relay_state(self._relay_w1), self._get_relay_state(self._relay_w2)
+            )
+        )
+
+    @callback
+    def _cancel_pair_window(self) -> None:
+        """Cancel a pending pair window."""
+        if self._unsub_pair_window is not None:
+            self._unsub_pair_window()
+            self._unsub_pair_window = None
+
+    async def async_shutdown(self) -> None:
+        """Stop listening to the relays and stop the command queue when the entry is unloaded."""
+        await super().async_shutdown()
+        if self._unsub_state_change is not None:
+            self._unsub_state_change()
+            self._unsub_state_change = None
+        self._cancel_pair_window()
+        self._command_queue.async_shutdown()
+        self._relay_writer.async_shutdown()
+
+    @property
+    def command_queue(self) -> LunosCommandQueue:
+        """Return the queue serializing this controller's relay commands."""
+        return self._command_queue
+
+    @property
+    def relay_writer(self) -> RelayWriter:
+        """Return the confirmed (closed-loop) writer for this controller's relays."""
+        return self._relay_writer
+
+    @property
+    def relay_latency(self) -> RelayLatency:
+        """Return the measured command-to-echo latencies of this controller's relays."""
+        return self._relay_latency
+
+    @property
+    def controller_shadow(self) -> ControllerShadow:
+        """Return the model of what the controller decodes from recent relay edges."""
+        return self._controller_shadow
+
+    @property
+    def toggle_sequencer(self) -> ToggleSequencer:
+        """Return the sequencer timing this controller's mode command relay flips."""
+        return self._toggle_sequencer
 
     @property
     def relay_w1(self) -> str:
@@ -211,6 +338,11 @@ class LunosCoordinator(DataUpdateCoordinator[LunosData]):
         """Return the model configuration."""
         return self._model_config
 
+    @property
+    def profile(self) -> ModelProfile:
+        """Return the compiled model profile."""
+        return self._profile
+
     @property
     def fan_count(self) -> int:
         """Return the number of fans."""
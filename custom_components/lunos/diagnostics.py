@@ -29,14 +29,15 @@ async def async_get_config_entry_diagnostics(
     controller_coding = entry.data.get('controller_coding', 'unknown')
     model_config = coding_config.get(controller_coding, {})
 
-    # get current coordinator data
+    # get current coordinator data (the speeds and modes are static, from the profile)
     data = coordinator.data
     current_state = {
         'current_speed': data.current_speed if data else None,
         'w1_state': data.w1_state if data else None,
         'w2_state': data.w2_state if data else None,
-        'fan_speeds': data.fan_speeds if data else [],
-        'vent_modes': data.vent_modes if data else [],
+        'updated': data.updated if data else None,
+        'fan_speeds': list(coordinator.profile.fan_speeds),
+        'vent_modes': list(coordinator.profile.vent_modes),
     }
 
     # get fan entity state
@@ -68,6 +69,11 @@ async def async_get_config_entry_diagnostics(
             'default_fan_count': model_config.get('default_fan_count'),
         },
         'coordinator_state': current_state,
+        'command_queue': coordinator.command_queue.attributes,
+        'relays': coordinator.relay_writer.attributes,
+        'relay_latency': coordinator.relay_latency.attributes,
+        'controller_shadow': coordinator.controller_shadow.attributes,
+        'last_toggle_sequence': coordinator.toggle_sequencer.attributes,
         'entity_state': entity_state,
         'available_codings': list(coding_config.keys()),
     }
@@ -13,6 +13,7 @@ from __future__ import annotations
 
 import logging
 import asyncio
+from functools import partial
 import time
 from typing import TYPE_CHECKING, Any
 
@@ -29,60 +30,97 @@ from homeassistant.const import (
     STATE_OFF,
     STATE_ON,
 )
-from homeassistant.core import Event, callback
+from homeassistant.core import SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import (
     AddEntitiesCallback,
     async_get_current_platform,
 )
-from homeassistant.helpers.event import async_track_state_change_event
-from homeassistant.util.percentage import (
-    ordered_list_item_to_percentage,
-    percentage_to_ordered_list_item,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+import voluptuous as vol
 
 from .const import (
     ATTR_CFM,
     ATTR_CMHR,
+    ATTR_CONTROLLER_CFM,
     ATTR_DB,
     ATTR_MODEL_NAME,
+    ATTR_PENDING,
+    ATTR_PENDING_SPEED,
     ATTR_SPEED,
     ATTR_VENT_MODE,
     ATTR_WATTS,
     CFM_TO_CMH,
     CONF_CONTROLLER_CODING,
-    CONF_DEFAULT_FAN_COUNT,
     CONF_DEFAULT_SPEED,
     CONF_FAN_COUNT,
+    CONF_FILTER_RESET_SCRIPT,
+    CONF_NON_BLOCKING,
     CONF_RELAY_W1,
     CONF_RELAY_W2,
+    CONF_SUMMER_VENT_SCRIPT,
     DEFAULT_NAME,
+    DEFAULT_NON_BLOCKING,
     DEFAULT_SPEED,
     DEFAULT_VENT_MODE,
-    DELAY_BETWEEN_FLIPS,
+    DEVICE_SCRIPT_DURATION,
     DOMAIN,
-    MINIMUM_DELAY_BETWEEN_STATE_CHANGES,
     SERVICE_CLEAR_FILTER_REMINDER,
+    SERVICE_SET_AIRFLOW,
     SERVICE_TURN_OFF_SUMMER_VENTILATION,
     SERVICE_TURN_ON_SUMMER_VENTILATION,
+    SIGNAL_CODINGS_UPDATED,
     SPEED_HIGH,
-    SPEED_LOW,
     SPEED_MEDIUM,
     SPEED_OFF,
-    SPEED_SILENT,
+    SPEED_TURBO,
     VENT_ECO,
     VENT_EXHAUST_ONLY,
     VENT_SUMMER,
 )
+from .controller import CONTROLLER_ATTRIBUTES
+from .profile import ModelProfile
+from .relay import RelayWriteError
+from .transition import RELAY_NAMES, W2, TransitionPlan
 
 if TYPE_CHECKING:
-    from homeassistant.core import HomeAssistant
+    from collections.abc import Awaitable, Iterable, Sequence
+
+    from homeassistant.core import HomeAssistant, ServiceResponse
 
     from . import LunosConfigEntry
+    from .command_queue import LunosCommandQueue
+    from .controller import ControllerSettings
     from .coordinator import LunosCoordinator
 
 LOG = logging.getLogger(__name__)
 
+# relay state written by each relay service (a toggle leaves the state unknown)
+COMMANDED_STATES = {SERVICE_TURN_ON: STATE_ON, SERVICE_TURN_OFF: STATE_OFF}
+
+# fields copied from the model config into the entity attributes
+MODEL_CONFIG_ATTRIBUTES = ('cycle_seconds', 'supports_filter_reminder')
+
+# attributes that only change with the configuration or a codings reload; the recorder
+# stores them again with every speed change, so they are kept out of the recorder
+# (preset_modes is already excluded by the fan component)
+STATIC_ATTRIBUTES = frozenset(
+    {
+        ATTR_MODEL_NAME,
+        CONF_CONTROLLER_CODING,
+        CONF_FAN_COUNT,
+        CONF_RELAY_W1,
+        CONF_RELAY_W2,
+        'fan_speeds',
+        'vent_modes',
+        *MODEL_CONFIG_ATTRIBUTES,
+        *CONTROLLER_ATTRIBUTES,
+    }
+)
+
 
 async def async_setup_entry(
     _hass: HomeAssistant,
@@ -91,7 +129,6 @@ async def async_setup_entry(
 ) -> None:
     """Set up LUNOS fan entities from a config entry."""
     coordinator = entry.runtime_data.coordinator
-    coding_config = entry.runtime_data.coding_config
 
     name = entry.data.get(CONF_NAME, DEFAULT_NAME)
     relay_w1 = entry.data[CONF_RELAY_W1]
@@ -103,13 +140,13 @@ async def async_setup_entry(
     fan = LUNOSFan(
         coordinator=coordinator,
         entry=entry,
-        coding_config=coding_config,
         name=name,
         relay_w1=relay_w1,
         relay_w2=relay_w2,
         default_speed=default_speed,
+        controller=entry.runtime_data.controller,
     )
-    async_add_entities([fan], update_before_add=True)
+    async_add_entities([fan])
 
     # register entity services
     platform = async_get_current_platform()
@@ -128,28 +165,47 @@ async def async_setup_entry(
         {},
         'async_turn_off_summer_ventilation',
     )
+    platform.async_register_entity_service(
+        SERVICE_SET_AIRFLOW,
+        vol.All(
+            cv.make_entity_service_schema(
+                {
+                    vol.Exclusive(ATTR_CMHR, 'airflow'): vol.All(
+                        vol.Coerce(float), vol.Range(min=0)
+                    ),
+                    vol.Exclusive(ATTR_CFM, 'airflow'): vol.All(
+                        vol.Coerce(float), vol.Range(min=0)
+                    ),
+                }
+            ),
+            cv.has_at_least_one_key(ATTR_CMHR, ATTR_CFM),
+        ),
+        'async_set_airflow',
+        supports_response=SupportsResponse.OPTIONAL,
+    )
 
 
-class LUNOSFan(FanEntity):
-    """Representation of a LUNOS fan."""
+class LUNOSFan(CoordinatorEntity['LunosCoordinator'], FanEntity):
+    """Representation of a LUNOS fan (its speed is derived by the coordinator)."""
 
     _attr_has_entity_name = True
+    _unrecorded_attributes = STATIC_ATTRIBUTES
 
     def __init__(
         self,
         coordinator: LunosCoordinator,
         entry: LunosConfigEntry,
-        coding_config: dict[str, Any],
         name: str,
         relay_w1: str,
         relay_w2: str,
         default_speed: str = DEFAULT_SPEED,
+        controller: ControllerSettings | None = None,
     ) -> None:
         """Initialize this fan entity."""
-        self._coordinator = coordinator
+        super().__init__(coordinator)
         self._entry = entry
-        self._coding_config = coding_config
         self._name = name
+        self._controller = controller
 
         # unique id based on relay entity ids
         self._attr_unique_id = f'{relay_w1}_{relay_w2}'
@@ -158,49 +214,38 @@ class LUNOSFan(FanEntity):
 
         self._current_speed: str | None = None
         self._last_non_off_speed: str | None = None
-        self._last_relay_change: float | None = None
 
-        # hardware W1/W2 relays used to determine and control LUNOS fan speed
-        self._relay_w1 = relay_w1
-        self._relay_w2 = relay_w2
+        # state last written to W1/W2, trusted over the (lagging) relay entity state
+        # until the relay reports a different state
+        self._commanded: list[str | None] = [None, None]
 
-        self._pending_relay_w1: str | None = None
-        self._pending_relay_w2: str | None = None
+        # W1/W2 states of the coordinator data last handled (to tell which relay changed)
+        self._relay_states: tuple[str | None, str | None] = (None, None)
 
-        coding = entry.data.get(CONF_CONTROLLER_CODING, 'e2-usa')
-        model_config = coding_config.get(coding, {})
-        self._model_config: dict[str, Any] = model_config
+        # optimistic target of non-blocking speed changes still being written to the relays
+        self._pending_speed: str | None = None
+        self._pending_requests = 0
 
-        # fan count differs depending on controller mode (e2 = 2 fans, eGO = 1 fan)
-        self._fan_count: int = entry.data.get(
-            CONF_FAN_COUNT, model_config.get(CONF_DEFAULT_FAN_COUNT, 2)
-        )
+        # hardware W1/W2 relays used to determine and control LUNOS fan speed
+        self._relay_w1 = relay_w1
+        self._relay_w2 = relay_w2
 
+        # the model profile (speeds, ventilation modes, fan count) is compiled and shared
+        # by the coordinator, see the _profile property
         self._attributes: dict[str, Any] = {
-            ATTR_MODEL_NAME: model_config.get('name', 'Unknown'),
-            CONF_CONTROLLER_CODING: coding,
-            CONF_FAN_COUNT: self._fan_count,
+            CONF_CONTROLLER_CODING: entry.data.get(CONF_CONTROLLER_CODING, 'e2-usa'),
             CONF_RELAY_W1: relay_w1,
             CONF_RELAY_W2: relay_w2,
+            ATTR_PENDING: False,
         }
-
-        # copy select fields from the model config into the attributes
-        for attribute in (
-            'cycle_seconds',
-            'supports_filter_reminder',
-        ):
-            if attribute in model_config:
-                self._attributes[attribute] = model_config[attribute]
-
-        self._fan_speeds: list[str] = []
-        self._relay_state_map: dict[str, list[str]] = {}
-        self._init_fan_speeds(model_config)
+        self._init_model_attributes()
+        self._init_fan_speeds()
 
         self._vent_mode: str = VENT_ECO
-        self._vent_modes: list[str] = []
-        self._init_vent_modes(model_config)
+        self._init_vent_modes()
 
-        self._default_speed = default_speed if default_speed in self._fan_speeds else DEFAULT_SPEED
+        fan_speeds = self._profile.fan_speeds
+        self._default_speed = default_speed if default_speed in fan_speeds else DEFAULT_SPEED
 
         self._preset_modes: list[str] = []
         self._preset_mode: str | None = None
@@ -214,6 +259,11 @@ class LUNOSFan(FanEntity):
             self.preset_modes,
         )
 
+    @property
+    def _profile(self) -> ModelProfile:
+        """Return the coordinator's compiled model profile."""
+        return self.coordinator.profile
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return device information about this LUNOS fan."""
@@ -221,180 +271,170 @@ class LUNOSFan(FanEntity):
             identifiers={(DOMAIN, self._attr_unique_id)},
             name=self._name,
             manufacturer='LUNOS',
-            model=self._model_config.get('name', 'Unknown'),
+            model=self._profile.name,
+            model_id=self._profile.model_number,
         )
 
-    def _init_fan_speeds(self, model_config: dict[str, Any]) -> None:
-        """Initialize fan speed configuration based on model."""
-        self._relay_state_map = {}
+    def _init_model_attributes(self) -> None:
+        """Initialize the attributes describing the model and controller settings."""
+        model_config = self.coordinator.model_config
+        self._attributes[ATTR_MODEL_NAME] = self._profile.name
+        # fan count differs depending on controller mode (e2 = 2 fans, eGO = 1 fan)
+        self._attributes[CONF_FAN_COUNT] = self._profile.fan_count
 
-        # If the model configuration indicates this LUNOS fan supports OFF then the
-        # fan is configured via the LUNOS hardware controller with only three speeds total.
-        if model_config.get('supports_off'):
-            self._relay_state_map = {
-                SPEED_OFF: [STATE_OFF, STATE_OFF],
-                SPEED_LOW: [STATE_ON, STATE_OFF],
-                SPEED_MEDIUM: [STATE_OFF, STATE_ON],
-                SPEED_HIGH: [STATE_ON, STATE_ON],
-            }
-
-        # If the hardware LUNOS controller is set to NOT support OFF,
-        # the fan has 4 speeds (and NO OFF).
-        else:
-            self._relay_state_map = {
-                SPEED_SILENT: [STATE_OFF, STATE_OFF],
-                SPEED_LOW: [STATE_ON, STATE_OFF],
-                SPEED_MEDIUM: [STATE_OFF, STATE_ON],
-                SPEED_HIGH: [STATE_ON, STATE_ON],
-            }
+        # copy select fields from the model config into the attributes
+        for attribute in MODEL_CONFIG_ATTRIBUTES:
+            if attribute in model_config:
+                self._attributes[attribute] = model_config[attribute]
+            else:
+                self._attributes.pop(attribute, None)
 
-        self._fan_speeds = list(self._relay_state_map.keys())
-        self._attributes |= {'fan_speeds': self._fan_speeds}
+        # physical 5/UNI coding switch and DIP switch settings (interval, time delay, humidity)
+        if self._controller is not None:
+            self._attributes |= self._controller.attributes
 
-    def _init_vent_modes(self, model_config: dict[str, Any]) -> None:
+    def _init_fan_speeds(self) -> None:
+        """Initialize fan speed configuration based on model."""
+        # If the model configuration indicates this LUNOS fan supports OFF then the
+        # fan is configured via the LUNOS hardware controller with only three speeds total,
+        # otherwise the fan has 4 speeds (and NO OFF). Turbo capable models add TURBO.
+        self._attributes['fan_speeds'] = self._profile.fan_speeds
+
+    def _init_vent_modes(self) -> None:
         """Initialize ventilation mode configuration."""
         # ventilation modes have nothing to do with speed, they refer to how
         # air is circulated through the fan (eco, exhaust-only, summer-vent)
         self._vent_mode = VENT_ECO
-        self._vent_modes = [VENT_ECO]
-
-        # enable various preset modes depending on the fan configuration
-        if model_config.get('supports_summer_vent'):
-            self._vent_modes.append(VENT_SUMMER)
-        if model_config.get('supports_exhaust_only'):
-            self._vent_modes.append(VENT_EXHAUST_ONLY)
-
         self._attributes |= {
             ATTR_VENT_MODE: DEFAULT_VENT_MODE,
-            'vent_modes': self._vent_modes,
+            'vent_modes': self._profile.vent_modes,
         }
 
     def _init_presets(self) -> None:
         """Initialize preset mode configuration."""
         # Fan preset modes should not include manual/named speeds; speeds are represented
         # by percentages. We only expose ventilation-related modes as presets.
-        self._preset_modes = list(self._vent_modes)
+        self._preset_modes = list(self._profile.vent_modes)
         self._attributes[ATTR_PRESET_MODES] = self._preset_modes
 
         # By default the fan is in eco ventilation; percentage changes will clear
         # the preset_mode as required by the FanEntity docs.
         self._preset_mode = DEFAULT_VENT_MODE
 
-    async def async_added_to_hass(self) -> None:
-        """Once entity has been added to HASS, subscribe to state changes."""
-        await super().async_added_to_hass()
-
-        # setup listeners to track changes to the W1/W2 relays
-        async_track_state_change_event(
-            self.hass,
-            [self._relay_w1, self._relay_w2],
-            self._detected_relay_state_change,
-        )
-
-        # attempt to determine the current speed of the fans
-        current_speed = self._determine_current_relay_speed()
-        self._update_speed(current_speed)
-
     @callback
-    def _trigger_entity_update(self) -> None:
-        """Schedule entity state update."""
-        update_before_ha_records_new_value = True
-        self.async_schedule_update_ha_state(update_before_ha_records_new_value)
+    def async_apply_profile(self, controller: ControllerSettings | None) -> None:
+        """Apply the coordinator's reloaded profile in place (without re-probing the relays)."""
+        if self._controller is not None:
+            for attribute in self._controller.attributes:
+                self._attributes.pop(attribute, None)
+            self._attributes.pop(ATTR_CONTROLLER_CFM, None)
+
+        self._controller = controller
+        self._init_model_attributes()
+        self._init_fan_speeds()
+
+        # keep the active ventilation mode if the model still supports it
+        vent_mode, preset_mode = self._vent_mode, self._preset_mode
+        self._init_vent_modes()
+        self._init_presets()
+        if vent_mode in self._profile.vent_modes:
+            self._vent_mode = vent_mode
+            self._preset_mode = preset_mode
+            self._attributes[ATTR_VENT_MODE] = vent_mode
 
-    @property
-    def should_poll(self) -> bool:
-        """Return False since we use push-based updates."""
-        return False  # if this is True, callbacks won't work
+        if self._current_speed not in self._profile.fan_speeds:
+            self._current_speed = None
+        self._update_speed_attributes()
+        self.async_write_ha_state()
 
     @callback
-    def _detected_relay_state_change(self, event: Event) -> None:
-        """Handle W1 or W2 relay state changes to update fan speed."""
-        # ensure there is a delay if any additional state change occurs to
-        # avoid confusing the LUNOS hardware controller
-        self._record_relay_state_change()
-
-        entity = event.data.get('entity_id')
-        new_state = event.data.get('new_state')
-        if new_state is None:
-            return
-
-        to_state = new_state.state
+    def _async_codings_updated(self) -> None:
+        """Handle a codings reload that changed this entry's profile."""
+        LOG.info("Applying reloaded coding to LUNOS '%s'", self._name)
+        self.async_apply_profile(self._entry.runtime_data.controller)
 
-        # old_state is optional in the event
-        old_state = event.data.get('old_state')
-        from_state = old_state.state if old_state else None
+    async def async_added_to_hass(self) -> None:
+        """Once entity has been added to HASS, subscribe to coordinator updates."""
+        await super().async_added_to_hass()
 
-        if to_state != from_state:
-            LOG.info(
-                "%s changed: %s -> %s, updating '%s'",
-                entity,
-                from_state,
-                to_state,
-                self._name,
+        # apply reloaded codings in place (see the lunos.reload_codings service)
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_CODINGS_UPDATED.format(self._entry.entry_id),
+                self._async_codings_updated,
             )
-            self._trigger_entity_update()
+        )
 
-    def _update_speed_attributes(self) -> None:
-        """Update any speed/state based attributes."""
-        self._attributes[ATTR_SPEED] = self._current_speed
-        if self._current_speed is None:
-            return
+        # start from the relay states the coordinator last derived
+        self._relay_states = self._coordinator_relay_states()
+        self._update_speed(self._determine_current_relay_speed())
 
-        coding = self._attributes[CONF_CONTROLLER_CODING]
-        controller_config = self._coding_config.get(coding, {})
-        if not controller_config:
-            LOG.error('Missing control config for %s!', coding)
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Derive the speed from the coordinator's relay states and write the entity state."""
+        relay_states = self._coordinator_relay_states()
+        for relay, state in enumerate(relay_states):
+            # a state other than the one written means the relay was changed elsewhere
+            if state != self._relay_states[relay] and state != self._commanded[relay]:
+                self._commanded[relay] = None
+        self._relay_states = relay_states
+
+        # while the command queue is writing relays the intermediate relay states are
+        # transient; the running command writes the resulting state once it completes
+        if not self._command_queue.idle:
             return
+        self._update_speed(self._determine_current_relay_speed())
+        self.async_write_ha_state()
 
-        default_fan_count = controller_config.get(CONF_DEFAULT_FAN_COUNT, 2)
-        fan_multiplier = self._fan_count / default_fan_count
+    def _coordinator_relay_states(self) -> tuple[str | None, str | None]:
+        """Return the W1/W2 states of the coordinator data."""
+        data = self.coordinator.data
+        if data is None:
+            return (None, None)
+        return (data.w1_state, data.w2_state)
 
-        # load the behaviors of the fan for the current speed setting
-        behavior_config = controller_config.get('behavior')
-        if not behavior_config:
-            LOG.error('Missing behavior config for %s: %s', coding, controller_config)
+    def _update_speed_attributes(self) -> None:
+        """Update any speed/state based attributes (optimistic while a change is pending)."""
+        speed = self._state_speed
+        self._attributes[ATTR_SPEED] = speed
+        if speed is None:
             return
 
-        behavior = behavior_config.get(self._current_speed, {})
-
-        # determine the air flow rates based on fan behavior at the current speed
-        cfm: float | None = None
-        cmh: float | None = None
-        if 'cfm' in behavior:
-            cfm_for_mode: float = behavior['cfm']
-            cfm = cfm_for_mode * fan_multiplier
-            cmh = cfm_for_mode * fan_multiplier * CFM_TO_CMH
-        elif 'chm' in behavior:
-            chm_for_mode: float = behavior['chm']
-            cmh = chm_for_mode * fan_multiplier
-            cfm = chm_for_mode * fan_multiplier / CFM_TO_CMH
+        # airflow, sound level and power are precomputed per speed in the profile
+        metrics = self._profile.metrics_for(speed)
+        self._attributes[ATTR_CFM] = metrics.cfm
+        self._attributes[ATTR_CMHR] = metrics.cmh
+        self._attributes[ATTR_DB] = metrics.db
+        self._attributes[ATTR_WATTS] = metrics.watts
 
-        self._attributes[ATTR_CFM] = cfm
-        self._attributes[ATTR_CMHR] = cmh
-
-        # if sound level (dB) is defined for the speed, include it in attributes
-        self._attributes[ATTR_DB] = behavior.get(ATTR_DB)
-        self._attributes[ATTR_WATTS] = behavior.get('watts')
+        # rated airflow from the 5/UNI controller table for the selected coding switch
+        if self._controller is not None:
+            self._attributes[ATTR_CONTROLLER_CFM] = self._controller.code.cfm_for(speed)
 
     @property
     def name(self) -> str:
         """Return the name of the fan."""
         return self._name
 
+    @property
+    def _state_speed(self) -> str | None:
+        """Return the speed to report (the target while a non-blocking change is pending)."""
+        return self._pending_speed or self._current_speed
+
     @property
     def percentage(self) -> int | None:
         """Return the current speed as a percentage."""
-        if self._current_speed is None:
+        speed = self._state_speed
+        if speed is None:
             return None
-        if self._current_speed == SPEED_OFF:
-            return 0
-        return ordered_list_item_to_percentage(self._percentage_speeds, self._current_speed)
+        return self._profile.speed_percentages.get(speed)
 
     @property
     def supported_features(self) -> FanEntityFeature:
         """Return the supported features of this fan."""
         features = FanEntityFeature.SET_SPEED | FanEntityFeature.TURN_ON
-        if SPEED_OFF in self._fan_speeds:
+        if SPEED_OFF in self._profile.fan_speeds:
             features |= FanEntityFeature.TURN_OFF
         if self._preset_modes:
             features |= FanEntityFeature.PRESET_MODE
@@ -403,33 +443,27 @@ class LUNOSFan(FanEntity):
     @property
     def speed_count(self) -> int:
         """Return the number of speeds the fan supports."""
-        return len(self._percentage_speeds)
+        return self._profile.speed_count
 
     async def async_set_percentage(self, percentage: int) -> None:
         """Set the speed of the fan as a percentage."""
         # Manually setting a percentage must disable any set preset mode.
         self._preset_mode = None
 
-        if percentage <= 0:
-            if SPEED_OFF in self._fan_speeds:
-                await self._async_set_named_speed(SPEED_OFF)
-                return
-            # Hardware doesn't support off: map 0% to lowest available speed.
-            await self._async_set_named_speed(self._percentage_speeds[0])
-            return
-
-        speed = percentage_to_ordered_list_item(self._percentage_speeds, percentage)
+        # 0% is OFF, or the lowest available speed if the hardware doesn't support off
+        speed = self._profile.speed_for_percentage(percentage)
         LOG.debug('Setting %s%% -> %s', percentage, speed)
         await self._async_set_named_speed(speed)
 
     @property
     def is_on(self) -> bool:
-        """Return true if entity is on."""
-        return self._current_speed != SPEED_OFF
+        """Return true if entity is on (an unknown speed is not on)."""
+        speed = self._state_speed
+        return speed is not None and speed != SPEED_OFF
 
     async def async_turn_off(self, **_kwargs: Any) -> None:
         """Turn the fan off."""
-        if SPEED_OFF not in self._fan_speeds:
+        if SPEED_OFF not in self._profile.fan_speeds:
             LOG.warning(
                 "LUNOS '%s' hardware is not configured to support turning off!",
                 self._name,
@@ -456,7 +490,7 @@ class LUNOSFan(FanEntity):
             # No args: restore last non-off speed, or fall back to configured default.
             target_speed = self._last_non_off_speed or self._default_speed
             if target_speed == SPEED_OFF:
-                target_speed = self._percentage_speeds[0]
+                target_speed = self._profile.percentage_speeds[0]
             await self._async_set_named_speed(target_speed)
 
     @property
@@ -475,7 +509,7 @@ class LUNOSFan(FanEntity):
         Note: For backward compatibility, we still accept speed names here, but
         we do not advertise them via preset_modes.
         """
-        if preset_mode in self._fan_speeds:
+        if preset_mode in self._profile.fan_speeds:
             # Backward compatible: treat speed names as a direct speed request.
             self._preset_mode = None
             await self._async_set_named_speed(preset_mode)
@@ -504,13 +538,14 @@ class LUNOSFan(FanEntity):
             LOG.error(
                 "Ventilation mode '%s' not supported: %s",
                 vent_mode,
-                self._vent_modes,
+                self._profile.vent_modes,
             )
             return
 
         self._vent_mode = vent_mode
         self._preset_mode = vent_mode
         self._attributes[ATTR_VENT_MODE] = vent_mode
+        self.async_write_ha_state()
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -518,37 +553,20 @@ class LUNOSFan(FanEntity):
         return self._attributes
 
     def _determine_current_relay_speed(self) -> str | None:
-        """Probe W1/W2 relays for current states and then match to a speed."""
-        w1 = self.hass.states.get(self._relay_w1)
-        if not w1:
-            LOG.warning(
-                'W1 entity %s not found, cannot determine %s LUNOS speed.',
-                self._relay_w1,
-                self._name,
-            )
-            return None
-
-        w2 = self.hass.states.get(self._relay_w2)
-        if not w2:
-            LOG.warning(
-                'W2 entity %s not found, cannot determine %s LUNOS speed.',
-                self._relay_w2,
-                self._name,
-            )
+        """Return the speed the coordinator derived from the W1/W2 relays."""
+        data = self.coordinator.data
+        speed = data.current_speed if data is not None else None
+        if speed is None:
             return None
 
-        # determine the current speed based on relay W1/W2 states
-        current_state = [w1.state, w2.state]
-        for speed, switch_state in self._relay_state_map.items():
-            if current_state == switch_state:
-                LOG.info("LUNOS '%s' speed=%s (W1/W2=%s)", self._name, speed, current_state)
-                return speed
+        # turbo is entered by a W2 flip and leaves the relays in the HIGH position
+        if speed == SPEED_HIGH and self._current_speed == SPEED_TURBO:
+            speed = SPEED_TURBO
 
         LOG.info(
-            'Could not determine current speed from W1/W2 relays: %s',
-            current_state,
+            "LUNOS '%s' speed=%s (W1/W2=%s/%s)", self._name, speed, data.w1_state, data.w2_state
         )
-        return None
+        return speed
 
     def _update_speed(self, speed: str | None) -> None:
         """Update the current speed (+ refresh any dependent attributes)."""
@@ -566,39 +584,52 @@ class LUNOSFan(FanEntity):
             self._current_speed,
         )
 
-    @property
-    def _percentage_speeds(self) -> list[str]:
-        """Return list of speeds excluding OFF for percentage calculations."""
-        # ordered_list_item_to_percentage expects OFF to be represented by 0% and
-        # not included in the ordered list.
-        return [s for s in self._fan_speeds if s != SPEED_OFF]
-
-    def _record_relay_state_change(self) -> None:
-        """Record the timestamp of the last relay state change."""
-        self._last_relay_change = time.time()
-
-    async def _throttle_state_changes(self, required_delay: float) -> bool:
-        """Ensure minimum delay between relay state changes."""
-        if self._last_relay_change is None:
+    async def _throttle_state_changes(self, relays: Iterable[int], sequence: bool = False) -> bool:
+        """Wait until relays can be written without the controller reading a toggle sequence.
+
+        A relay write waits only while its edge would complete a mode sequence with
+        the edges still inside the controller's detection window (plus the relay's
+        latency); a flip sequence waits for the relay's window to be empty. Returns
+        True if it had to wait.
+        """
+        latency = self.coordinator.relay_latency
+        entity_ids = (self._relay_w1, self._relay_w2)
+        margins = {relay: latency.edge_margin(entity_ids[relay]) for relay in set(relays)}
+        delay = self.coordinator.controller_shadow.delay_before(margins, sequence=sequence)
+        if delay <= 0:
             return False
 
-        time_passed = time.time() - self._last_relay_change
-        if time_passed < required_delay:
-            delay = max(0, required_delay - time_passed)
-            LOG.warning(
-                "To avoid LUNOS '%s' controller race conditions, "
-                'sleeping %s seconds before changing relay.',
-                self._name,
-                delay,
-            )
-            await asyncio.sleep(delay)
-            return True
-        return False
+        LOG.warning(
+            "To avoid LUNOS '%s' controller race conditions, "
+            'sleeping %.2f seconds before changing relay.',
+            self._name,
+            delay,
+        )
+        await asyncio.sleep(delay)
+        return True
+
+    async def _async_flip_relay(self, name: str, entity_id: str, methods: Sequence[str]) -> None:
+        """Send a timed flip sequence to a relay, spaced by the relay's measured latency."""
+        await self.coordinator.toggle_sequencer.async_run(
+            name,
+            [partial(self.async_call_switch_service, method, entity_id) for method in methods],
+            self.coordinator.relay_latency.flip_interval(entity_id, len(methods)),
+        )
+
+    @property
+    def _command_queue(self) -> LunosCommandQueue:
+        """Return the coordinator owned queue serializing this fan's relay writes."""
+        return self.coordinator.command_queue
 
     async def _async_set_named_speed(self, speed: str) -> None:
-        """Set the fan speed using the integration's internal named speeds."""
-        switch_states = self._relay_state_map.get(speed)
-        if not switch_states:
+        """Set the fan speed using the integration's internal named speeds.
+
+        Requests go through the command queue, so if several arrive while a
+        change is being applied only the most recent one is written. In
+        non-blocking mode this returns once the request is queued and the
+        target speed is shown optimistically until the relays are written.
+        """
+        if speed not in self._profile.relay_states:
             LOG.warning(
                 "LUNOS '%s' DOES NOT support speed '%s'; ignoring speed change.",
                 self._name,
@@ -606,52 +637,164 @@ class LUNOSFan(FanEntity):
             )
             return
 
-        # save the pending relay states (in case multiple changes are queued up in
-        # event loop only the most recent should "win")
-        self._pending_relay_w1 = switch_states[0]
-        self._pending_relay_w2 = switch_states[1]
+        if not self._entry.data.get(CONF_NON_BLOCKING, DEFAULT_NON_BLOCKING):
+            await self._async_run_command(
+                self._command_queue.async_request_speed(
+                    speed, partial(self._async_apply_speed, speed)
+                )
+            )
+            return
 
-        # wait after any relay was last changed to avoid LUNOS controller
-        # misinterpreting toggles
-        #
-        # FIXME: there really should be a queue of changes with a delay between each
-        # before application instead of this (and clearing out of old changes IF any
-        # are queued up). This existing
-        # implementation here does not work if someone starts clicking changes again and again
-        await self._throttle_state_changes(MINIMUM_DELAY_BETWEEN_STATE_CHANGES)
-
-        if self._pending_relay_w1 is not None:
-            LOG.info(
-                "Changing LUNOS '%s' speed: %s -> %s",
-                self._name,
-                self._current_speed,
-                speed,
+        self._pending_requests += 1
+        self._pending_speed = speed
+        self._attributes[ATTR_PENDING] = True
+        self._attributes[ATTR_PENDING_SPEED] = speed
+        self._update_speed_attributes()
+        self.async_write_ha_state()
+
+        self.hass.async_create_background_task(
+            self._async_apply_pending_speed(speed), f'lunos_set_speed_{self._attr_unique_id}'
+        )
+
+    async def _async_apply_pending_speed(self, speed: str) -> None:
+        """Queue a non-blocking speed change and clear the pending state once applied."""
+        try:
+            await self._command_queue.async_request_speed(
+                speed, partial(self._async_apply_speed, speed)
             )
-            await self.set_relay_switch_state(self._relay_w1, self._pending_relay_w1)
-            await self.set_relay_switch_state(self._relay_w2, self._pending_relay_w2)
-            self._pending_relay_w1 = self._pending_relay_w2 = None
+        except Exception as err:  # already logged by the command queue
+            LOG.debug("LUNOS '%s' dropped pending speed %s: %s", self._name, speed, err)
+        finally:
+            self._pending_requests -= 1
+            if not self._pending_requests:
+                self._pending_speed = None
+                self._attributes[ATTR_PENDING] = False
+                self._attributes.pop(ATTR_PENDING_SPEED, None)
+                self._update_speed_attributes()
+                self.async_write_ha_state()
+
+    async def _async_run_command(self, command: Awaitable[None]) -> None:
+        """Wait for a queued command, then write the resulting entity state once.
+
+        Relay changes reported while the queue is busy are not written (see
+        _handle_coordinator_update), so the state is written here instead.
+        """
+        try:
+            await command
+        finally:
+            self.async_write_ha_state()
+
+    def plan_speed_change(self, speed: str, diff: bool = True) -> TransitionPlan:
+        """Plan the relay writes for a speed from the relays' current states.
+
+        With diff=False (relay states known to be stale) both relays are written.
+        """
+        current = None
+        if diff:
+            states: list[str | None] = []
+            for relay, entity_id in enumerate((self._relay_w1, self._relay_w2)):
+                state = self.hass.states.get(entity_id)
+                if self._commanded[relay] is not None:
+                    states.append(self._commanded[relay])
+                else:
+                    states.append(state.state if state is not None else None)
+            current = (states[0], states[1])
+        return self._profile.plan_transition(current, speed)
+
+    def _relay_index(self, entity_id: str | None) -> int | None:
+        """Return 0 for the W1 relay entity, 1 for W2, otherwise None."""
+        if entity_id == self._relay_w1:
+            return 0
+        if entity_id == self._relay_w2:
+            return 1
+        return None
+
+    async def _async_apply_speed(self, speed: str, diff: bool = True) -> None:
+        """Write the relays for a speed (only called from the command queue)."""
+        # the relays already read HIGH while in turbo, so step through MEDIUM to leave it
+        if self._current_speed == SPEED_TURBO and speed == SPEED_HIGH:
+            await self._async_apply_speed(SPEED_MEDIUM, diff)
+
+        # only the relays not already in their target state are written
+        plan = self.plan_speed_change(speed, diff)
+
+        # wait after any relay was last changed to avoid LUNOS controller
+        # misinterpreting toggles (and re-plan, the relays may have changed meanwhile)
+        if plan.writes and await self._throttle_state_changes(w.relay for w in plan.writes):
+            plan = self.plan_speed_change(speed, diff)
+
+        LOG.info(
+            "Changing LUNOS '%s' speed: %s -> %s (%s)",
+            self._name,
+            self._current_speed,
+            speed,
+            plan,
+        )
+        relays = (self._relay_w1, self._relay_w2)
+        for write in plan.writes:
+            await self.set_relay_switch_state(relays[write.relay], write.state)
+
+        # a flip while already in turbo could be read as leaving turbo or as a mode toggle
+        # (unless the relays were just rewritten, e.g. restoring turbo after a macro)
+        if speed == SPEED_TURBO and (self._current_speed != SPEED_TURBO or not diff):
+            await self._async_flip_to_turbo()
 
         # update our internal state immediately (instead of waiting for callback
         # relays have changed)
         self._update_speed(speed)
 
-    async def async_set_speed(self, speed: str) -> None:
-        """Backward-compatible speed setter (deprecated by HA)."""
+    async def _async_flip_to_turbo(self) -> None:
+        """Flip W2 off/on within 3 seconds (relays at HIGH) to enable turbo mode."""
+        # let a W2 change to HIGH settle so the flip is not read as part of it
+        await self._throttle_state_changes((W2,), sequence=True)
+
+        LOG.info("Enabling turbo mode for LUNOS '%s'", self._name)
+        await self._async_flip_relay('turbo', self._relay_w2, (SERVICE_TURN_OFF, SERVICE_TURN_ON))
+
+    async def async_set_airflow(
+        self, cmh: float | None = None, cfm: float | None = None
+    ) -> ServiceResponse:
+        """Set the lowest speed that delivers the target airflow (for all fans of the entry)."""
+        target_cmh = cmh if cmh is not None else (cfm or 0) * CFM_TO_CMH
+        found = self._profile.speed_for_airflow(target_cmh)
+        if found is None:
+            raise ServiceValidationError(
+                f"LUNOS '{self._name}' coding {self._profile.coding} has no airflow data"
+            )
+
+        speed, target_met = found
+        if not target_met:
+            LOG.warning(
+                "LUNOS '%s' cannot deliver %.1f m³/h; using %s",
+                self._name,
+                target_cmh,
+                speed,
+            )
+
+        # manually setting a speed must disable any set preset mode
+        self._preset_mode = None
         await self._async_set_named_speed(speed)
 
-    async def async_update(self) -> None:
-        """Determine current state of the fan by inspecting relay states."""
-        LOG.debug('%s async_update() called', self._name)
+        metrics = self._profile.metrics_for(speed)
+        return {
+            ATTR_SPEED: speed,
+            ATTR_CMHR: metrics.cmh,
+            ATTR_CFM: metrics.cfm,
+            'target_met': target_met,
+        }
 
-        # delay reading allow any pending switch changes to be applied
-        await asyncio.sleep(1.0)
+    async def async_set_speed(self, speed: str) -> None:
+        """Backward-compatible speed setter (deprecated by HA)."""
+        await self._async_set_named_speed(speed)
 
-        actual_speed = self._determine_current_relay_speed()
-        LOG.debug('%s async_update() = %s', self._name, actual_speed)
-        self._update_speed(actual_speed)
+    async def async_call_switch_service(
+        self, method: str, relay_entity_id: str, confirm: bool = False
+    ) -> None:
+        """Call the appropriate service for the relay entity.
 
-    async def async_call_switch_service(self, method: str, relay_entity_id: str) -> None:
-        """Call the appropriate service for the relay entity."""
+        With confirm, wait for the relay to report the new state (retrying if it
+        does not); timed flip sequences are sent without waiting.
+        """
         domain = relay_entity_id.split('.', 1)[0]
         # Backward-compatible: original versions assumed relays were always switch entities.
         # Many Zigbee relays can also appear as light entities, so we route the service call
@@ -666,16 +809,61 @@ class LUNOSFan(FanEntity):
             domain = 'switch'
 
         LOG.info('Calling %s %s for %s', domain, method, relay_entity_id)
-        await self.hass.services.async_call(domain, method, {'entity_id': relay_entity_id}, False)
-        self._record_relay_state_change()
+        relay = self._relay_index(relay_entity_id)
+        shadow = self.coordinator.controller_shadow
+        try:
+            if confirm and method in COMMANDED_STATES:
+                # the coordinator records the relay's echo as the edge, if it changed at all
+                await self.coordinator.relay_writer.async_write(
+                    domain, method, relay_entity_id, COMMANDED_STATES[method]
+                )
+            else:
+                changes = relay is not None and self._command_changes_relay(relay, method)
+                await self.coordinator.relay_writer.async_send(domain, method, relay_entity_id)
+                if changes and relay is not None:
+                    shadow.observe_command(relay)  # counted until the relay echoes it
+        except RelayWriteError:
+            if relay is not None:
+                self._commanded[relay] = None  # the relay's actual state is unknown
+                shadow.observe_command(relay)  # it may have switched without confirming
+            raise
+
+        if relay is not None:
+            self._commanded[relay] = COMMANDED_STATES.get(method)  # toggles are not tracked
+
+    def _command_changes_relay(self, relay: int, method: str) -> bool:
+        """Return True if a relay command changes the relay (toggles always do)."""
+        commanded = COMMANDED_STATES.get(method)
+        if commanded is None:
+            return True
+        current = self._commanded[relay]
+        if current is None:
+            state = self.hass.states.get((self._relay_w1, self._relay_w2)[relay])
+            current = state.state if state is not None else None
+        return current != commanded
 
     async def set_relay_switch_state(self, relay_entity_id: str, state: str) -> None:
         """Set the relay to the specified state."""
         method = SERVICE_TURN_ON if state == STATE_ON else SERVICE_TURN_OFF
-        await self.async_call_switch_service(method, relay_entity_id)
+        await self.async_call_switch_service(method, relay_entity_id, confirm=True)
+
+    async def toggle_relay_to_set_lunos_mode(
+        self, entity_id: str, script: str | None = None
+    ) -> None:
+        """Toggle relay multiple times to set LUNOS mode.
+
+        With a device script (script or button entity) the relay device runs the
+        timed flips itself and only the command starting it is sent from here.
+        """
+        relay = self._relay_index(entity_id)
+        if relay is None:
+            LOG.error(
+                "LUNOS '%s' cannot set a mode by toggling %s: not one of its W1/W2 relays",
+                self._name,
+                entity_id,
+            )
+            return
 
-    async def toggle_relay_to_set_lunos_mode(self, entity_id: str) -> None:
-        """Toggle relay multiple times to set LUNOS mode."""
         saved_speed = self._current_speed
 
         # LUNOS requires flipping switches on/off 3 times to set mode
@@ -687,21 +875,52 @@ class LUNOSFan(FanEntity):
             SERVICE_TURN_OFF,
             SERVICE_TURN_ON,
         ]
-        for method in toggle_methods:
-            await self.async_call_switch_service(method, entity_id)
-            await asyncio.sleep(DELAY_BETWEEN_FLIPS)
-
-        # restore speed state back to the previous state before toggling relay
-        if saved_speed is not None:
-            await self._async_set_named_speed(saved_speed)
+        await self._throttle_state_changes((relay,), sequence=True)
+        try:
+            if script:
+                await self._async_start_device_script(relay, script)
+            else:
+                await self._async_flip_relay(
+                    f'{RELAY_NAMES[relay]} toggle', entity_id, toggle_methods
+                )
+        finally:
+            # restore speed state back to the previous state before toggling relay
+            # (part of the same macro, so applied directly rather than queued); the
+            # relay states may not have caught up with the toggles, so write both
+            if saved_speed is not None:
+                await self._async_apply_speed(saved_speed, diff=False)
+
+    async def _async_start_device_script(self, relay: int, script: str) -> None:
+        """Start a flip sequence that runs on the relay device (ESPHome, Shelly, ...)."""
+        domain = script.split('.', 1)[0]
+        service = 'press' if domain == 'button' else SERVICE_TURN_ON
+        LOG.info("Starting %s for LUNOS '%s' %s toggle", script, self._name, RELAY_NAMES[relay])
+        await self.hass.services.async_call(domain, service, {'entity_id': script}, blocking=True)
+
+        # the device flips the relay from now on: its state is unknown here, and
+        # later writes must wait until the whole sequence left the detection window
+        self._commanded[relay] = None
+        self.coordinator.controller_shadow.observe_device_sequence(
+            relay, time.monotonic() + DEVICE_SCRIPT_DURATION
+        )
 
     async def async_clear_filter_reminder(self) -> None:
         """Clear the filter change reminder light."""
+        await self._async_run_command(
+            self._command_queue.async_run_macro(
+                SERVICE_CLEAR_FILTER_REMINDER, self._async_clear_filter_reminder_macro
+            )
+        )
+
+    async def _async_clear_filter_reminder_macro(self) -> None:
+        """Toggle W1 to clear the filter reminder (run atomically by the command queue)."""
         LOG.info("Clearing the filter change reminder light for LUNOS '%s'", self._name)
 
         # toggling W1 many times within 3 seconds instructs the LUNOS controller
         # to clear the filter warning light
-        await self.toggle_relay_to_set_lunos_mode(self._relay_w1)
+        await self.toggle_relay_to_set_lunos_mode(
+            self._relay_w1, self._entry.data.get(CONF_FILTER_RESET_SCRIPT)
+        )
 
     # In LUNOS summer vent mode, the reversing time for the fans is extended to 1 hour.
     # The fan will run for 1 hour in the supply air mode and the following hour in
@@ -709,7 +928,7 @@ class LUNOSFan(FanEntity):
     # nighttime to allow cooler air into the house.
     def supports_summer_ventilation(self) -> bool:
         """Return True if this fan supports summer ventilation mode."""
-        return VENT_SUMMER in self._vent_modes
+        return VENT_SUMMER in self._profile.vent_modes
 
     async def async_turn_on_summer_ventilation(self) -> None:
         """Enable summer ventilation mode."""
@@ -717,11 +936,24 @@ class LUNOSFan(FanEntity):
             LOG.warning("LUNOS '%s' DOES NOT support summer vent", self._name)
             return
 
+        await self._async_run_command(
+            self._command_queue.async_run_macro(
+                SERVICE_TURN_ON_SUMMER_VENTILATION, self._async_summer_ventilation_on_macro
+            )
+        )
+
+    async def _async_summer_ventilation_on_macro(self) -> None:
+        """Toggle W2 to enable summer ventilation (run atomically by the command queue)."""
         LOG.info("Enabling summer vent mode for LUNOS '%s'", self._name)
         # toggling W2 many times within 3 seconds instructs the LUNOS controller
         # to turn on summer ventilation mode
-        await self.toggle_relay_to_set_lunos_mode(self._relay_w2)
+        await self.toggle_relay_to_set_lunos_mode(
+            self._relay_w2, self._entry.data.get(CONF_SUMMER_VENT_SCRIPT)
+        )
 
+        # from now on a W2 off/on leaves summer ventilation (also when a device script
+        # ran the sequence and the shadow saw none of its edges)
+        self.coordinator.controller_shadow.summer_vent = True
         self._vent_mode = VENT_SUMMER
         self._preset_mode = VENT_SUMMER
         self._attributes[ATTR_VENT_MODE] = VENT_SUMMER
@@ -731,15 +963,24 @@ class LUNOSFan(FanEntity):
         if not self.supports_summer_ventilation():
             return
 
-        # wait after any relay was last changed to avoid LUNOS controller misinterpreting toggles
-        await self._throttle_state_changes(MINIMUM_DELAY_BETWEEN_STATE_CHANGES)
+        await self._async_run_command(
+            self._command_queue.async_run_macro(
+                SERVICE_TURN_OFF_SUMMER_VENTILATION, self._async_summer_ventilation_off_macro
+            )
+        )
+
+    async def _async_summer_ventilation_off_macro(self) -> None:
+        """Toggle W2 once to leave summer ventilation (run atomically by the command queue)."""
+        # wait until a recent W2 change cannot be read as part of the toggle
+        await self._throttle_state_changes((W2,), sequence=True)
 
         LOG.info("Disabling summer vent mode for LUNOS '%s'", self._name)
 
         # toggle W2 relay once to clear summer ventilation (and return to previous speed)
-        await self.async_call_switch_service(SERVICE_TOGGLE, self._relay_w2)
-        await asyncio.sleep(DELAY_BETWEEN_FLIPS)
-        await self.async_call_switch_service(SERVICE_TOGGLE, self._relay_w2)
+        await self._async_flip_relay(
+            'summer vent off', self._relay_w2, (SERVICE_TOGGLE, SERVICE_TOGGLE)
+        )
+        self.coordinator.controller_shadow.summer_vent = False
 
         self._vent_mode = DEFAULT_VENT_MODE
         self._preset_mode = DEFAULT_VENT_MODE
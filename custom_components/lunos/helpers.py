@@ -3,25 +3,237 @@
 from __future__ import annotations
 
 import logging
+import asyncio
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import yaml
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    CODINGS_OVERLAY_FILENAME,
+    CODINGS_PATH,
+    COMPILED_CODINGS_PATH,
+    CONTROLLERS_PATH,
+    DOMAIN,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .controller import ControllerIndex
 
 LOG = logging.getLogger(__name__)
 
+type CatalogMtime = tuple[float | None, ...]
+
+
+@dataclass
+class LunosCodingCache:
+    """Domain-wide cache of the LUNOS coding catalog shared by all entries and flows."""
+
+    codings: dict[str, Any] | None = None
+    controller_index: ControllerIndex | None = None
+    mtime: CatalogMtime | None = None
+    loading: asyncio.Task[dict[str, Any]] | None = None
+    loads: int = 0
+
 
-def load_lunos_codings() -> dict[str, Any]:
-    """Load LUNOS controller coding configurations from YAML file."""
-    config_path = Path(__file__).parent / 'lunos-codings.yaml'
+DATA_CODING_CACHE: HassKey[LunosCodingCache] = HassKey(f'{DOMAIN}_coding_cache')
+
+
+def load_lunos_codings(artifact: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Load LUNOS controller coding configurations.
+
+    Uses the precompiled JSON catalog (or the already loaded artifact) and only
+    falls back to parsing the YAML source when the artifact is missing or stale.
+    """
+    from . import catalog  # loaded in the executor, only once the catalog is needed
+
+    if artifact is None:
+        artifact = catalog.load_compiled_catalog(COMPILED_CODINGS_PATH)
+    codings = catalog.compiled_codings(artifact, CODINGS_PATH) if artifact else None
+    if codings is not None:
+        return codings
+
+    config_path = CODINGS_PATH
     try:
-        with config_path.open() as file:
-            return yaml.safe_load(file) or {}
+        return catalog.normalize_codings(catalog.load_yaml_codings(config_path))
     except Exception:
         LOG.exception('Failed to load LUNOS codings from %s', config_path)
         return {}
 
 
+def load_lunos_controllers(artifact: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Load the 5/UNI controller DIP switch and coding tables."""
+    from . import catalog
+
+    if artifact is None:
+        artifact = catalog.load_compiled_catalog(COMPILED_CODINGS_PATH)
+    controllers = catalog.compiled_controllers(artifact, CONTROLLERS_PATH) if artifact else None
+    if controllers is not None:
+        return controllers
+
+    try:
+        return catalog.normalize_controllers(catalog.load_yaml_codings(CONTROLLERS_PATH))
+    except Exception:
+        LOG.exception('Failed to load LUNOS controller tables from %s', CONTROLLERS_PATH)
+        return {}
+
+
+def apply_codings_overlay(codings: dict[str, Any], overlay_path: Path) -> dict[str, Any]:
+    """Deep-merge the user's codings overlay (if present) over the built-in catalog.
+
+    Overlay codings that fail validation once merged are logged and skipped so
+    a typo in the user's file cannot break the built-in codings.
+    """
+    from . import catalog
+
+    try:
+        overlay = catalog.load_yaml_codings(overlay_path)
+    except FileNotFoundError:
+        return codings
+    except Exception:
+        LOG.exception('Failed to load LUNOS codings overlay from %s', overlay_path)
+        return codings
+
+    if not isinstance(overlay, dict):
+        LOG.error('Ignoring LUNOS codings overlay %s: expected a mapping of codings', overlay_path)
+        return codings
+
+    merged = catalog.merge_codings(codings, catalog.normalize_codings(overlay))
+    for coding in overlay:
+        result = catalog.validate_codings({coding: merged[coding]})
+        if not result.ok:
+            LOG.error(
+                'Ignoring coding %s from %s: %s', coding, overlay_path, '; '.join(result.errors)
+            )
+            if coding in codings:
+                merged[coding] = codings[coding]
+            else:
+                del merged[coding]
+
+    LOG.info('Merged %d LUNOS codings from %s', len(overlay), overlay_path)
+    return merged
+
+
+def _mtime(path: Path) -> float | None:
+    """Return the modification time of a file (None if missing)."""
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _codings_mtime(overlay_path: Path | None = None) -> CatalogMtime:
+    """Return the modification times of the catalog sources, artifact and user overlay."""
+    return (
+        _mtime(CODINGS_PATH),
+        _mtime(CONTROLLERS_PATH),
+        _mtime(COMPILED_CODINGS_PATH),
+        _mtime(overlay_path) if overlay_path is not None else None,
+    )
+
+
+def _load_codings_if_changed(
+    cached_mtime: CatalogMtime | None,
+    overlay_path: Path | None = None,
+) -> tuple[CatalogMtime, dict[str, Any] | None, ControllerIndex | None]:
+    """Reload (and re-merge) the catalog only when a file changed since cached_mtime.
+
+    Returns the current mtime and the freshly loaded codings and controller
+    index, or None for both when the cached copy is still current.
+    """
+    from . import catalog
+    from .controller import ControllerIndex
+
+    mtime = _codings_mtime(overlay_path)
+    if cached_mtime is not None and mtime == cached_mtime:
+        return mtime, None, None
+
+    # the codings and controller tables share one artifact; read and parse it once
+    artifact = catalog.load_compiled_catalog(COMPILED_CODINGS_PATH)
+    codings = load_lunos_codings(artifact)
+    if overlay_path is not None:
+        codings = apply_codings_overlay(codings, overlay_path)
+    return mtime, codings, ControllerIndex(load_lunos_controllers(artifact))
+
+
+async def _async_refresh_codings(
+    hass: HomeAssistant, cache: LunosCodingCache, force: bool = False
+) -> dict[str, Any]:
+    """Refresh the cached catalog in the executor (parsing only when stale or forced)."""
+    try:
+        cached_mtime = cache.mtime if cache.codings is not None and not force else None
+        overlay_path = Path(hass.config.path(CODINGS_OVERLAY_FILENAME))
+        mtime, codings, controller_index = await hass.async_add_executor_job(
+            _load_codings_if_changed, cached_mtime, overlay_path
+        )
+        if codings is not None:
+            cache.codings = codings
+            cache.controller_index = controller_index
+            cache.mtime = mtime
+            cache.loads += 1
+            LOG.debug('Loaded %d LUNOS codings (mtime=%s)', len(codings), mtime)
+        return cache.codings or {}
+    finally:
+        cache.loading = None
+
+
+async def async_get_lunos_codings(hass: HomeAssistant, force: bool = False) -> dict[str, Any]:
+    """Return the shared LUNOS coding catalog, loading it at most once at a time.
+
+    Concurrent callers (config entries being set up, config and options flows)
+    all await the same in-flight load instead of each parsing the YAML file.
+    The user's <config>/lunos_codings.yaml overlay is merged in once per change
+    of any of the catalog files. With force, the files are re-read even if
+    their mtimes are unchanged (e.g. for the reload_codings service).
+    """
+    cache = hass.data.get(DATA_CODING_CACHE)
+    if cache is None:
+        cache = hass.data[DATA_CODING_CACHE] = LunosCodingCache()
+
+    if force and cache.loading is not None:
+        # let the in-flight load finish so the forced reload is not merged into it
+        await asyncio.shield(cache.loading)
+
+    if cache.loading is None:
+        cache.loading = hass.async_create_task(
+            _async_refresh_codings(hass, cache, force), 'lunos_load_codings'
+        )
+
+    # shield so a cancelled caller does not cancel the load shared by the others
+    return await asyncio.shield(cache.loading)
+
+
+async def async_get_controller_index(hass: HomeAssistant) -> ControllerIndex:
+    """Return the shared 5/UNI controller index (loaded with the coding catalog)."""
+    from .controller import ControllerIndex
+
+    await async_get_lunos_codings(hass)
+    index = hass.data[DATA_CODING_CACHE].controller_index
+    return index if index is not None else ControllerIndex({})
+
+
+def coding_for_controller_code(
+    coding_config: dict[str, Any], code: str, preferred: str | None = None
+) -> str | None:
+    """Return the catalog coding for a physical controller coding switch position.
+
+    The preferred coding is kept if it already matches the switch position,
+    since several codings (e.g. regional variants) share the same position.
+    """
+    if (
+        preferred is not None
+        and str(coding_config.get(preferred, {}).get('controller_coding')) == code
+    ):
+        return preferred
+    for coding, config in coding_config.items():
+        if str(config.get('controller_coding')) == code:
+            return coding
+    return None
+
+
 def get_coding_options(coding_config: dict[str, Any]) -> list[str]:
     """Get list of available controller coding options."""
     return list(coding_config.keys())
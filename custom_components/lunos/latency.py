@@ -0,0 +1,123 @@
+"""Per-relay command-to-echo latency calibration.
+
+Relays differ widely in how fast they act on a command: a Wi-Fi relay echoes
+its new state in tens of milliseconds, a Zigbee relay may take more than half
+a second. Every confirmed write measures the round trip from the service call
+to the state echo; a rolling window of samples per relay entity gives a
+percentile estimate that is persisted across restarts. Flip spacing and the
+margin allowed after a relay change are derived from it instead of one fixed
+value for all relays.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from math import ceil
+from typing import TYPE_CHECKING, Any, Final
+
+from .const import (
+    DELAY_BETWEEN_FLIPS,
+    DOMAIN,
+    MINIMUM_DELAY_BETWEEN_STATE_CHANGES,
+    TOGGLE_WINDOW,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+LOG = logging.getLogger(__name__)
+
+STORAGE_VERSION: Final = 1
+
+SAMPLES: Final = 32  # rolling window of round trips kept per relay
+PERCENTILE: Final = 0.9
+MIN_FLIP_INTERVAL: Final = 0.05  # never flip faster than this, even for the fastest relay
+SAVE_DELAY: Final = 30  # seconds to batch sample writes to storage
+
+
+class RelayLatency:
+    """Rolling round-trip latency estimates for one controller's relays."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the estimates (load them with async_load)."""
+        from homeassistant.helpers.storage import Store
+
+        self._store: Store[dict[str, list[float]]] = Store(
+            hass, STORAGE_VERSION, f'{DOMAIN}.{entry_id}.relay_latency'
+        )
+        self._samples: dict[str, deque[float]] = {}
+
+    async def async_load(self) -> None:
+        """Restore the samples measured before the last restart."""
+        stored = await self._store.async_load() or {}
+        for entity_id, samples in stored.items():
+            self._samples[entity_id] = deque(samples, maxlen=SAMPLES)
+
+    async def async_remove(self) -> None:
+        """Delete the stored samples (the config entry was removed)."""
+        await self._store.async_remove()
+
+    def record(self, entity_id: str, seconds: float) -> None:
+        """Add a measured command-to-echo round trip."""
+        self._samples.setdefault(entity_id, deque(maxlen=SAMPLES)).append(round(seconds, 4))
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def estimate(self, entity_id: str) -> float | None:
+        """Return the percentile round trip of a relay (None until it was measured)."""
+        samples = self._samples.get(entity_id)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[ceil(PERCENTILE * len(ordered)) - 1]
+
+    def flip_interval(self, entity_id: str, flips: int) -> float:
+        """Return the spacing for a flip sequence on a relay.
+
+        Each flip waits for the relay to have acted on the previous one, but the
+        whole sequence (including the last flip's latency) must still reach the
+        controller within its detection window. A relay too slow for that gets
+        the shortest spacing and a warning: the controller may miss the sequence.
+        """
+        latency = self.estimate(entity_id)
+        if latency is None:
+            return DELAY_BETWEEN_FLIPS
+        interval = max(MIN_FLIP_INTERVAL, latency)
+        if flips > 1:
+            interval = min(interval, (TOGGLE_WINDOW - latency) / (flips - 1))
+            if interval < MIN_FLIP_INTERVAL:
+                LOG.warning(
+                    'Relay %s latency of %.2f seconds is too high to fit %d flips into the '
+                    "LUNOS controller's %.1f second window; the mode change may not register",
+                    entity_id,
+                    latency,
+                    flips,
+                    TOGGLE_WINDOW,
+                )
+        return max(MIN_FLIP_INTERVAL, interval)
+
+    def edge_margin(self, entity_id: str) -> float:
+        """Return the time to allow on top of the detection window after a relay change.
+
+        A command may reach the controller up to the relay's latency after it
+        was sent; unmeasured relays get the historical one second margin.
+        """
+        latency = self.estimate(entity_id)
+        if latency is None:
+            return MINIMUM_DELAY_BETWEEN_STATE_CHANGES - TOGGLE_WINDOW
+        return latency
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return the estimates in milliseconds for diagnostics."""
+        return {
+            entity_id: {
+                'samples': len(samples),
+                'latency_ms': round((self.estimate(entity_id) or 0) * 1000, 1),
+            }
+            for entity_id, samples in self._samples.items()
+        }
+
+    def _data_to_save(self) -> dict[str, list[float]]:
+        """Return the samples to persist."""
+        return {entity_id: list(samples) for entity_id, samples in self._samples.items()}
@@ -0,0 +1,150 @@
+"""Direct MQTT transport for W1/W2 relays exposed over MQTT (Tasmota, Zigbee2MQTT, ...).
+
+Writing an MQTT relay through its entity takes a detour through Home
+Assistant's service layer and state machine twice: the switch service publishes
+the command, and the relay's state message updates the entity whose state
+change event is then awaited. With command and state topics configured the
+writer publishes the command itself through Home Assistant's MQTT client and
+takes the echo straight from the relay's state topic.
+
+Relays without topics (or toggle commands) keep using their entity services.
+"""
+
+from __future__ import annotations
+
+import logging
+import asyncio
+from dataclasses import dataclass
+import json
+from typing import TYPE_CHECKING
+
+from homeassistant.const import SERVICE_TURN_OFF, SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .relay import RelayWriter
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+    from homeassistant.components.mqtt import ReceiveMessage
+    from homeassistant.core import HomeAssistant
+
+    from .latency import RelayLatency
+
+LOG = logging.getLogger(__name__)
+
+COMMAND_PAYLOADS = {SERVICE_TURN_ON: 'ON', SERVICE_TURN_OFF: 'OFF'}
+STATE_PAYLOADS = {'ON': STATE_ON, 'OFF': STATE_OFF}
+
+
+@dataclass(frozen=True, slots=True)
+class MqttRelayTopics:
+    """Command and state topics of one relay."""
+
+    command_topic: str
+    state_topic: str
+
+
+def parse_state_payload(payload: str | bytes | bytearray) -> str | None:
+    """Return on/off for an 'ON'/'OFF' payload or a JSON object with a state key."""
+    text = payload if isinstance(payload, str) else payload.decode()
+    text = text.strip()
+    if text.startswith('{'):
+        try:
+            text = str(json.loads(text).get('state', ''))
+        except (ValueError, AttributeError):
+            return None
+    return STATE_PAYLOADS.get(text.upper())
+
+
+class MqttRelayWriter(RelayWriter):
+    """Confirmed relay writes published directly to the relays' MQTT topics."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        topics: Mapping[str, MqttRelayTopics],
+        latency: RelayLatency | None = None,
+    ) -> None:
+        """Initialize the writer; topics maps relay entity ids to their topics."""
+        super().__init__(hass, name, latency=latency)
+        self.topics = dict(topics)
+        self.states: dict[str, str] = {}  # last state reported on each state topic
+        self._echoes: dict[str, tuple[str, asyncio.Future[None]]] = {}
+        self._unsubscribe: list[Callable[[], None]] = []
+
+    async def async_setup(self) -> None:
+        """Subscribe to the relays' state topics."""
+        from homeassistant.components import mqtt
+
+        if not await mqtt.async_wait_for_mqtt_client(self._hass):
+            raise UpdateFailed(f"LUNOS '{self._name}' relays use MQTT, but MQTT is not available")
+
+        for entity_id, topics in self.topics.items():
+            self._unsubscribe.append(
+                await mqtt.async_subscribe(
+                    self._hass, topics.state_topic, self._state_received(entity_id)
+                )
+            )
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Unsubscribe from the state topics."""
+        while self._unsubscribe:
+            self._unsubscribe.pop()()
+
+    async def async_send(self, domain: str, method: str, entity_id: str) -> None:
+        """Publish a command without waiting for the relay's echo."""
+        topics = self.topics.get(entity_id)
+        if topics is None or method not in COMMAND_PAYLOADS:
+            await super().async_send(domain, method, entity_id)
+            return
+        await self._async_publish(topics, method)
+
+    async def _async_write_once(self, domain: str, method: str, entity_id: str, state: str) -> bool:
+        """Publish one command and return True once the state topic reports state."""
+        topics = self.topics.get(entity_id)
+        if topics is None or method not in COMMAND_PAYLOADS:
+            return await super()._async_write_once(domain, method, entity_id, state)
+
+        echo: asyncio.Future[None] = self._hass.loop.create_future()
+        self._echoes[entity_id] = (state, echo)
+        current = self.states.get(entity_id)
+        sent = self._hass.loop.time()
+        try:
+            await self._async_publish(topics, method)
+            if current == state:
+                return True  # already in state, the relay may not report it again
+            async with asyncio.timeout(self.timeout):
+                await echo
+        except TimeoutError:
+            return False
+        finally:
+            self._echoes.pop(entity_id, None)
+
+        self._record_latency(entity_id, sent)
+        return True
+
+    async def _async_publish(self, topics: MqttRelayTopics, method: str) -> None:
+        """Publish a turn_on/turn_off command to a relay's command topic."""
+        from homeassistant.components import mqtt
+
+        LOG.debug('Publishing %s to %s', COMMAND_PAYLOADS[method], topics.command_topic)
+        await mqtt.async_publish(self._hass, topics.command_topic, COMMAND_PAYLOADS[method])
+
+    def _state_received(self, entity_id: str) -> Callable[[ReceiveMessage], None]:
+        """Return the state topic message handler for a relay."""
+
+        @callback
+        def _async_state_received(msg: ReceiveMessage) -> None:
+            state = parse_state_payload(msg.payload)
+            if state is None:
+                return
+            self.states[entity_id] = state
+            pending = self._echoes.get(entity_id)
+            if pending is not None and pending[0] == state and not pending[1].done():
+                pending[1].set_result(None)
+
+        return _async_state_received
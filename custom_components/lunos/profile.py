@@ -0,0 +1,306 @@
+"""Compiled, immutable LUNOS model profiles.
+
+Each coding from the catalog is compiled once into a frozen ModelProfile whose
+per-speed metrics (airflow, sound level, power) are already normalized across
+the spellings used in lunos-codings.yaml and scaled to the configured number
+of fans. Profiles are interned so entries using the same coding and fan count
+share a single instance; a profile no entry uses any more (e.g. after a catalog
+reload changed its coding) is dropped from the intern table.
+
+The relay state and percentage lookup tables used on every state read and
+speed change are also built once per profile, so entities never rebuild them.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Final
+from weakref import WeakValueDictionary
+
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.util.percentage import (
+    ordered_list_item_to_percentage,
+    percentage_to_ordered_list_item,
+)
+
+from .const import (
+    CFM_TO_CMH,
+    CONF_DEFAULT_FAN_COUNT,
+    SPEED_HIGH,
+    SPEED_LIST,
+    SPEED_LOW,
+    SPEED_MEDIUM,
+    SPEED_OFF,
+    SPEED_SILENT,
+    SPEED_TURBO,
+    UNKNOWN,
+    VENT_ECO,
+    VENT_EXHAUST_ONLY,
+    VENT_SUMMER,
+)
+from .transition import (
+    KNOWN_STATES,
+    RELAY_SLOTS,
+    RelayStates,
+    TransitionPlan,
+    build_transition_table,
+    full_plan,
+    relay_slot,
+)
+
+# position of each speed in ModelProfile.metrics
+SPEED_INDEX: Final[dict[str, int]] = {speed: index for index, speed in enumerate(SPEED_LIST)}
+
+# alternate spellings found in lunos-codings.yaml for each normalized metric
+CMH_KEYS: Final = ('cmh', 'chm', 'cmg')
+DB_KEYS: Final = ('dB', 'db', 'decibel')
+WATTS_KEYS: Final = ('watts',)
+
+# W1/W2 relay states for each speed; the lowest state is OFF or (4-speed) SILENT.
+# TURBO has no relay state of its own: the relays are set to HIGH and then W2 is
+# flipped off/on within the controller's 3 second window (see LUNOSFan).
+RELAY_STATES: Final[dict[str, RelayStates]] = {
+    SPEED_OFF: (STATE_OFF, STATE_OFF),
+    SPEED_SILENT: (STATE_OFF, STATE_OFF),
+    SPEED_LOW: (STATE_ON, STATE_OFF),
+    SPEED_MEDIUM: (STATE_OFF, STATE_ON),
+    SPEED_HIGH: (STATE_ON, STATE_ON),
+    SPEED_TURBO: (STATE_ON, STATE_ON),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class SpeedMetrics:
+    """Airflow, sound and power behavior of a LUNOS fan at one speed."""
+
+    cfm: float | None = None
+    cmh: float | None = None
+    db: float | None = None
+    watts: float | None = None
+
+
+NO_METRICS: Final = SpeedMetrics()
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class ModelProfile:
+    """Immutable compiled view of a single controller coding."""
+
+    coding: str
+    name: str
+    model_number: str | None
+    controller_coding: int | str | None
+    fan_count: int
+    default_fan_count: int
+    supports_off: bool
+    supports_summer_vent: bool
+    supports_exhaust_only: bool
+    supports_filter_reminder: bool
+    supports_turbo_mode: bool
+    cycle_seconds: int | None
+    fan_speeds: tuple[str, ...]
+    vent_modes: tuple[str, ...]
+    metrics: tuple[SpeedMetrics, ...]
+
+    # lookup tables derived from fan_speeds (excluded from equality/hash)
+    relay_states: dict[str, RelayStates] = field(default_factory=dict, compare=False)
+    relay_speeds: dict[RelayStates, str] = field(default_factory=dict, compare=False)
+    speed_table: tuple[str | None, ...] = field(default=(None,) * RELAY_SLOTS, compare=False)
+    percentage_speeds: tuple[str, ...] = field(default=(), compare=False)
+    speed_percentages: dict[str, int] = field(default_factory=dict, compare=False)
+    percentage_table: tuple[str, ...] = field(default=(), compare=False)
+    airflow_cmh: tuple[float, ...] = field(default=(), compare=False)
+    airflow_speeds: tuple[str, ...] = field(default=(), compare=False)
+    transitions: dict[tuple[RelayStates, RelayStates], TransitionPlan] = field(
+        default_factory=dict, compare=False
+    )
+
+    @property
+    def speed_count(self) -> int:
+        """Return the number of speeds selectable by percentage (OFF excluded)."""
+        return len(self.percentage_speeds)
+
+    def speed_for_percentage(self, percentage: int) -> str:
+        """Return the speed for a percentage (0% is OFF, or the lowest speed if unsupported)."""
+        return self.percentage_table[min(max(percentage, 0), 100)]
+
+    def speed_for_airflow(self, cmh: float) -> tuple[str, bool] | None:
+        """Return the lowest speed delivering at least cmh, and whether the target is met.
+
+        When no speed reaches the target the highest airflow speed is returned
+        (with False); None if the model has no airflow data at all.
+        """
+        if not self.airflow_cmh:
+            return None
+        index = bisect_left(self.airflow_cmh, cmh)
+        if index == len(self.airflow_cmh):
+            return self.airflow_speeds[-1], False
+        return self.airflow_speeds[index], True
+
+    def speed_for_relays(self, w1_state: str | None, w2_state: str | None) -> str | None:
+        """Return the speed selected by the W1/W2 relay states (None if unknown/unavailable)."""
+        return self.speed_table[relay_slot(w1_state, w2_state)]
+
+    def plan_transition(
+        self, current: tuple[str | None, str | None] | None, speed: str
+    ) -> TransitionPlan:
+        """Return the relay writes to reach a speed from the current W1/W2 states.
+
+        Unknown or unavailable relay states are always written.
+        """
+        target = self.relay_states[speed]
+        if current is None or current[0] not in KNOWN_STATES or current[1] not in KNOWN_STATES:
+            return full_plan(target)
+        return self.transitions[current, target]  # type: ignore[index]
+
+    def metrics_for(self, speed: str | None) -> SpeedMetrics:
+        """Return the precomputed metrics for a speed (empty metrics if unknown)."""
+        if speed is None:
+            return NO_METRICS
+        return self.metrics[SPEED_INDEX[speed]]
+
+
+# interned profiles by their compared fields (weak, so profiles no entry uses are dropped)
+_INTERNED: WeakValueDictionary[tuple[Any, ...], ModelProfile] = WeakValueDictionary()
+_INTERN_FIELDS: Final = tuple(f.name for f in fields(ModelProfile) if f.compare)
+
+
+def _first(behavior: dict[str, Any], keys: tuple[str, ...]) -> float | None:
+    """Return the first value present in behavior for any of the given keys."""
+    for key in keys:
+        value = behavior.get(key)
+        if value is not None:
+            return float(value)
+    return None
+
+
+def _compile_metrics(behavior: dict[str, Any], fan_multiplier: float) -> SpeedMetrics:
+    """Normalize one speed's behavior into SpeedMetrics scaled by fan_multiplier."""
+    cfm = behavior.get('cfm')
+    cmh = _first(behavior, CMH_KEYS)
+
+    if cfm is not None:
+        cfm = cfm * fan_multiplier
+    if cmh is not None:
+        cmh = cmh * fan_multiplier
+
+    # derive whichever airflow unit the catalog did not specify
+    if cmh is None and cfm is not None:
+        cmh = cfm * CFM_TO_CMH
+    elif cfm is None and cmh is not None:
+        cfm = cmh / CFM_TO_CMH
+
+    return SpeedMetrics(
+        cfm=cfm,
+        cmh=cmh,
+        db=_first(behavior, DB_KEYS),
+        watts=_first(behavior, WATTS_KEYS),
+    )
+
+
+def compile_profile(
+    coding: str,
+    model_config: dict[str, Any],
+    fan_count: int | None = None,
+) -> ModelProfile:
+    """Compile a catalog coding into an interned ModelProfile."""
+    default_fan_count: int = model_config.get(CONF_DEFAULT_FAN_COUNT, 2)
+    if fan_count is None:
+        fan_count = default_fan_count
+    fan_multiplier = fan_count / default_fan_count
+
+    # when the controller does not support OFF, the lowest relay state is SILENT
+    supports_off = bool(model_config.get('supports_off'))
+    supports_turbo_mode = bool(model_config.get('supports_turbo_mode'))
+    lowest_speed = SPEED_OFF if supports_off else SPEED_SILENT
+    fan_speeds: tuple[str, ...] = (lowest_speed, SPEED_LOW, SPEED_MEDIUM, SPEED_HIGH)
+    if supports_turbo_mode:
+        fan_speeds += (SPEED_TURBO,)
+
+    vent_modes = [VENT_ECO]
+    if model_config.get('supports_summer_vent'):
+        vent_modes.append(VENT_SUMMER)
+    if model_config.get('supports_exhaust_only'):
+        vent_modes.append(VENT_EXHAUST_ONLY)
+
+    metrics = [NO_METRICS] * len(SPEED_LIST)
+    for speed, behavior in (model_config.get('behavior') or {}).items():
+        # the catalog describes the lowest relay state as 'off' for every model
+        if speed == SPEED_OFF:
+            speed = lowest_speed
+        if speed in SPEED_INDEX and behavior:
+            metrics[SPEED_INDEX[speed]] = _compile_metrics(behavior, fan_multiplier)
+
+    profile = ModelProfile(
+        coding=coding,
+        name=model_config.get('name', UNKNOWN),
+        model_number=model_config.get('model_number'),
+        controller_coding=model_config.get('controller_coding'),
+        fan_count=fan_count,
+        default_fan_count=default_fan_count,
+        supports_off=supports_off,
+        supports_summer_vent=bool(model_config.get('supports_summer_vent')),
+        supports_exhaust_only=bool(model_config.get('supports_exhaust_only')),
+        supports_filter_reminder=bool(model_config.get('supports_filter_reminder')),
+        supports_turbo_mode=supports_turbo_mode,
+        cycle_seconds=model_config.get('cycle_seconds'),
+        fan_speeds=fan_speeds,
+        vent_modes=tuple(vent_modes),
+        metrics=tuple(metrics),
+    )
+    key = tuple(getattr(profile, name) for name in _INTERN_FIELDS)
+    interned = _INTERNED.get(key)
+    if interned is not None:
+        return interned
+
+    profile = replace(profile, **_build_lookup_tables(profile))
+    _INTERNED[key] = profile
+    return profile
+
+
+def _build_lookup_tables(profile: ModelProfile) -> dict[str, Any]:
+    """Precompute the relay state and percentage lookup tables of a new profile."""
+    relay_states = {speed: RELAY_STATES[speed] for speed in profile.fan_speeds}
+
+    # TURBO shares HIGH's relay states, so relays alone always decode to HIGH
+    relay_speeds: dict[RelayStates, str] = {}
+    for speed, states in relay_states.items():
+        relay_speeds.setdefault(states, speed)
+
+    # speeds by relay slot (see transition.relay_slot); the sentinel slots decode to None
+    speed_table: list[str | None] = [None] * RELAY_SLOTS
+    for states, speed in relay_speeds.items():
+        speed_table[relay_slot(*states)] = speed
+
+    # OFF is represented by 0% and not included in the ordered percentage list
+    percentage_speeds = tuple(speed for speed in profile.fan_speeds if speed != SPEED_OFF)
+    ordered_speeds = list(percentage_speeds)
+    speed_percentages = {
+        speed: ordered_list_item_to_percentage(ordered_speeds, speed) for speed in percentage_speeds
+    }
+    zero_speed = SPEED_OFF if profile.supports_off else percentage_speeds[0]
+    if profile.supports_off:
+        speed_percentages[SPEED_OFF] = 0
+    percentage_table = (zero_speed,) + tuple(
+        percentage_to_ordered_list_item(ordered_speeds, percentage) for percentage in range(1, 101)
+    )
+
+    # (cmh, speed) sorted by airflow for bisecting airflow targets (already fan count scaled)
+    airflow = sorted(
+        (metrics.cmh, index, speed)
+        for index, speed in enumerate(profile.fan_speeds)
+        if (metrics := profile.metrics_for(speed)).cmh is not None
+    )
+
+    return {
+        'transitions': build_transition_table(relay_speeds, profile.fan_speeds),
+        'airflow_cmh': tuple(cmh for cmh, _, _ in airflow),
+        'airflow_speeds': tuple(speed for _, _, speed in airflow),
+        'relay_states': relay_states,
+        'relay_speeds': relay_speeds,
+        'speed_table': tuple(speed_table),
+        'percentage_speeds': percentage_speeds,
+        'speed_percentages': speed_percentages,
+        'percentage_table': percentage_table,
+    }
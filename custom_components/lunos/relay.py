@@ -0,0 +1,161 @@
+"""Closed-loop writes to the W1/W2 relay entities.
+
+Relay services are called without blocking, and lossy Zigbee/Wi-Fi relays may
+drop a command entirely. A confirmed write therefore waits for the relay entity
+to report the requested state (its echo), retries with exponential backoff when
+no echo arrives in time, and after the last retry raises a repair issue and
+fails the command so callers and diagnostics see the problem.
+"""
+
+from __future__ import annotations
+
+import logging
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import DOMAIN, RELAY_ECHO_TIMEOUT, RELAY_RETRY_BACKOFF, RELAY_WRITE_RETRIES
+
+if TYPE_CHECKING:
+    from homeassistant.core import Event, EventStateChangedData, HomeAssistant
+
+    from .latency import RelayLatency
+
+LOG = logging.getLogger(__name__)
+
+ISSUE_RELAY_UNRESPONSIVE = 'relay_unresponsive'
+
+
+class RelayWriteError(HomeAssistantError):
+    """A relay did not confirm a write after all retries."""
+
+
+@dataclass
+class RelayHealth:
+    """Write counters of one relay entity."""
+
+    writes: int = 0  # confirmed writes
+    retries: int = 0  # writes re-sent after an echo timeout
+    failures: int = 0  # writes that were never confirmed
+    last_error: str | None = None
+
+
+class RelayWriter:
+    """Confirmed relay writes for one LUNOS controller."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        timeout: float = RELAY_ECHO_TIMEOUT,
+        retries: int = RELAY_WRITE_RETRIES,
+        backoff: float = RELAY_RETRY_BACKOFF,
+        latency: RelayLatency | None = None,
+    ) -> None:
+        """Initialize the writer."""
+        self._hass = hass
+        self._name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._latency = latency  # records the measured round trips
+        self.health: dict[str, RelayHealth] = {}
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return the per-relay counters for diagnostics."""
+        return {entity_id: asdict(health) for entity_id, health in self.health.items()}
+
+    async def async_setup(self) -> None:
+        """Prepare the transport (relay entity services need no setup)."""
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Release the transport."""
+
+    async def async_send(self, domain: str, method: str, entity_id: str) -> None:
+        """Send a command without waiting for the relay to report it (timed flips)."""
+        await self._hass.services.async_call(domain, method, {'entity_id': entity_id}, False)
+
+    async def async_write(self, domain: str, method: str, entity_id: str, state: str) -> None:
+        """Call domain.method on a relay and wait until it reports state.
+
+        Raises RelayWriteError if the relay never confirms the write.
+        """
+        health = self.health.setdefault(entity_id, RelayHealth())
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            if attempt:
+                LOG.warning(
+                    "LUNOS '%s' relay %s did not report %s within %.1fs; retrying in %.1fs",
+                    self._name,
+                    entity_id,
+                    state,
+                    self.timeout,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+                health.retries += 1
+
+            if await self._async_write_once(domain, method, entity_id, state):
+                health.writes += 1
+                if health.last_error is not None:
+                    health.last_error = None
+                    ir.async_delete_issue(self._hass, DOMAIN, _issue_id(entity_id))
+                return
+
+        health.failures += 1
+        health.last_error = f'no {state} echo after {self.retries + 1} attempts'
+        ir.async_create_issue(
+            self._hass,
+            DOMAIN,
+            _issue_id(entity_id),
+            is_fixable=False,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key=ISSUE_RELAY_UNRESPONSIVE,
+            translation_placeholders={'name': self._name, 'entity_id': entity_id},
+        )
+        raise RelayWriteError(f"LUNOS '{self._name}' relay {entity_id}: {health.last_error}")
+
+    async def _async_write_once(self, domain: str, method: str, entity_id: str, state: str) -> bool:
+        """Send one write and return True once the relay reports state (False on timeout)."""
+        echo: asyncio.Future[None] = self._hass.loop.create_future()
+
+        @callback
+        def _async_relay_changed(event: Event[EventStateChangedData]) -> None:
+            new_state = event.data['new_state']
+            if new_state is not None and new_state.state == state and not echo.done():
+                echo.set_result(None)
+
+        current = self._hass.states.get(entity_id)
+        unsub = async_track_state_change_event(self._hass, [entity_id], _async_relay_changed)
+        sent = self._hass.loop.time()
+        try:
+            await self._hass.services.async_call(domain, method, {'entity_id': entity_id}, False)
+            if current is not None and current.state == state:
+                return True  # already in state, so no change will be reported
+            async with asyncio.timeout(self.timeout):
+                await echo
+        except TimeoutError:
+            return False
+        finally:
+            unsub()
+
+        self._record_latency(entity_id, sent)
+        return True
+
+    def _record_latency(self, entity_id: str, sent: float) -> None:
+        """Record the round trip of a write sent at loop time sent."""
+        if self._latency is not None:
+            self._latency.record(entity_id, self._hass.loop.time() - sent)
+
+
+def _issue_id(entity_id: str) -> str:
+    """Return the repair issue id for an unresponsive relay."""
+    return f'{ISSUE_RELAY_UNRESPONSIVE}_{entity_id}'
@@ -0,0 +1,161 @@
+"""Deadline scheduled relay flip sequences for LUNOS mode macros.
+
+The LUNOS controller only recognizes a mode command (clear filter reminder,
+summer ventilation, turbo) when all relay flips arrive within its 3 second
+detection window. Sleeping a fixed delay after each awaited service call lets
+the spacing drift with service latency and event loop load, so each flip is
+instead scheduled at an absolute deadline (loop.call_at) measured from the
+start of the sequence. The actual-versus-planned jitter of every flip is
+recorded, and a sequence whose remaining flips would no longer fit in the
+window is aborted before the next flip is sent.
+"""
+
+from __future__ import annotations
+
+import logging
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DELAY_BETWEEN_FLIPS, TOGGLE_WINDOW
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+LOG = logging.getLogger(__name__)
+
+type Flip = Callable[[], Awaitable[None]]
+
+
+class ToggleSequenceAborted(HomeAssistantError):
+    """The remaining flips of a sequence would not fit in the controller's window."""
+
+
+@dataclass(frozen=True, slots=True)
+class FlipTiming:
+    """Planned and actual send time of one flip (seconds since the sequence start)."""
+
+    planned: float
+    actual: float
+
+    @property
+    def jitter(self) -> float:
+        """Return how late the flip was sent."""
+        return self.actual - self.planned
+
+
+@dataclass
+class SequenceReport:
+    """Timing of the last flip sequence run for diagnostics."""
+
+    name: str
+    flips: int  # flips in the sequence
+    timings: list[FlipTiming] = field(default_factory=list)
+    aborted: bool = False
+
+    @property
+    def max_jitter(self) -> float:
+        """Return the largest jitter of the flips sent."""
+        return max((timing.jitter for timing in self.timings), default=0.0)
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return the report as diagnostics attributes (times in milliseconds)."""
+        return {
+            'name': self.name,
+            'flips': self.flips,
+            'sent': len(self.timings),
+            'aborted': self.aborted,
+            'jitter_ms': [round(timing.jitter * 1000, 1) for timing in self.timings],
+            'max_jitter_ms': round(self.max_jitter * 1000, 1),
+        }
+
+
+class ToggleSequencer:
+    """Run relay flip sequences at fixed offsets within the controller's window."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        interval: float = DELAY_BETWEEN_FLIPS,
+        window: float = TOGGLE_WINDOW,
+    ) -> None:
+        """Initialize the sequencer."""
+        self._hass = hass
+        self._name = name
+        self.interval = interval
+        self.window = window
+        self.last: SequenceReport | None = None
+
+    @property
+    def attributes(self) -> dict[str, Any] | None:
+        """Return the timing of the last sequence for diagnostics."""
+        return self.last.attributes if self.last is not None else None
+
+    async def async_run(
+        self, name: str, flips: Sequence[Flip], interval: float | None = None
+    ) -> SequenceReport:
+        """Send each flip at start + index * interval (default: the sequencer's interval).
+
+        Raises ToggleSequenceAborted (after the flips already sent) if the
+        remaining flips would end outside the window.
+        """
+        interval = self.interval if interval is None else interval
+        loop = self._hass.loop
+        report = self.last = SequenceReport(name, len(flips))
+        start = loop.time()
+        for index, flip in enumerate(flips):
+            planned = index * interval
+            await _async_sleep_until(loop, start + planned)
+
+            # the last flip must still be sent within the window
+            actual = loop.time() - start
+            if actual + (len(flips) - 1 - index) * interval > self.window:
+                report.aborted = True
+                LOG.error(
+                    "LUNOS '%s' %s aborted after %d of %d flips: flip %d is %.0fms late",
+                    self._name,
+                    name,
+                    index,
+                    len(flips),
+                    index + 1,
+                    (actual - planned) * 1000,
+                )
+                raise ToggleSequenceAborted(
+                    f"LUNOS '{self._name}' {name} could not be sent within {self.window}s"
+                )
+
+            report.timings.append(FlipTiming(planned, actual))
+            await flip()
+
+        LOG.debug(
+            "LUNOS '%s' %s sent %d flips (max jitter %.1fms): %s",
+            self._name,
+            name,
+            len(flips),
+            report.max_jitter * 1000,
+            [asdict(timing) for timing in report.timings],
+        )
+        return report
+
+
+async def _async_sleep_until(loop: asyncio.AbstractEventLoop, deadline: float) -> None:
+    """Wait until the loop time reaches deadline (returns at once if it already passed)."""
+    if deadline <= loop.time():
+        return
+    waiter: asyncio.Future[None] = loop.create_future()
+    handle = loop.call_at(deadline, _set_done, waiter)
+    try:
+        await waiter
+    finally:
+        handle.cancel()
+
+
+def _set_done(waiter: asyncio.Future[None]) -> None:
+    """Resolve waiter unless it was cancelled meanwhile."""
+    if not waiter.done():
+        waiter.set_result(None)
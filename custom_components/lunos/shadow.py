@@ -0,0 +1,170 @@
+"""Shadow model of the LUNOS 5/UNI controller's relay input decoder.
+
+Besides selecting a speed, the W1/W2 inputs carry mode commands: several
+edges on one relay within the controller's detection window are read as a
+toggle sequence (W1: clear the filter reminder, W2: summer ventilation on, or
+off while it is active, or turbo when flipped at HIGH). A speed change must
+therefore not add an edge to a relay whose previous edge is still inside that
+window, while a relay that has been quiet for a full window can be written at
+once.
+
+The shadow follows the relay edges using monotonic timestamps: edges reported
+by the relay entities, plus commands sent without waiting for the relay's echo
+(counted until the echo arrives). Per relay it tracks the edges inside the
+window, the mode they may add up to, and whether summer ventilation is active.
+A write is delayed only while the edge it adds would complete a mode sequence,
+so most isolated speed changes apply at once.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from collections.abc import Mapping
+import time
+from typing import Any, Final
+
+from .const import TOGGLE_WINDOW
+from .transition import RELAY_NAMES, W1, W2
+
+LOG = logging.getLogger(__name__)
+
+# modes the controller decodes from toggle sequences
+MODE_FILTER_RESET: Final = 'filter_reset'  # W1 toggled (3 off/on cycles)
+MODE_SUMMER_VENT_ON: Final = 'summer_vent_on'  # W2 toggled (3 off/on cycles)
+MODE_SUMMER_VENT_OFF: Final = 'summer_vent_off'  # W2 off/on while summer ventilation is on
+MODE_TURBO: Final = 'turbo'  # W2 off/on at HIGH (turbo capable codings)
+
+MODE_SEQUENCE_EDGES: Final = 6  # edges of a full filter reset / summer ventilation sequence
+MODE_FLIP_EDGES: Final = 2  # edges of a W2 off/on (summer ventilation off, turbo)
+
+
+class ControllerShadow:
+    """Relay edges the controller has seen recently, and what it may decode from them."""
+
+    def __init__(self, window: float = TOGGLE_WINDOW, turbo: bool = False) -> None:
+        """Initialize the shadow with no observed edges (turbo: a W2 off/on selects turbo)."""
+        self.window = window
+        self.turbo = turbo
+        self.summer_vent = False
+        # edge times per relay inside the window, and those of them that are commands
+        # still waiting for the relay's echo
+        self._edges: tuple[deque[float], deque[float]] = (deque(), deque())
+        self._unconfirmed: tuple[deque[float], deque[float]] = (deque(), deque())
+        # end of a flip sequence run by the relay device itself (its edges are not seen)
+        self._held_until: list[float | None] = [None, None]
+
+    def observe_edge(self, relay: int, now: float | None = None) -> None:
+        """Record a relay state change reported by the relay entity."""
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        if self._unconfirmed[relay]:
+            # the echo of a command that is already counted
+            self._unconfirmed[relay].popleft()
+            return
+        self._edges[relay].append(now)
+
+    def observe_command(self, relay: int, now: float | None = None) -> None:
+        """Record a command changing a relay, sent without waiting for its echo."""
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        self._edges[relay].append(now)
+        self._unconfirmed[relay].append(now)
+
+    def observe_device_sequence(self, relay: int, until: float) -> None:
+        """Record a flip sequence the relay device runs on its own until the given time."""
+        held = self._held_until[relay]
+        self._held_until[relay] = until if held is None else max(held, until)
+
+    def toggles(self, relay: int, now: float | None = None) -> int:
+        """Return the number of edges on a relay inside the detection window."""
+        self._expire(time.monotonic() if now is None else now)
+        return len(self._edges[relay])
+
+    def pending_mode(self, now: float | None = None) -> str | None:
+        """Return the mode the controller may currently be detecting, if any."""
+        self._expire(time.monotonic() if now is None else now)
+        return self._decode(W1, len(self._edges[W1])) or self._decode(W2, len(self._edges[W2]))
+
+    def delay_before(
+        self, margins: Mapping[int, float], now: float | None = None, sequence: bool = False
+    ) -> float:
+        """Return how long to wait before writing relays so no write is misread as a mode.
+
+        margins maps each relay to be written to its latency (its edge reaches the
+        controller that much later). A single edge waits only while it would complete
+        a mode sequence with the edges inside the window; a deliberate flip sequence
+        waits for the relay's window to be empty. Relays not written do not delay.
+        """
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        delay = 0.0
+        for relay, margin in margins.items():
+            held = self._held_until[relay]
+            if held is not None:
+                delay = max(delay, held + self.window + margin - now)
+
+            # the edges that may stay inside the window when one more edge is added
+            edges = self._edges[relay]
+            allowed = 0 if sequence else max(self._sequence_edges(relay) - 2, 0)
+            if len(edges) > allowed:
+                # wait until all but the allowed newest edges left the window
+                delay = max(delay, edges[len(edges) - allowed - 1] + self.window + margin - now)
+        return delay
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return the shadow state for diagnostics."""
+        now = time.monotonic()
+        return {
+            'summer_vent': self.summer_vent,
+            'pending_mode': self.pending_mode(now),
+            'toggles': {RELAY_NAMES[relay]: len(self._edges[relay]) for relay in (W1, W2)},
+        }
+
+    def _sequence_edges(self, relay: int) -> int:
+        """Return the number of edges inside the window that the controller reads as a mode."""
+        if relay == W2 and (self.summer_vent or self.turbo):
+            return MODE_FLIP_EDGES
+        return MODE_SEQUENCE_EDGES
+
+    def _decode(self, relay: int, edges: int) -> str | None:
+        """Return the mode a number of edges on a relay inside one window adds up to."""
+        if relay == W1:
+            return MODE_FILTER_RESET if edges >= MODE_SEQUENCE_EDGES else None
+        if edges >= MODE_SEQUENCE_EDGES:
+            return MODE_SUMMER_VENT_ON
+        if edges >= MODE_FLIP_EDGES:
+            if self.summer_vent:
+                return MODE_SUMMER_VENT_OFF
+            if self.turbo:
+                return MODE_TURBO
+        return None
+
+    def _expire(self, now: float) -> None:
+        """Drop edges that left the window, applying the modes the controller decoded."""
+        for relay, edges in enumerate(self._edges):
+            while edges and now - edges[0] > self.window:
+                # the detection window of the oldest edge closed: the controller acts on the
+                # edges inside it (consuming them) or the oldest edge just drops out
+                oldest = edges[0]
+                count = sum(1 for edge in edges if edge - oldest <= self.window)
+                mode = self._decode(relay, count)
+                if mode is None:
+                    count = 1
+                else:
+                    LOG.debug('LUNOS controller shadow decoded %s', mode)
+                    if mode == MODE_SUMMER_VENT_ON:
+                        self.summer_vent = True
+                    elif mode == MODE_SUMMER_VENT_OFF:
+                        self.summer_vent = False
+
+                for _ in range(count):
+                    expired = edges.popleft()
+                unconfirmed = self._unconfirmed[relay]
+                while unconfirmed and unconfirmed[0] <= expired:
+                    unconfirmed.popleft()  # the relay never echoed the command
+
+            held = self._held_until[relay]
+            if held is not None and now - held > self.window:
+                self._held_until[relay] = None
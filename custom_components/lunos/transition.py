@@ -0,0 +1,129 @@
+"""Relay transition planning for LUNOS speed changes.
+
+A speed is selected by the W1/W2 relay pair, so changing speed writes up to two
+relays. Relays already in their target state are not written at all. When both
+relays change, the controller briefly sees the state after the first write, so
+the order is chosen to make that transient speed the least disruptive:
+
+- prefer a transient speed between the current and the target speed
+- otherwise the one closest to that range
+- avoid transiently dropping to the lowest speed (OFF, or SILENT on 4-speed models)
+- on a tie keep the historical W1-then-W2 order
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from itertools import product
+from typing import Final
+
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
+
+type RelayStates = tuple[str, str]
+
+W1: Final = 0
+W2: Final = 1
+RELAY_NAMES: Final = ('W1', 'W2')
+
+# relay states a plan can be diffed against; anything else (unavailable, unknown) is rewritten
+KNOWN_STATES: Final = (STATE_OFF, STATE_ON)
+
+# W1/W2 states are decoded as a 2-bit index (W1 bit 0, W2 bit 1) into a profile's
+# speed table; a relay that is neither on nor off selects one of the sentinel slots
+RELAY_BITS: Final[dict[str | None, int]] = {STATE_OFF: 0, STATE_ON: 1}
+SLOT_UNKNOWN: Final = 4  # a relay reports neither on nor off (unknown, not found)
+SLOT_UNAVAILABLE: Final = 5  # a relay entity is unavailable
+RELAY_SLOTS: Final = 6
+
+
+def relay_slot(w1_state: str | None, w2_state: str | None) -> int:
+    """Return the speed table slot for the W1/W2 relay states."""
+    w1 = RELAY_BITS.get(w1_state)
+    w2 = RELAY_BITS.get(w2_state)
+    if w1 is None or w2 is None:
+        if w1_state == STATE_UNAVAILABLE or w2_state == STATE_UNAVAILABLE:
+            return SLOT_UNAVAILABLE
+        return SLOT_UNKNOWN
+    return w1 | w2 << 1
+
+
+@dataclass(frozen=True, slots=True)
+class RelayWrite:
+    """A single relay write: set relay W1 (0) or W2 (1) to state."""
+
+    relay: int
+    state: str
+
+    def __str__(self) -> str:
+        """Return e.g. 'W2=on'."""
+        return f'{RELAY_NAMES[self.relay]}={self.state}'
+
+
+@dataclass(frozen=True, slots=True)
+class TransitionPlan:
+    """Ordered relay writes taking the controller from one relay state to another."""
+
+    current: RelayStates | None
+    target: RelayStates
+    writes: tuple[RelayWrite, ...]
+    transient: str | None = None  # speed the controller sees between two writes
+
+    def __str__(self) -> str:
+        """Return a compact description for logging."""
+        writes = ', '.join(str(write) for write in self.writes) or 'no writes'
+        if self.transient is not None:
+            writes += f' (via {self.transient})'
+        return writes
+
+
+def full_plan(target: RelayStates) -> TransitionPlan:
+    """Return a plan writing both relays (used when the current relay states are unknown)."""
+    return TransitionPlan(None, target, (RelayWrite(W1, target[W1]), RelayWrite(W2, target[W2])))
+
+
+def plan_transition(
+    relay_speeds: Mapping[RelayStates, str],
+    speed_order: Iterable[str],
+    current: RelayStates,
+    target: RelayStates,
+) -> TransitionPlan:
+    """Plan the minimal, least disruptive relay writes from current to target."""
+    changed = [relay for relay in (W1, W2) if current[relay] != target[relay]]
+    if len(changed) < 2:
+        return TransitionPlan(
+            current, target, tuple(RelayWrite(relay, target[relay]) for relay in changed)
+        )
+
+    rank = {speed: index for index, speed in enumerate(speed_order)}
+    low, high = sorted((rank[relay_speeds[current]], rank[relay_speeds[target]]))
+
+    def cost(first: int) -> tuple[int, bool]:
+        transient_rank = rank[relay_speeds[_write(current, first, target[first])]]
+        outside = max(low - transient_rank, transient_rank - high, 0)
+        return outside, transient_rank == 0
+
+    first = min((W1, W2), key=cost)  # stable: W1 wins ties
+    second = W2 if first == W1 else W1
+    return TransitionPlan(
+        current,
+        target,
+        (RelayWrite(first, target[first]), RelayWrite(second, target[second])),
+        relay_speeds[_write(current, first, target[first])],
+    )
+
+
+def _write(states: RelayStates, relay: int, state: str) -> RelayStates:
+    """Return the relay states after writing state to one relay."""
+    return (state, states[W2]) if relay == W1 else (states[W1], state)
+
+
+def build_transition_table(
+    relay_speeds: Mapping[RelayStates, str], speed_order: Iterable[str]
+) -> dict[tuple[RelayStates, RelayStates], TransitionPlan]:
+    """Precompute the plan for every (current, target) pair of known relay states."""
+    speed_order = tuple(speed_order)
+    return {
+        (current, target): plan_transition(relay_speeds, speed_order, current, target)
+        for current, target in product(relay_speeds, repeat=2)
+    }
@@ -0,0 +1,20 @@
+// Shelly Gen2+ reference: run a LUNOS toggle sequence on the relay device itself.
+//
+// Upload as a script on the Shelly driving the LUNOS W1/W2 inputs (one script per
+// relay, e.g. SWITCH_ID 0 for W1 and 1 for W2 on a Plus 2PM). Each start of the
+// script flips the relay three times off/on, 100 ms apart, then stops itself.
+// See shelly-lunos-ha.yaml for the Home Assistant script that starts it.
+
+let SWITCH_ID = 0; // 0 = W1 (filter reminder), 1 = W2 (summer ventilation)
+let FLIPS = 6; // off, on, off, on, off, on
+let INTERVAL_MS = 100;
+
+let sent = 0;
+let timer = Timer.set(INTERVAL_MS, true, function () {
+  Shelly.call('Switch.Set', { id: SWITCH_ID, on: sent % 2 === 1 });
+  sent++;
+  if (sent === FLIPS) {
+    Timer.clear(timer);
+    Shelly.call('Script.Stop', { id: Shelly.getCurrentScriptId() });
+  }
+});
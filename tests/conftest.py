@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import Awaitable, Callable, Generator
+from datetime import timedelta
 from typing import Any
 from unittest.mock import patch
 
 from homeassistant.const import STATE_OFF, STATE_ON
 from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
 import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
 
 from custom_components.lunos.const import (
     CONF_CONTROLLER_CODING,
@@ -18,6 +21,7 @@ from custom_components.lunos.const import (
     CONF_RELAY_W2,
     DEFAULT_CONTROLLER_CODING,
     DEFAULT_SPEED,
+    DOMAIN,
 )
 
 
@@ -113,3 +117,63 @@ def mock_relay_states_on(hass: HomeAssistant) -> None:
     """Set up mock relay states in ON state."""
     hass.states.async_set('switch.lunos_w1', STATE_ON)
     hass.states.async_set('switch.lunos_w2', STATE_ON)
+
+
+@pytest.fixture
+def add_entry(hass: HomeAssistant) -> Callable[[str, str], MockConfigEntry]:
+    """Return a function adding a fan config entry with relays in the medium speed position."""
+
+    def _add_entry(name: str, coding: str) -> MockConfigEntry:
+        relay_w1 = f'switch.{name}_w1'
+        relay_w2 = f'switch.{name}_w2'
+        hass.states.async_set(relay_w1, STATE_OFF)
+        hass.states.async_set(relay_w2, STATE_ON)
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=name,
+            unique_id=f'{relay_w1}_{relay_w2}',
+            data={
+                'name': name,
+                CONF_RELAY_W1: relay_w1,
+                CONF_RELAY_W2: relay_w2,
+                CONF_CONTROLLER_CODING: coding,
+                CONF_FAN_COUNT: 2,
+            },
+        )
+        entry.add_to_hass(hass)
+        return entry
+
+    return _add_entry
+
+
+@pytest.fixture
+def set_relay(hass: HomeAssistant) -> Callable[[str, str], Awaitable[None]]:
+    """Return a function changing a relay state and letting the pair window for the partner pass."""
+
+    async def _async_set_relay(entity_id: str, state: str) -> None:
+        hass.states.async_set(entity_id, state)
+        await hass.async_block_till_done()
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+
+    return _async_set_relay
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable loading of the custom integration in every test."""
+
+
+@pytest.fixture
+def _mock_relay_states(mock_relay_states: None) -> None:
+    """Alias of mock_relay_states for tests that only need the side effect."""
+
+
+@pytest.fixture
+def _mock_relay_states_on(mock_relay_states_on: None) -> None:
+    """Alias of mock_relay_states_on for tests that only need the side effect."""
+
+
+@pytest.fixture
+def _mock_load_lunos_codings(mock_load_lunos_codings: Any) -> None:
+    """Alias of mock_load_lunos_codings for tests that only need the side effect."""
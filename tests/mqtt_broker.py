@@ -0,0 +1,76 @@
+"""In-process stand-in for an MQTT broker and MQTT relays (tests and benchmarks).
+
+Replaces Home Assistant's MQTT client functions used by the LUNOS MQTT relay
+transport: published messages are delivered to matching subscribers on the
+event loop, and relays echo each command on their state topic after a delay.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.components.mqtt import ReceiveMessage
+from homeassistant.core import HomeAssistant
+
+
+class LocalBroker:
+    """Deliver MQTT messages between in-process publishers and subscribers."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize a broker without subscribers."""
+        self.hass = hass
+        self.published: list[tuple[str, str]] = []
+        self._subscribers: defaultdict[str, list[Callable[[ReceiveMessage], Any]]] = defaultdict(
+            list
+        )
+
+    async def async_publish(
+        self, _hass: HomeAssistant, topic: str, payload: str, *_args: Any, **_kwargs: Any
+    ) -> None:
+        """Publish payload to topic (delivered on the next loop iteration)."""
+        self.published.append((topic, payload))
+        for msg_callback in list(self._subscribers[topic]):
+            message = ReceiveMessage(topic, payload, 0, False, topic, self.hass.loop.time())
+            self.hass.loop.call_soon(msg_callback, message)
+
+    async def async_subscribe(
+        self,
+        _hass: HomeAssistant,
+        topic: str,
+        msg_callback: Callable[[ReceiveMessage], Any],
+        *_args: Any,
+        **_kwargs: Any,
+    ) -> Callable[[], None]:
+        """Subscribe to a topic; returns the unsubscribe callback."""
+        self._subscribers[topic].append(msg_callback)
+        return lambda: self._subscribers[topic].remove(msg_callback)
+
+    def add_relay(self, command_topic: str, state_topic: str, delay: float = 0.0) -> None:
+        """Add a relay that reports every command on its state topic after delay seconds."""
+
+        def _command(msg: ReceiveMessage) -> None:
+            self.hass.loop.call_later(
+                delay,
+                self.hass.async_create_task,
+                self.async_publish(self.hass, state_topic, msg.payload),
+            )
+
+        self._subscribers[command_topic].append(_command)
+
+    @contextmanager
+    def patch_mqtt(self) -> Generator[LocalBroker]:
+        """Route Home Assistant's MQTT client calls to this broker."""
+
+        async def _available(_hass: HomeAssistant) -> bool:
+            return True
+
+        with (
+            patch('homeassistant.components.mqtt.async_publish', self.async_publish),
+            patch('homeassistant.components.mqtt.async_subscribe', self.async_subscribe),
+            patch('homeassistant.components.mqtt.async_wait_for_mqtt_client', _available),
+        ):
+            yield self
@@ -0,0 +1,144 @@
+"""Tests for the LUNOS coding catalog compiler/validator."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from custom_components.lunos.catalog import (
+    CatalogIndex,
+    load_compiled_codings,
+    load_yaml_codings,
+    main,
+    merge_codings,
+    normalize_coding,
+    validate_codings,
+)
+
+
+def test_bundled_catalog_is_valid() -> None:
+    """Test the bundled catalog passes the strict schema."""
+    result = validate_codings(load_yaml_codings())
+
+    assert result.ok, result.errors
+
+
+def test_unknown_keys_and_types_are_errors() -> None:
+    """Test unknown keys, wrong types and unknown speeds are reported."""
+    result = validate_codings(
+        {
+            'bad': {
+                'name': 'Bad',
+                'supports_of': True,
+                'cycle_seconds': 'fast',
+                'speeds': ['off', 'ludicrous'],
+                'behavior': {'low': {'cfm': 10, 'rpm': 1200}, 'boost': {'cmh': 60}},
+            },
+            'nameless': {'supports_off': True},
+        }
+    )
+
+    assert 'bad: unknown key "supports_of"' in result.errors
+    assert "bad.cycle_seconds: expected int, got 'fast'" in result.errors
+    assert 'bad.speeds: unknown speed "ludicrous"' in result.errors
+    assert 'bad.behavior.low: unknown key "rpm"' in result.errors
+    assert any(error.startswith('bad.behavior.boost: unknown speed') for error in result.errors)
+    assert 'nameless: missing required key "name"' in result.errors
+
+
+def test_legacy_spellings_are_warned_and_normalized() -> None:
+    """Test legacy key spellings are warned about and normalized."""
+    coding = {
+        'name': 'Legacy',
+        'power_consumption': 3.3,
+        'high_supports_exhaust_only': True,
+        'behavior': {'low': {'cmg': 15, 'db': 16.5}, 'high': {'chm': 45}},
+    }
+
+    result = validate_codings({'legacy': coding})
+    assert result.ok
+    assert 'legacy.behavior.low: "cmg" is deprecated, use "cmh"' in result.warnings
+    assert 'legacy: "power_consumption" is deprecated, use "max_watts"' in result.warnings
+
+    assert normalize_coding(coding) == {
+        'name': 'Legacy',
+        'max_watts': 3.3,
+        'behavior': {
+            'low': {'cmh': 15, 'decibel': 16.5},
+            'high': {'cmh': 45, 'supports_exhaust_only': True},
+        },
+    }
+
+
+def test_inconsistent_airflow_units_are_warned() -> None:
+    """Test cfm and cmh values that disagree are reported."""
+    result = validate_codings({'ra': {'name': 'RA', 'behavior': {'medium': {'cfm': 8, 'cmh': 30}}}})
+
+    assert any('disagrees with cmh=30' in warning for warning in result.warnings)
+
+
+def test_merge_codings_is_deep_per_coding() -> None:
+    """Test an overlay replaces only the keys and speeds it specifies."""
+    codings = {'e2': {'name': 'e2', 'behavior': {'low': {'cfm': 10, 'decibel': 16}}}}
+
+    merged = merge_codings(
+        codings, {'e2': {'behavior': {'low': {'cfm': 12}}}, 'new': {'name': 'New'}}
+    )
+
+    assert merged == {
+        'e2': {'name': 'e2', 'behavior': {'low': {'cfm': 12, 'decibel': 16}}},
+        'new': {'name': 'New'},
+    }
+    assert codings['e2']['behavior']['low']['cfm'] == 10
+
+
+def test_index_query() -> None:
+    """Test feature and minimum airflow queries against the bundled catalog."""
+    codings = load_compiled_codings()
+    assert codings is not None
+    index = CatalogIndex(codings)
+
+    matches = index.query(('supports_summer_vent',), {'high': 38})
+
+    assert 'e2' in matches
+    assert 'e2-60' in matches
+    assert 'e2-usa' not in matches  # 20 cfm = 34 cmh at high
+    assert 'ra-15-60-high' not in matches  # no summer vent
+    for coding in matches:
+        assert codings[coding]['supports_summer_vent'] is True
+
+
+def test_cli_check_and_query(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the CLI confirms the shipped artifact is current and answers queries."""
+    assert main(['compile', '--check']) == 0
+    assert main(['validate']) == 0
+
+    assert main(['query', '--feature', 'supports_turbo_mode']) == 0
+    output = capsys.readouterr().out
+    assert 'ego-4speed' in output
+    assert 'ra-15-60\t' in output
+
+
+def test_cli_compile_rejects_invalid_catalog(tmp_path: Path) -> None:
+    """Test compiling an invalid catalog fails without writing the artifact."""
+    source = tmp_path / 'codings.yaml'
+    output = tmp_path / 'codings.json'
+    source.write_text('bad:\n  name: Bad\n  colour: red\n')
+
+    assert main(['--source', str(source), 'validate']) == 1
+    assert main(['--source', str(source), 'compile', '--output', str(output)]) == 1
+    assert not output.exists()
+
+
+def test_cli_runs_without_home_assistant() -> None:
+    """Test the CLI (run offline in CI) does not import Home Assistant."""
+    script = (
+        'import sys; '
+        "sys.modules['homeassistant'] = None; "  # any Home Assistant import now fails
+        'from custom_components.lunos.catalog import main; '
+        "sys.exit(main(['compile', '--check']))"
+    )
+    subprocess.run([sys.executable, '-c', script], check=True, cwd=Path(__file__).parent.parent)
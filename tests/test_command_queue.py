@@ -0,0 +1,138 @@
+"""Tests for the per-fan LUNOS command queue."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.lunos.command_queue import LunosCommandQueue
+
+
+class _Relays:
+    """Records applied commands; the first command blocks until released."""
+
+    def __init__(self) -> None:
+        self.applied: list[str] = []
+        self.release = asyncio.Event()
+
+    def command(self, name: str, steps: int = 1):
+        """Return a command that records name once per step."""
+
+        async def run() -> None:
+            for _ in range(steps):
+                if not self.release.is_set():
+                    await self.release.wait()
+                self.applied.append(name)
+                await asyncio.sleep(0)
+
+        return run
+
+
+async def test_speed_requests_are_coalesced_latest_wins(hass: HomeAssistant) -> None:
+    """Test requests waiting behind a running change collapse into the newest one."""
+    queue = LunosCommandQueue(hass, 'test')
+    relays = _Relays()
+
+    callers = [
+        hass.async_create_task(queue.async_request_speed(speed, relays.command(speed)))
+        for speed in ('low', 'medium', 'high', 'off', 'medium')
+    ]
+    await asyncio.sleep(0)
+    assert queue.running == 'low'
+    assert queue.pending == ('medium',)
+
+    relays.release.set()
+    await asyncio.gather(*callers)
+
+    assert relays.applied == ['low', 'medium']
+    assert queue.stats.as_dict() == {
+        'requested': 5,
+        'coalesced': 3,
+        'applied': 2,
+        'macros': 0,
+        'failed': 0,
+    }
+    assert queue.idle
+
+
+async def test_macros_are_atomic(hass: HomeAssistant) -> None:
+    """Test macros are never interleaved with or coalesced into speed changes."""
+    queue = LunosCommandQueue(hass, 'test')
+    relays = _Relays()
+
+    callers = [
+        hass.async_create_task(queue.async_request_speed('low', relays.command('low'))),
+        hass.async_create_task(queue.async_run_macro('toggle', relays.command('toggle', 3))),
+        hass.async_create_task(queue.async_request_speed('high', relays.command('high'))),
+        hass.async_create_task(queue.async_request_speed('off', relays.command('off'))),
+    ]
+    await asyncio.sleep(0)
+    assert queue.pending == ('toggle', 'off')
+
+    relays.release.set()
+    await asyncio.gather(*callers)
+
+    assert relays.applied == ['low', 'toggle', 'toggle', 'toggle', 'off']
+    assert queue.stats.macros == 1
+    assert queue.stats.coalesced == 1
+
+
+async def test_failures_reach_every_waiting_caller(hass: HomeAssistant) -> None:
+    """Test a failed command raises for the callers it was coalesced from."""
+    queue = LunosCommandQueue(hass, 'test')
+    relays = _Relays()
+
+    async def fail() -> None:
+        raise RuntimeError('relay unavailable')
+
+    first = hass.async_create_task(queue.async_request_speed('low', relays.command('low')))
+    await asyncio.sleep(0)
+    second = hass.async_create_task(queue.async_request_speed('medium', fail))
+    third = hass.async_create_task(queue.async_request_speed('high', fail))
+    await asyncio.sleep(0)
+    relays.release.set()
+
+    await first
+    for caller in (second, third):
+        with pytest.raises(RuntimeError):
+            await caller
+    assert queue.stats.failed == 1
+
+    # the queue keeps working after a failure
+    await queue.async_request_speed('off', relays.command('off'))
+    assert relays.applied == ['low', 'off']
+
+
+async def test_shutdown_releases_callers(hass: HomeAssistant) -> None:
+    """Test unloading the entry cancels queued and running commands."""
+    queue = LunosCommandQueue(hass, 'test')
+    relays = _Relays()
+
+    running = hass.async_create_task(queue.async_request_speed('low', relays.command('low')))
+    queued = hass.async_create_task(queue.async_run_macro('toggle', relays.command('toggle')))
+    await asyncio.sleep(0)
+
+    queue.async_shutdown()
+
+    for caller in (running, queued):
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+    assert relays.applied == []
+
+
+async def test_commands_that_never_suspend(hass: HomeAssistant) -> None:
+    """Test the queue keeps working when a command completes without yielding."""
+    queue = LunosCommandQueue(hass, 'test')
+    applied: list[str] = []
+
+    for speed in ('low', 'medium', 'high'):
+
+        async def run(speed: str = speed) -> None:
+            applied.append(speed)
+
+        await asyncio.wait_for(queue.async_request_speed(speed, run), 1)
+
+    assert applied == ['low', 'medium', 'high']
+    assert queue.idle
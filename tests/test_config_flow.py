@@ -11,9 +11,11 @@ from homeassistant.data_entry_flow import FlowResultType
 from custom_components.lunos.const import (
     CONF_CONTROLLER_CODING,
     CONF_DEFAULT_SPEED,
+    CONF_DIP_INTERVAL,
     CONF_FAN_COUNT,
     CONF_RELAY_W1,
     CONF_RELAY_W2,
+    CONF_UNI_CODE,
     DEFAULT_CONTROLLER_CODING,
     DEFAULT_SPEED,
     DOMAIN,
@@ -166,3 +168,33 @@ async def test_import_flow_missing_relays(
 
     assert result['type'] == FlowResultType.ABORT
     assert result['reason'] == 'missing_relays'
+
+
+async def test_user_flow_physical_coding_switch(
+    hass: HomeAssistant,
+    _mock_load_lunos_codings: Any,
+    _mock_relay_states: None,
+) -> None:
+    """Test picking the 5/UNI coding switch position selects the matching coding."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={'source': config_entries.SOURCE_USER}
+    )
+
+    result = await hass.config_entries.flow.async_configure(
+        result['flow_id'],
+        {
+            'name': 'Test LUNOS',
+            CONF_RELAY_W1: 'switch.lunos_w1',
+            CONF_RELAY_W2: 'switch.lunos_w2',
+            CONF_CONTROLLER_CODING: DEFAULT_CONTROLLER_CODING,
+            CONF_FAN_COUNT: 1,
+            CONF_DEFAULT_SPEED: DEFAULT_SPEED,
+            CONF_UNI_CODE: '9',
+            CONF_DIP_INTERVAL: '+',
+        },
+    )
+
+    assert result['type'] == FlowResultType.CREATE_ENTRY
+    assert result['data'][CONF_CONTROLLER_CODING] == 'ego'
+    assert result['data'][CONF_UNI_CODE] == '9'
+    assert result['data'][CONF_DIP_INTERVAL] == '+'
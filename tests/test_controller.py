@@ -0,0 +1,74 @@
+"""Tests for the LUNOS 5/UNI-FR controller index."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.lunos.catalog import load_compiled_controllers
+from custom_components.lunos.const import (
+    CONF_DIP_HUMIDITY,
+    CONF_DIP_INTERVAL,
+    SPEED_HIGH,
+    SPEED_LOW,
+    SPEED_OFF,
+    SPEED_SILENT,
+)
+from custom_components.lunos.controller import ControllerIndex, dip_states_from_config
+
+
+@pytest.fixture
+def controller_index() -> ControllerIndex:
+    """Return the index built from the bundled 40269 tables."""
+    controllers = load_compiled_controllers()
+    assert controllers is not None
+    return ControllerIndex(controllers)
+
+
+def test_index_lookup(controller_index: ControllerIndex) -> None:
+    """Test (code, DIP position, switch state) lookups."""
+    found = controller_index.lookup('6', '1', '+')
+    assert found is not None
+
+    code, setting = found
+    assert code.program == 'e² 60 Short'
+    assert code.cfm == (5, 10, 15, 25)
+    assert setting.function == 'interval'
+    assert setting.meaning == 'Every 2h 15m'
+
+    assert controller_index.lookup('6', '1', 'x') is None
+    assert controller_index.lookup('Z', '1', '+') is None
+
+
+def test_codes_cover_rotary_switch(controller_index: ControllerIndex) -> None:
+    """Test every rotary coding switch position is indexed (0-9, A-E)."""
+    assert [code.code for code in controller_index.codes] == list('0123456789ABCDE')
+    assert controller_index.code('C').paired is False
+    assert controller_index.code('E').cfm == ()
+
+
+def test_airflow_per_speed(controller_index: ControllerIndex) -> None:
+    """Test airflow resolves per relay speed."""
+    code = controller_index.code('9')
+    assert code is not None
+
+    assert code.cfm_for(SPEED_OFF) == 0
+    assert code.cfm_for(SPEED_SILENT) == 0
+    assert code.cfm_for(SPEED_LOW) == 3
+    assert code.cfm_for(SPEED_HIGH) == 26
+    assert controller_index.code('E').cfm_for(SPEED_HIGH) is None
+
+
+def test_resolve_settings(controller_index: ControllerIndex) -> None:
+    """Test resolving an installation's coding and DIP switch states."""
+    dip_states = dip_states_from_config({CONF_DIP_INTERVAL: '-', CONF_DIP_HUMIDITY: '+'})
+    settings = controller_index.resolve('A', dip_states)
+    assert settings is not None
+
+    assert settings.attributes == {
+        'controller_code': 'A',
+        'interval': 'Every 4h 30m',
+        'time_delay': 'Time Delay Off',
+        'humidity_control': 'ON 50% - 70% Rh',
+    }
+    assert controller_index.resolve(None) is None
+    assert controller_index.resolve('Z') is None
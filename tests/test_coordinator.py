@@ -5,7 +5,7 @@ from __future__ import annotations
 from typing import Any
 from unittest.mock import MagicMock
 
-from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
 from homeassistant.core import HomeAssistant
 import pytest
 
@@ -115,6 +115,26 @@ async def test_coordinator_speed_detection_high(
     assert data.w2_state == STATE_ON
 
 
+async def test_coordinator_state_updated_in_place(
+    hass: HomeAssistant,
+    mock_config_entry: MagicMock,
+    mock_lunos_codings: dict[str, Any],
+    _mock_relay_states: None,
+) -> None:
+    """Test that relay updates reuse one slotted state object."""
+    coordinator = LunosCoordinator(hass, mock_config_entry, mock_lunos_codings)
+    data = await coordinator._async_update_data()
+    assert not hasattr(data, '__dict__')
+    first_update = data.updated
+
+    hass.states.async_set('switch.lunos_w1', STATE_ON)
+    assert await coordinator._async_update_data() is data
+    assert data.current_speed == SPEED_LOW
+    assert data.w1_state == STATE_ON
+    assert data.updated is not None
+    assert data.updated >= first_update
+
+
 async def test_coordinator_4speed_mode(
     hass: HomeAssistant,
     mock_lunos_codings: dict[str, Any],
@@ -139,8 +159,8 @@ async def test_coordinator_4speed_mode(
 
     # 4-speed mode should show SILENT instead of OFF when both relays are off
     assert data.current_speed == SPEED_SILENT
-    assert SPEED_OFF not in data.fan_speeds
-    assert SPEED_SILENT in data.fan_speeds
+    assert SPEED_OFF not in coordinator.profile.fan_speeds
+    assert SPEED_SILENT in coordinator.profile.fan_speeds
 
 
 async def test_coordinator_vent_modes(
@@ -151,12 +171,12 @@ async def test_coordinator_vent_modes(
 ) -> None:
     """Test that coordinator returns correct vent modes."""
     coordinator = LunosCoordinator(hass, mock_config_entry, mock_lunos_codings)
-    data = await coordinator._async_update_data()
+    vent_modes = coordinator.profile.vent_modes
 
     # e2-usa supports summer vent but not exhaust only
-    assert 'eco' in data.vent_modes
-    assert 'summer' in data.vent_modes
-    assert 'exhaust' not in data.vent_modes
+    assert 'eco' in vent_modes
+    assert 'summer' in vent_modes
+    assert 'exhaust' not in vent_modes
 
 
 async def test_coordinator_missing_relay(
@@ -172,3 +192,19 @@ async def test_coordinator_missing_relay(
     # should return None speed when relays can't be found
     assert data.current_speed is None
     assert data.w1_state is None
+
+
+async def test_coordinator_unavailable_relay(
+    hass: HomeAssistant,
+    mock_config_entry: MagicMock,
+    mock_lunos_codings: dict[str, Any],
+) -> None:
+    """Test an unavailable relay decodes to no speed (sentinel slot) instead of a guess."""
+    hass.states.async_set('switch.lunos_w1', STATE_UNAVAILABLE)
+    hass.states.async_set('switch.lunos_w2', STATE_ON)
+
+    coordinator = LunosCoordinator(hass, mock_config_entry, mock_lunos_codings)
+    data = await coordinator._async_update_data()
+
+    assert data.current_speed is None
+    assert data.w1_state == STATE_UNAVAILABLE
@@ -11,6 +11,7 @@ import pytest
 from custom_components.lunos.const import CONF_RELAY_W1, CONF_RELAY_W2
 from custom_components.lunos.coordinator import LunosData
 from custom_components.lunos.diagnostics import async_get_config_entry_diagnostics
+from custom_components.lunos.profile import compile_profile
 
 
 @pytest.fixture
@@ -19,15 +20,8 @@ def mock_runtime_data(
 ) -> MagicMock:
     """Create mock runtime data."""
     coordinator = MagicMock()
-    coordinator.data = LunosData(
-        current_speed='medium',
-        w1_state='off',
-        w2_state='on',
-        model_config=mock_lunos_codings['e2-usa'],
-        relay_state_map={},
-        fan_speeds=['off', 'low', 'medium', 'high'],
-        vent_modes=['eco', 'summer'],
-    )
+    coordinator.data = LunosData(current_speed='medium', w1_state='off', w2_state='on')
+    coordinator.profile = compile_profile('e2-usa', mock_lunos_codings['e2-usa'])
 
     runtime_data = MagicMock()
     runtime_data.coordinator = coordinator
@@ -89,8 +83,8 @@ async def test_diagnostics_coordinator_state(
     assert coord_state['current_speed'] == 'medium'
     assert coord_state['w1_state'] == 'off'
     assert coord_state['w2_state'] == 'on'
-    assert 'fan_speeds' in coord_state
-    assert 'vent_modes' in coord_state
+    assert coord_state['fan_speeds'] == ['off', 'low', 'medium', 'high']
+    assert coord_state['vent_modes'] == ['eco', 'summer']
 
 
 async def test_diagnostics_model_config(
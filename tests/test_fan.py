@@ -2,47 +2,54 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import Any
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, call, patch
 
-from homeassistant.const import STATE_OFF, STATE_ON
-from homeassistant.core import HomeAssistant
+from homeassistant.const import SERVICE_TURN_OFF, SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, ServiceCall
 import pytest
 
+from custom_components.lunos.catalog import load_compiled_controllers
+from custom_components.lunos.command_queue import LunosCommandQueue
 from custom_components.lunos.const import (
+    ATTR_PENDING,
+    ATTR_PENDING_SPEED,
+    CONF_FILTER_RESET_SCRIPT,
+    CONF_NON_BLOCKING,
     DEFAULT_SPEED,
     DOMAIN,
     SPEED_HIGH,
     SPEED_LOW,
     SPEED_MEDIUM,
     SPEED_OFF,
+    SPEED_TURBO,
 )
+from custom_components.lunos.controller import ControllerIndex
 from custom_components.lunos.coordinator import LunosCoordinator, LunosData
 from custom_components.lunos.fan import LUNOSFan
+from custom_components.lunos.latency import RelayLatency
+from custom_components.lunos.profile import compile_profile
+from custom_components.lunos.relay import RelayWriter
+from custom_components.lunos.sequencer import ToggleSequencer
+from custom_components.lunos.shadow import ControllerShadow
+from custom_components.lunos.transition import W1
 
 
 @pytest.fixture
-def mock_coordinator(
-    hass: HomeAssistant,
-    mock_lunos_codings: dict[str, Any],
-) -> MagicMock:
+def mock_coordinator(hass: HomeAssistant, mock_lunos_codings: dict[str, Any]) -> MagicMock:
     """Create a mock coordinator."""
     coordinator = MagicMock(spec=LunosCoordinator)
     coordinator.hass = hass
-    coordinator.data = LunosData(
-        current_speed=SPEED_OFF,
-        w1_state=STATE_OFF,
-        w2_state=STATE_OFF,
-        model_config=mock_lunos_codings['e2-usa'],
-        relay_state_map={
-            SPEED_OFF: [STATE_OFF, STATE_OFF],
-            SPEED_LOW: [STATE_ON, STATE_OFF],
-            SPEED_MEDIUM: [STATE_OFF, STATE_ON],
-            SPEED_HIGH: [STATE_ON, STATE_ON],
-        },
-        fan_speeds=[SPEED_OFF, SPEED_LOW, SPEED_MEDIUM, SPEED_HIGH],
-        vent_modes=['eco', 'summer'],
-    )
+    coordinator.model_config = mock_lunos_codings['e2-usa']
+    coordinator.profile = compile_profile('e2-usa', coordinator.model_config)
+    coordinator.last_update_success = True
+    coordinator.data = LunosData(current_speed=SPEED_OFF, w1_state=STATE_OFF, w2_state=STATE_OFF)
+    coordinator.command_queue = LunosCommandQueue(hass, 'Test LUNOS')
+    coordinator.relay_latency = RelayLatency(hass, 'test_entry_id')
+    coordinator.relay_writer = RelayWriter(hass, 'Test LUNOS')
+    coordinator.toggle_sequencer = ToggleSequencer(hass, 'Test LUNOS')
+    coordinator.controller_shadow = ControllerShadow()
     return coordinator
 
 
@@ -67,7 +74,6 @@ async def test_fan_creation(
     fan = LUNOSFan(
         coordinator=mock_coordinator,
         entry=mock_entry,
-        coding_config=mock_lunos_codings,
         name='Test LUNOS Fan',
         relay_w1='switch.lunos_w1',
         relay_w2='switch.lunos_w2',
@@ -77,22 +83,29 @@ async def test_fan_creation(
 
     assert fan.unique_id == 'switch.lunos_w1_switch.lunos_w2'
     assert fan.speed_count == 3  # low, medium, high (not counting off)
-    assert SPEED_OFF in fan._fan_speeds
+    assert SPEED_OFF in fan._profile.fan_speeds
     assert fan.preset_modes == ['eco', 'summer']
 
+    # the fan reads the coordinator's shared profile, also after a codings reload
+    assert fan._profile is mock_coordinator.profile
+    fan.entity_id = 'fan.test_lunos_fan'
+    mock_coordinator.model_config = mock_lunos_codings['e2-4speed']
+    mock_coordinator.profile = compile_profile('e2-4speed', mock_coordinator.model_config)
+    fan.async_apply_profile(None)
+    assert fan.speed_count == 4
+    assert fan.extra_state_attributes['fan_speeds'] == mock_coordinator.profile.fan_speeds
+
 
 async def test_fan_is_on(
     hass: HomeAssistant,
     mock_coordinator: MagicMock,
     mock_entry: MagicMock,
-    mock_lunos_codings: dict[str, Any],
     _mock_relay_states: None,
 ) -> None:
     """Test fan is_on property."""
     fan = LUNOSFan(
         coordinator=mock_coordinator,
         entry=mock_entry,
-        coding_config=mock_lunos_codings,
         name='Test LUNOS Fan',
         relay_w1='switch.lunos_w1',
         relay_w2='switch.lunos_w2',
@@ -112,14 +125,12 @@ async def test_fan_percentage(
     hass: HomeAssistant,
     mock_coordinator: MagicMock,
     mock_entry: MagicMock,
-    mock_lunos_codings: dict[str, Any],
     _mock_relay_states: None,
 ) -> None:
     """Test fan percentage calculation."""
     fan = LUNOSFan(
         coordinator=mock_coordinator,
         entry=mock_entry,
-        coding_config=mock_lunos_codings,
         name='Test LUNOS Fan',
         relay_w1='switch.lunos_w1',
         relay_w2='switch.lunos_w2',
@@ -148,7 +159,6 @@ async def test_fan_supported_features(
     hass: HomeAssistant,
     mock_coordinator: MagicMock,
     mock_entry: MagicMock,
-    mock_lunos_codings: dict[str, Any],
     _mock_relay_states: None,
 ) -> None:
     """Test fan supported features."""
@@ -157,7 +167,6 @@ async def test_fan_supported_features(
     fan = LUNOSFan(
         coordinator=mock_coordinator,
         entry=mock_entry,
-        coding_config=mock_lunos_codings,
         name='Test LUNOS Fan',
         relay_w1='switch.lunos_w1',
         relay_w2='switch.lunos_w2',
@@ -177,14 +186,12 @@ async def test_fan_extra_attributes(
     hass: HomeAssistant,
     mock_coordinator: MagicMock,
     mock_entry: MagicMock,
-    mock_lunos_codings: dict[str, Any],
     _mock_relay_states: None,
 ) -> None:
     """Test fan extra state attributes."""
     fan = LUNOSFan(
         coordinator=mock_coordinator,
         entry=mock_entry,
-        coding_config=mock_lunos_codings,
         name='Test LUNOS Fan',
         relay_w1='switch.lunos_w1',
         relay_w2='switch.lunos_w2',
@@ -208,14 +215,12 @@ async def test_fan_device_info(
     hass: HomeAssistant,
     mock_coordinator: MagicMock,
     mock_entry: MagicMock,
-    mock_lunos_codings: dict[str, Any],
     _mock_relay_states: None,
 ) -> None:
     """Test fan device info."""
     fan = LUNOSFan(
         coordinator=mock_coordinator,
         entry=mock_entry,
-        coding_config=mock_lunos_codings,
         name='Test LUNOS Fan',
         relay_w1='switch.lunos_w1',
         relay_w2='switch.lunos_w2',
@@ -234,14 +239,12 @@ async def test_fan_supports_summer_ventilation(
     hass: HomeAssistant,
     mock_coordinator: MagicMock,
     mock_entry: MagicMock,
-    mock_lunos_codings: dict[str, Any],
     _mock_relay_states: None,
 ) -> None:
     """Test summer ventilation support detection."""
     fan = LUNOSFan(
         coordinator=mock_coordinator,
         entry=mock_entry,
-        coding_config=mock_lunos_codings,
         name='Test LUNOS Fan',
         relay_w1='switch.lunos_w1',
         relay_w2='switch.lunos_w2',
@@ -251,3 +254,326 @@ async def test_fan_supports_summer_ventilation(
 
     # e2-usa supports summer vent
     assert fan.supports_summer_ventilation() is True
+
+
+async def test_fan_controller_attributes(
+    hass: HomeAssistant,
+    mock_coordinator: MagicMock,
+    mock_entry: MagicMock,
+    _mock_relay_states: None,
+) -> None:
+    """Test physical 5/UNI settings are exposed as attributes."""
+    controller = ControllerIndex(load_compiled_controllers() or {}).resolve('6', {'2': '+'})
+
+    fan = LUNOSFan(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        name='Test LUNOS Fan',
+        relay_w1='switch.lunos_w1',
+        relay_w2='switch.lunos_w2',
+        default_speed=DEFAULT_SPEED,
+        controller=controller,
+    )
+    fan.hass = hass
+    fan._update_speed(SPEED_MEDIUM)
+
+    attrs = fan.extra_state_attributes
+    assert attrs['controller_code'] == '6'
+    assert attrs['time_delay'] == 'Time Delay 30m'
+    assert attrs['controller_cfm'] == 15
+
+    # a reload that no longer resolves a controller removes every controller attribute
+    fan.entity_id = 'fan.test_lunos_fan'
+    fan.async_apply_profile(None)
+    attrs = fan.extra_state_attributes
+    assert 'controller_code' not in attrs
+    assert 'time_delay' not in attrs
+    assert 'controller_cfm' not in attrs
+
+
+async def test_fan_turbo_speed(
+    hass: HomeAssistant,
+    mock_coordinator: MagicMock,
+    mock_entry: MagicMock,
+    mock_lunos_codings: dict[str, Any],
+    _mock_relay_states: None,
+) -> None:
+    """Test turbo is the fifth speed and is entered by a W2 flip at HIGH."""
+    mock_coordinator.model_config = mock_lunos_codings['e2-usa'] | {'supports_turbo_mode': True}
+    mock_coordinator.profile = compile_profile('e2-usa', mock_coordinator.model_config)
+    fan = LUNOSFan(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        name='Test LUNOS Fan',
+        relay_w1='switch.lunos_w1',
+        relay_w2='switch.lunos_w2',
+        default_speed=DEFAULT_SPEED,
+    )
+    fan.hass = hass
+    fan.entity_id = 'fan.test_lunos_fan'
+
+    assert fan.speed_count == 4
+    assert fan._profile.fan_speeds[-1] == SPEED_TURBO
+
+    with (
+        patch.object(fan, 'async_call_switch_service', new=AsyncMock()) as mock_call,
+        patch('custom_components.lunos.fan.asyncio.sleep', new=AsyncMock()),
+    ):
+        await fan.async_set_percentage(100)
+
+    assert mock_call.await_args_list == [
+        call(SERVICE_TURN_ON, 'switch.lunos_w1', confirm=True),
+        call(SERVICE_TURN_ON, 'switch.lunos_w2', confirm=True),
+        call(SERVICE_TURN_OFF, 'switch.lunos_w2'),
+        call(SERVICE_TURN_ON, 'switch.lunos_w2'),
+    ]
+    assert fan.percentage == 100
+    assert fan.extra_state_attributes['cmh'] is None  # no turbo behavior in this coding
+
+    # relays read HIGH while in turbo
+    hass.states.async_set('switch.lunos_w1', STATE_ON)
+    hass.states.async_set('switch.lunos_w2', STATE_ON)
+    mock_coordinator.data = LunosData(
+        current_speed=SPEED_HIGH, w1_state=STATE_ON, w2_state=STATE_ON
+    )
+    assert fan._determine_current_relay_speed() == SPEED_TURBO
+
+    # repeating the request (or turning on at the last speed) does not flip W2 again
+    with patch.object(fan, 'async_call_switch_service', new=AsyncMock()) as mock_call:
+        await fan.async_set_percentage(100)
+        await fan.async_turn_on()
+    mock_call.assert_not_awaited()
+
+
+async def test_fan_non_blocking_speed_change(
+    hass: HomeAssistant,
+    mock_coordinator: MagicMock,
+    mock_entry: MagicMock,
+    _mock_relay_states: None,
+) -> None:
+    """Test non-blocking mode shows the target at once and reports pending relay writes."""
+    mock_entry.data = mock_entry.data | {CONF_NON_BLOCKING: True}
+    fan = LUNOSFan(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        name='Test LUNOS Fan',
+        relay_w1='switch.lunos_w1',
+        relay_w2='switch.lunos_w2',
+        default_speed=DEFAULT_SPEED,
+    )
+    fan.hass = hass
+    fan.entity_id = 'fan.test_lunos_fan'
+
+    relays_written = asyncio.Event()
+
+    async def write_relay(*_args: Any, **_kwargs: Any) -> None:
+        await relays_written.wait()
+
+    with patch.object(fan, 'async_call_switch_service', side_effect=write_relay) as mock_call:
+        await fan.async_set_percentage(100)
+
+        # the service returned before any relay was written
+        assert fan.percentage == 100
+        assert fan.extra_state_attributes[ATTR_PENDING] is True
+        assert fan.extra_state_attributes[ATTR_PENDING_SPEED] == SPEED_HIGH
+        assert fan.extra_state_attributes['speed'] == SPEED_HIGH
+        assert fan.extra_state_attributes['cfm'] == 20  # metrics follow the target speed
+        assert hass.states.get('fan.test_lunos_fan').attributes[ATTR_PENDING] is True
+
+        relays_written.set()
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert mock_call.await_count == 2
+    assert fan.percentage == 100
+    assert fan.extra_state_attributes[ATTR_PENDING] is False
+    assert ATTR_PENDING_SPEED not in fan.extra_state_attributes
+    assert hass.states.get('fan.test_lunos_fan').attributes[ATTR_PENDING] is False
+
+
+async def test_fan_writes_only_changed_relays(
+    hass: HomeAssistant,
+    mock_coordinator: MagicMock,
+    mock_entry: MagicMock,
+) -> None:
+    """Test speed changes write only the relays that change, in the planned order."""
+    fan = LUNOSFan(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        name='Test LUNOS Fan',
+        relay_w1='switch.lunos_w1',
+        relay_w2='switch.lunos_w2',
+        default_speed=DEFAULT_SPEED,
+    )
+    fan.hass = hass
+    fan.entity_id = 'fan.test_lunos_fan'
+    hass.states.async_set('switch.lunos_w1', STATE_ON)
+    hass.states.async_set('switch.lunos_w2', STATE_OFF)
+
+    with patch.object(fan, 'async_call_switch_service', new=AsyncMock()) as mock_call:
+        await fan.async_set_preset_mode(SPEED_MEDIUM)
+        # low -> medium goes through high rather than off
+        assert mock_call.await_args_list == [
+            call(SERVICE_TURN_ON, 'switch.lunos_w2', confirm=True),
+            call(SERVICE_TURN_OFF, 'switch.lunos_w1', confirm=True),
+        ]
+
+        mock_call.reset_mock()
+        hass.states.async_set('switch.lunos_w1', STATE_OFF)
+        hass.states.async_set('switch.lunos_w2', STATE_ON)
+        await fan.async_set_preset_mode(SPEED_HIGH)
+        assert mock_call.await_args_list == [call(SERVICE_TURN_ON, 'switch.lunos_w1', confirm=True)]
+
+
+async def test_fan_back_to_back_changes_before_relays_report(
+    hass: HomeAssistant,
+    mock_coordinator: MagicMock,
+    mock_entry: MagicMock,
+    _mock_relay_states: None,
+) -> None:
+    """Test queued changes diff against the written relay states, not the lagging entity state."""
+    fan = LUNOSFan(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        name='Test LUNOS Fan',
+        relay_w1='switch.lunos_w1',
+        relay_w2='switch.lunos_w2',
+        default_speed=DEFAULT_SPEED,
+    )
+    fan.hass = hass
+    fan.entity_id = 'fan.test_lunos_fan'
+    calls: list[tuple[str, str]] = []
+
+    async def echo_later(call: ServiceCall) -> None:
+        # the relay reports its new state only after the service call has returned
+        entity_id = call.data['entity_id']
+        calls.append((call.service, entity_id))
+        state = STATE_ON if call.service == SERVICE_TURN_ON else STATE_OFF
+        hass.loop.call_soon(hass.states.async_set, entity_id, state)
+
+    hass.services.async_register('switch', SERVICE_TURN_ON, echo_later)
+    hass.services.async_register('switch', SERVICE_TURN_OFF, echo_later)
+
+    with patch('custom_components.lunos.fan.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+        await asyncio.gather(
+            fan.async_set_preset_mode(SPEED_LOW), fan.async_set_preset_mode(SPEED_OFF)
+        )
+        await hass.async_block_till_done()
+
+    assert calls == [(SERVICE_TURN_ON, 'switch.lunos_w1'), (SERVICE_TURN_OFF, 'switch.lunos_w1')]
+    assert fan._current_speed == SPEED_OFF
+    assert hass.states.get('switch.lunos_w1').state == STATE_OFF
+    # two W1 edges cannot complete a mode sequence, so the second one was not delayed
+    assert not [c.args[0] for c in mock_sleep.await_args_list if c.args[0]]
+
+    # W2 has not changed recently, so a change writing only W2 is not delayed
+    calls.clear()
+    with patch('custom_components.lunos.fan.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+        await fan.async_set_preset_mode(SPEED_MEDIUM)
+    assert calls == [(SERVICE_TURN_ON, 'switch.lunos_w2')]
+    mock_sleep.assert_not_awaited()
+
+
+def _register_device_script(hass: HomeAssistant, relay_entity_id: str) -> list[ServiceCall]:
+    """Register a script.turn_on stand-in that flips a relay like a device-side script."""
+    calls: list[ServiceCall] = []
+
+    async def run_script(call: ServiceCall) -> None:
+        calls.append(call)
+        for flip in range(6):
+            state = STATE_ON if flip % 2 else STATE_OFF
+            hass.loop.call_later(flip * 0.01, hass.states.async_set, relay_entity_id, state)
+
+    hass.services.async_register('script', SERVICE_TURN_ON, run_script)
+    return calls
+
+
+async def test_fan_filter_reset_runs_device_script(
+    hass: HomeAssistant,
+    mock_coordinator: MagicMock,
+    mock_entry: MagicMock,
+    _mock_relay_states: None,
+) -> None:
+    """Test a configured device script replaces the six timed flips with one command."""
+    mock_entry.data = mock_entry.data | {CONF_FILTER_RESET_SCRIPT: 'script.lunos_toggle_w1'}
+    fan = LUNOSFan(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        name='Test LUNOS Fan',
+        relay_w1='switch.lunos_w1',
+        relay_w2='switch.lunos_w2',
+        default_speed=DEFAULT_SPEED,
+    )
+    fan.hass = hass
+    fan.entity_id = 'fan.test_lunos_fan'
+    fan._current_speed = SPEED_LOW
+    script_calls = _register_device_script(hass, 'switch.lunos_w1')
+
+    with (
+        patch.object(fan, 'async_call_switch_service', new=AsyncMock()) as mock_call,
+        patch.object(fan, '_async_apply_speed', new=AsyncMock()) as mock_restore,
+    ):
+        await fan.async_clear_filter_reminder()
+        await asyncio.sleep(0.1)
+
+    assert [c.data['entity_id'] for c in script_calls] == ['script.lunos_toggle_w1']
+    mock_call.assert_not_awaited()
+    mock_restore.assert_awaited_once_with(SPEED_LOW, diff=False)
+    assert hass.states.get('switch.lunos_w1').state == STATE_ON
+
+    # W1 is not written again until the device-side sequence left the detection window
+    assert mock_coordinator.controller_shadow.delay_before({W1: 0.0}) > 3
+
+
+async def test_fan_unchanged_relay_write_records_no_edge(
+    hass: HomeAssistant,
+    mock_coordinator: MagicMock,
+    mock_entry: MagicMock,
+    _mock_relay_states: None,
+) -> None:
+    """Test a write that leaves the relay in its state adds no edge to the controller shadow."""
+    fan = LUNOSFan(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        name='Test LUNOS Fan',
+        relay_w1='switch.lunos_w1',
+        relay_w2='switch.lunos_w2',
+        default_speed=DEFAULT_SPEED,
+    )
+    fan.hass = hass
+    hass.services.async_register('switch', SERVICE_TURN_ON, AsyncMock())
+    hass.services.async_register('switch', SERVICE_TURN_OFF, AsyncMock())
+    shadow = mock_coordinator.controller_shadow
+
+    await fan.async_call_switch_service(SERVICE_TURN_OFF, 'switch.lunos_w1')
+    assert shadow.toggles(W1) == 0
+
+    await fan.async_call_switch_service(SERVICE_TURN_ON, 'switch.lunos_w1')
+    await fan.async_call_switch_service(SERVICE_TURN_ON, 'switch.lunos_w1')
+    assert shadow.toggles(W1) == 1
+
+
+async def test_fan_mode_toggle_ignores_unknown_relay(
+    hass: HomeAssistant,
+    mock_coordinator: MagicMock,
+    mock_entry: MagicMock,
+    _mock_relay_states: None,
+) -> None:
+    """Test a mode toggle for an entity that is not W1 or W2 writes nothing."""
+    fan = LUNOSFan(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        name='Test LUNOS Fan',
+        relay_w1='switch.lunos_w1',
+        relay_w2='switch.lunos_w2',
+        default_speed=DEFAULT_SPEED,
+    )
+    fan.hass = hass
+
+    with (
+        patch.object(fan, 'async_call_switch_service', new=AsyncMock()) as mock_call,
+        patch.object(fan, '_async_apply_speed', new=AsyncMock()) as mock_restore,
+    ):
+        await fan.toggle_relay_to_set_lunos_mode('switch.other')
+
+    mock_call.assert_not_awaited()
+    mock_restore.assert_not_awaited()
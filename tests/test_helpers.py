@@ -0,0 +1,183 @@
+"""Tests for LUNOS helpers (shared coding catalog cache)."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lunos import catalog, helpers
+from custom_components.lunos.const import (
+    CONF_CONTROLLER_CODING,
+    CONF_FAN_COUNT,
+    CONF_RELAY_W1,
+    CONF_RELAY_W2,
+    DEFAULT_CONTROLLER_CODING,
+    DOMAIN,
+)
+from custom_components.lunos.helpers import DATA_CODING_CACHE, async_get_lunos_codings
+
+
+async def test_concurrent_callers_share_one_parse(
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+) -> None:
+    """Test that many concurrent callers trigger a single YAML parse."""
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings) as mock_load:
+        results = await asyncio.gather(*(async_get_lunos_codings(hass) for _ in range(40)))
+
+    assert mock_load.call_count == 1
+    assert all(result is results[0] for result in results)
+    assert hass.data[DATA_CODING_CACHE].loads == 1
+
+
+async def test_entries_and_flows_share_one_parse(
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+) -> None:
+    """Test one parse no matter how many entries and flows start."""
+    entries = []
+    for index in range(40):
+        relay_w1 = f'switch.lunos_{index}_w1'
+        relay_w2 = f'switch.lunos_{index}_w2'
+        hass.states.async_set(relay_w1, 'off')
+        hass.states.async_set(relay_w2, 'off')
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f'LUNOS {index}',
+            unique_id=f'{relay_w1}_{relay_w2}',
+            data={
+                'name': f'LUNOS {index}',
+                CONF_RELAY_W1: relay_w1,
+                CONF_RELAY_W2: relay_w2,
+                CONF_CONTROLLER_CODING: DEFAULT_CONTROLLER_CODING,
+                CONF_FAN_COUNT: 2,
+            },
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings) as mock_load:
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+
+        for _ in range(3):
+            await hass.config_entries.flow.async_init(
+                DOMAIN, context={'source': config_entries.SOURCE_USER}
+            )
+        await hass.config_entries.options.async_init(entries[0].entry_id)
+
+    assert all(entry.state is config_entries.ConfigEntryState.LOADED for entry in entries)
+    assert mock_load.call_count == 1
+
+
+async def test_cache_invalidated_when_file_changes(
+    hass: HomeAssistant,
+    tmp_path: Path,
+) -> None:
+    """Test the catalog is re-parsed only after the codings file mtime changes."""
+    codings_path = tmp_path / 'lunos-codings.yaml'
+    codings_path.write_text('e2:\n  name: LUNOS e2\n')
+
+    with patch.object(helpers, 'CODINGS_PATH', codings_path):
+        first = await async_get_lunos_codings(hass)
+        second = await async_get_lunos_codings(hass)
+        assert first is second
+        assert hass.data[DATA_CODING_CACHE].loads == 1
+
+        codings_path.write_text('e2:\n  name: LUNOS e2 (edited)\n')
+        mtime = codings_path.stat().st_mtime + 10
+        os.utime(codings_path, (mtime, mtime))
+
+        third = await async_get_lunos_codings(hass)
+
+    assert third['e2']['name'] == 'LUNOS e2 (edited)'
+    assert hass.data[DATA_CODING_CACHE].loads == 2
+
+
+async def test_user_overlay_is_merged_and_memoized(
+    hass: HomeAssistant,
+    tmp_path: Path,
+    mock_load_lunos_codings: Any,
+) -> None:
+    """Test <config>/lunos_codings.yaml is deep-merged once per overlay change."""
+    hass.config.config_dir = str(tmp_path)
+    overlay_path = tmp_path / 'lunos_codings.yaml'
+    overlay_path.write_text(
+        'e2-usa:\n'
+        '  behavior:\n'
+        '    high: {cfm: 22}\n'  # measured locally
+        'e2-custom:\n'
+        '  name: Custom e2\n'
+        '  behavior: {low: {cmg: 12}}\n'
+    )
+
+    first = await async_get_lunos_codings(hass)
+    second = await async_get_lunos_codings(hass)
+
+    assert first is second
+    assert mock_load_lunos_codings.call_count == 1
+    assert first['e2-usa']['behavior']['high'] == {'cfm': 22, 'decibel': 26}
+    assert first['e2-usa']['behavior']['low'] == {'cfm': 10, 'decibel': 16.5}
+    assert first['e2-usa']['name'] == 'LUNOS e2 (USA)'
+    assert first['e2-custom']['behavior']['low'] == {'cmh': 12}
+    assert 'e2-custom' in helpers.get_coding_options(first)
+
+    # an invalid overlay coding is skipped; the built-in coding is kept
+    overlay_path.write_text('e2-usa:\n  supports_of: true\n')
+    mtime = overlay_path.stat().st_mtime + 10
+    os.utime(overlay_path, (mtime, mtime))
+
+    third = await async_get_lunos_codings(hass)
+
+    assert mock_load_lunos_codings.call_count == 2
+    assert third['e2-usa']['behavior']['high'] == {'cfm': 20, 'decibel': 26}
+    assert 'supports_of' not in third['e2-usa']
+    assert 'e2-custom' not in third
+
+
+def test_compiled_catalog_is_current() -> None:
+    """Test the shipped compiled catalog matches lunos-codings.yaml.
+
+    Regenerate with: python -m custom_components.lunos.catalog
+    """
+    assert catalog.load_compiled_codings() == catalog.normalize_codings(catalog.load_yaml_codings())
+
+
+def test_stale_compiled_catalog_falls_back_to_yaml(tmp_path: Path) -> None:
+    """Test a compiled catalog whose source hash is stale is ignored."""
+    source = tmp_path / 'lunos-codings.yaml'
+    compiled = tmp_path / 'lunos-codings.json'
+    source.write_text('e2:\n  name: LUNOS e2\n')
+    catalog.write_compiled_catalog(compiled, source)
+
+    assert catalog.load_compiled_codings(compiled, source) == {'e2': {'name': 'LUNOS e2'}}
+
+    source.write_text('e2:\n  name: LUNOS e2 (edited)\n')
+    assert catalog.load_compiled_codings(compiled, source) is None
+
+    with (
+        patch.object(helpers, 'CODINGS_PATH', source),
+        patch.object(helpers, 'COMPILED_CODINGS_PATH', compiled),
+    ):
+        assert helpers.load_lunos_codings() == {'e2': {'name': 'LUNOS e2 (edited)'}}
+
+
+def test_catalog_reload_reads_artifact_once() -> None:
+    """Test a reload parses the shared artifact once for codings and controllers."""
+    with patch.object(
+        catalog, 'load_compiled_catalog', wraps=catalog.load_compiled_catalog
+    ) as mock_load:
+        _mtime, codings, controller_index = helpers._load_codings_if_changed(None)
+
+    assert mock_load.call_count == 1
+    assert codings == catalog.load_compiled_codings()
+    assert controller_index is not None
+    assert controller_index.type is not None
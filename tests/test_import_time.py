@@ -0,0 +1,73 @@
+"""Import cost of the LUNOS integration package and its platforms.
+
+Wall-clock import budgets are too noisy on shared CI runners, so this asserts
+on what gets imported instead: loading the integration or one of its platforms
+must not pull in any module Home Assistant has not already loaded for it.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+# Home Assistant modules that are always loaded before HA imports an integration
+# or one of its platforms (these pull in voluptuous, config_validation,
+# entity_platform, selectors, ...); their cost is not attributed to this integration.
+PRELOADED = (
+    'homeassistant.core',
+    'homeassistant.config_entries',
+    'homeassistant.helpers.update_coordinator',
+    'homeassistant.components.fan',
+    'homeassistant.components.diagnostics',
+)
+
+# modules HA imports from this integration, in load order
+MODULES = (
+    'custom_components.lunos',
+    'custom_components.lunos.fan',
+    'custom_components.lunos.config_flow',
+    'custom_components.lunos.diagnostics',
+)
+
+# external modules each one may add on top of PRELOADED (deferred to first use otherwise)
+ALLOWED_IMPORTS: dict[str, set[str]] = {module: set() for module in MODULES}
+
+# only needed once the catalog is (re)loaded in the executor or by the CLI
+DEFERRED = ('custom_components.lunos.catalog',)
+
+SCRIPT = f"""
+import json, sys
+for module in {PRELOADED!r}:
+    __import__(module)
+added = {{}}
+for module in {MODULES!r}:
+    before = set(sys.modules)
+    __import__(module)
+    added[module] = sorted(
+        name for name in set(sys.modules) - before
+        if name.split('.', 1)[0] != 'custom_components'
+    )
+    added[module] += [name for name in {DEFERRED!r} if name in sys.modules]
+print(json.dumps(added))
+"""
+
+
+def test_imports_only_preloaded_modules() -> None:
+    """Test the package and platforms add no imports beyond what HA already loaded."""
+    result = subprocess.run(
+        [sys.executable, '-c', SCRIPT],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        text=True,
+    )
+    added = json.loads(result.stdout)
+
+    unexpected = {
+        module: sorted(set(names) - ALLOWED_IMPORTS[module])
+        for module, names in added.items()
+        if set(names) - ALLOWED_IMPORTS[module]
+    }
+    assert not unexpected
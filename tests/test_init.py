@@ -0,0 +1,246 @@
+"""Tests for the LUNOS integration setup and domain services."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import copy
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import config_entries
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_mock_service,
+)
+import voluptuous as vol
+
+from custom_components.lunos import helpers
+from custom_components.lunos.const import (
+    CFM_TO_CMH,
+    DOMAIN,
+    SERVICE_RELOAD_CODINGS,
+    SERVICE_SET_AIRFLOW,
+)
+
+
+async def test_setup_many_fans_without_sleeping(
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+    add_entry: Callable[[str, str], MockConfigEntry],
+    set_relay: Callable[[str, str], Awaitable[None]],
+) -> None:
+    """Test fans derive their speed from relay events without any sleep-based waits."""
+    entries = [add_entry(f'fan_{index}', 'e2-usa') for index in range(50)]
+
+    with (
+        patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings),
+        patch('asyncio.sleep', wraps=asyncio.sleep) as mock_sleep,
+    ):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+
+        registry = er.async_get(hass)
+        entity_ids = [
+            registry.async_get_entity_id('fan', DOMAIN, entry.unique_id) for entry in entries
+        ]
+        assert all(
+            hass.states.get(entity_id).attributes['speed'] == 'medium' for entity_id in entity_ids
+        )
+
+        # a relay change is reflected once its partner relay had the pair window to follow
+        await set_relay('switch.fan_0_w1', 'on')
+        assert hass.states.get(entity_ids[0]).attributes['speed'] == 'high'
+
+    assert not [sleep for sleep in mock_sleep.call_args_list if sleep.args and sleep.args[0]]
+
+
+async def test_relay_event_handled_once_by_coordinator(
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+    add_entry: Callable[[str, str], MockConfigEntry],
+    set_relay: Callable[[str, str], Awaitable[None]],
+) -> None:
+    """Test the coordinator owns the relay subscription: one relay event, one fan state write."""
+    entry = add_entry('usa', 'e2-usa')
+
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+
+    entity_id = er.async_get(hass).async_get_entity_id('fan', DOMAIN, entry.unique_id)
+    coordinator = entry.runtime_data.coordinator
+    fan_writes = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    with patch.object(
+        coordinator, '_update_state', wraps=coordinator._update_state
+    ) as mock_update_state:
+        await set_relay('switch.usa_w1', 'on')
+
+    mock_update_state.assert_called_once_with('on', 'on')
+    assert coordinator.data.current_speed == 'high'
+    assert [event.data['entity_id'] for event in fan_writes] == ['switch.usa_w1', entity_id]
+    assert hass.states.get(entity_id).attributes['speed'] == 'high'
+
+    # attribute-only relay updates are not transitions
+    fan_writes.clear()
+    hass.states.async_set('switch.usa_w1', 'on', {'linkquality': 80})
+    await hass.async_block_till_done()
+    assert [event.data['entity_id'] for event in fan_writes] == ['switch.usa_w1']
+
+    # unloading the entry stops the coordinator's relay subscription
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await set_relay('switch.usa_w1', 'off')
+    assert coordinator.data.current_speed == 'high'
+
+
+async def test_reload_codings_updates_only_affected_entries(
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+    add_entry: Callable[[str, str], MockConfigEntry],
+) -> None:
+    """Test reloading codings pushes new profiles only into entries whose coding changed."""
+    usa = add_entry('usa', 'e2-usa')
+    ego = add_entry('ego', 'ego')
+
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+
+    entity_id = er.async_get(hass).async_get_entity_id('fan', DOMAIN, usa.unique_id)
+    assert entity_id is not None
+    usa_coordinator = usa.runtime_data.coordinator
+    ego_profile = ego.runtime_data.coordinator.profile
+    assert hass.states.get(entity_id).attributes['cfm'] == 15
+
+    codings = copy.deepcopy(mock_lunos_codings)
+    codings['e2-usa']['behavior']['medium']['cfm'] = 17
+    codings['e2-usa']['cycle_seconds'] = 60
+
+    with (
+        patch.object(helpers, 'load_lunos_codings', return_value=codings) as mock_load,
+        patch.object(usa_coordinator, '_async_update_data') as mock_refresh,
+    ):
+        response = await hass.services.async_call(
+            DOMAIN, SERVICE_RELOAD_CODINGS, {}, blocking=True, return_response=True
+        )
+        await hass.async_block_till_done()
+
+    assert mock_load.call_count == 1
+    assert response == {'changed_codings': ['e2-usa'], 'updated_entries': [usa.entry_id]}
+
+    # applied in place: same coordinator, no relay re-probe, attributes refreshed
+    assert usa.runtime_data.coordinator is usa_coordinator
+    mock_refresh.assert_not_called()
+    assert usa_coordinator.profile.metrics_for('medium').cfm == 17
+    state = hass.states.get(entity_id)
+    assert state.attributes['cfm'] == 17
+    assert state.attributes['cycle_seconds'] == 60
+    assert state.attributes['speed'] == 'medium'
+
+    assert ego.runtime_data.coordinator.profile is ego_profile
+    assert ego.runtime_data.coding_config is codings
+
+
+async def test_reload_codings_after_cache_refresh(
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+    add_entry: Callable[[str, str], MockConfigEntry],
+) -> None:
+    """Test entries are updated even if a flow refreshed the shared cache after the edit."""
+    usa = add_entry('usa', 'e2-usa')
+
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+    entity_id = er.async_get(hass).async_get_entity_id('fan', DOMAIN, usa.unique_id)
+
+    codings = copy.deepcopy(mock_lunos_codings)
+    codings['e2-usa']['behavior']['medium']['cfm'] = 17
+
+    with (
+        patch.object(helpers, 'load_lunos_codings', return_value=codings),
+        patch.object(helpers, '_codings_mtime', return_value=(1.0, 1.0, 1.0, None)),
+    ):
+        # opening the config flow reloads the edited catalog into the shared cache
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={'source': config_entries.SOURCE_USER}
+        )
+        hass.config_entries.flow.async_abort(result['flow_id'])
+
+        response = await hass.services.async_call(
+            DOMAIN, SERVICE_RELOAD_CODINGS, {}, blocking=True, return_response=True
+        )
+        await hass.async_block_till_done()
+
+    assert response == {'changed_codings': ['e2-usa'], 'updated_entries': [usa.entry_id]}
+    assert hass.states.get(entity_id).attributes['cfm'] == 17
+
+
+async def test_reload_codings_without_changes(
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+    add_entry: Callable[[str, str], MockConfigEntry],
+) -> None:
+    """Test reloading an unchanged catalog touches no entries."""
+    add_entry('usa', 'e2-usa')
+
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+
+        response = await hass.services.async_call(
+            DOMAIN, SERVICE_RELOAD_CODINGS, {}, blocking=True, return_response=True
+        )
+
+    assert response == {'changed_codings': [], 'updated_entries': []}
+
+
+async def test_set_airflow_service_response(
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+    add_entry: Callable[[str, str], MockConfigEntry],
+) -> None:
+    """Test lunos.set_airflow picks the lowest adequate speed and reports it."""
+    entry = add_entry('usa', 'e2-usa')  # 10/15/20 cfm per pair of fans
+    calls = async_mock_service(hass, 'switch', 'turn_on')
+    async_mock_service(hass, 'switch', 'turn_off')
+
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+    entity_id = er.async_get(hass).async_get_entity_id('fan', DOMAIN, entry.unique_id)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_AIRFLOW,
+        {'entity_id': entity_id, 'cfm': 12},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {
+        entity_id: {
+            'speed': 'medium',
+            'cmh': pytest.approx(15 * CFM_TO_CMH),
+            'cfm': 15,
+            'target_met': True,
+        }
+    }
+    assert not calls  # the relays are already in the medium position
+    assert hass.states.get(entity_id).attributes['speed'] == 'medium'
+
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SET_AIRFLOW,
+            {'entity_id': entity_id, 'cfm': 12, 'cmh': 20},
+            blocking=True,
+            return_response=True,
+        )
@@ -0,0 +1,81 @@
+"""Tests for the per-relay latency calibration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.const import SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, ServiceCall
+import pytest
+
+from custom_components.lunos.const import (
+    DELAY_BETWEEN_FLIPS,
+    MINIMUM_DELAY_BETWEEN_STATE_CHANGES,
+    TOGGLE_WINDOW,
+)
+from custom_components.lunos.latency import MIN_FLIP_INTERVAL, RelayLatency
+from custom_components.lunos.relay import RelayWriter
+
+FAST = 'switch.shelly_w1'
+SLOW = 'switch.zigbee_w2'
+
+
+async def test_delays_follow_relay_latency(hass: HomeAssistant) -> None:
+    """Test flip spacing and the edge margin are derived from the percentile latency."""
+    latency = RelayLatency(hass, 'entry')
+    assert latency.flip_interval(FAST, 6) == DELAY_BETWEEN_FLIPS
+    assert latency.edge_margin(FAST) == MINIMUM_DELAY_BETWEEN_STATE_CHANGES - TOGGLE_WINDOW
+
+    for _ in range(10):
+        latency.record(FAST, 0.04)
+        latency.record(SLOW, 0.5)
+    latency.record(SLOW, 2.0)  # a single outlier does not move the 90th percentile
+
+    assert latency.estimate(SLOW) == 0.5
+    assert latency.flip_interval(FAST, 6) == MIN_FLIP_INTERVAL
+    assert latency.flip_interval(SLOW, 2) == 0.5
+    # six flips plus the last flip's latency still fit in the window
+    assert latency.flip_interval(SLOW, 6) == pytest.approx((TOGGLE_WINDOW - 0.5) / 5)
+    assert latency.edge_margin(FAST) == 0.04
+    assert latency.edge_margin(SLOW) == 0.5
+
+
+async def test_high_latency_keeps_minimum_flip_interval(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test a relay slower than the detection window keeps the minimum spacing and warns."""
+    latency = RelayLatency(hass, 'entry')
+    for _ in range(10):
+        latency.record(SLOW, 3.2)
+
+    assert latency.flip_interval(SLOW, 6) == MIN_FLIP_INTERVAL
+    assert 'too high to fit 6 flips' in caplog.text
+
+    # a single flip has no sequence to fit into the window
+    caplog.clear()
+    assert latency.flip_interval(SLOW, 1) == 3.2
+    assert 'too high' not in caplog.text
+
+
+async def test_latency_persisted(hass: HomeAssistant, hass_storage: dict[str, Any]) -> None:
+    """Test measured round trips are stored and restored after a restart."""
+    latency = RelayLatency(hass, 'entry')
+
+    async def turn_on(call: ServiceCall) -> None:
+        hass.loop.call_soon(hass.states.async_set, call.data['entity_id'], STATE_ON)
+
+    hass.services.async_register('switch', SERVICE_TURN_ON, turn_on)
+    hass.states.async_set(FAST, STATE_OFF)
+    writer = RelayWriter(hass, 'test', latency=latency)
+    await writer.async_write('switch', SERVICE_TURN_ON, FAST, STATE_ON)
+
+    measured = latency.estimate(FAST)
+    assert measured is not None
+    assert measured < 1
+
+    await latency._store.async_save(latency._data_to_save())
+    assert hass_storage['lunos.entry.relay_latency']['data'] == {FAST: [measured]}
+
+    restored = RelayLatency(hass, 'entry')
+    await restored.async_load()
+    assert restored.estimate(FAST) == measured
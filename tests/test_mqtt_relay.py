@@ -0,0 +1,73 @@
+"""Tests for the direct MQTT relay transport."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.const import SERVICE_TURN_OFF, SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import async_mock_service
+
+from custom_components.lunos.latency import RelayLatency
+from custom_components.lunos.mqtt_relay import MqttRelayTopics, MqttRelayWriter, parse_state_payload
+from custom_components.lunos.relay import RelayWriteError
+
+from .mqtt_broker import LocalBroker
+
+RELAY = 'switch.lunos_w1'
+TOPICS = MqttRelayTopics('cmnd/lunos/POWER1', 'stat/lunos/POWER1')
+
+
+@pytest.mark.parametrize(
+    ('payload', 'state'),
+    [
+        ('ON', STATE_ON),
+        (b'off', STATE_OFF),
+        ('{"state": "ON", "linkquality": 120}', STATE_ON),
+        ('{"linkquality": 120}', None),
+        ('{not json', None),
+        ('TOGGLE', None),
+    ],
+)
+def test_parse_state_payload(payload: str | bytes, state: str | None) -> None:
+    """Test Tasmota style and Zigbee2MQTT style state payloads."""
+    assert parse_state_payload(payload) == state
+
+
+async def test_write_publishes_and_waits_for_state_topic(hass: HomeAssistant) -> None:
+    """Test a write is published directly and confirmed from the state topic."""
+    broker = LocalBroker(hass)
+    broker.add_relay(TOPICS.command_topic, TOPICS.state_topic)
+    switch_calls = async_mock_service(hass, 'switch', SERVICE_TURN_ON)
+    latency = RelayLatency(hass, 'entry')
+    writer = MqttRelayWriter(hass, 'test', {RELAY: TOPICS}, latency=latency)
+
+    with broker.patch_mqtt():
+        await writer.async_setup()
+        await writer.async_write('switch', SERVICE_TURN_ON, RELAY, STATE_ON)
+        await writer.async_send('switch', SERVICE_TURN_OFF, RELAY)
+        await asyncio.sleep(0.01)  # the relay echoes on the next loop iterations
+
+    assert broker.published[:2] == [(TOPICS.command_topic, 'ON'), (TOPICS.state_topic, 'ON')]
+    assert (TOPICS.command_topic, 'OFF') in broker.published
+    assert writer.states[RELAY] == STATE_OFF
+    assert writer.health[RELAY].writes == 1
+    assert latency.estimate(RELAY) is not None
+    assert not switch_calls  # the switch service layer was bypassed
+
+    writer.async_shutdown()
+
+
+async def test_unconfirmed_mqtt_write_fails(hass: HomeAssistant) -> None:
+    """Test a relay that never reports on its state topic fails the write after retries."""
+    broker = LocalBroker(hass)  # no relay listening on the command topic
+    writer = MqttRelayWriter(hass, 'test', {RELAY: TOPICS})
+    writer.timeout, writer.backoff = 0.02, 0.01
+
+    with broker.patch_mqtt(), pytest.raises(RelayWriteError):
+        await writer.async_setup()
+        await writer.async_write('switch', SERVICE_TURN_ON, RELAY, STATE_ON)
+
+    assert broker.published == [(TOPICS.command_topic, 'ON')] * (writer.retries + 1)
+    assert writer.health[RELAY].failures == 1
@@ -0,0 +1,170 @@
+"""Tests for compiled LUNOS model profiles."""
+
+from __future__ import annotations
+
+from dataclasses import FrozenInstanceError
+import gc
+from typing import Any
+import weakref
+
+from homeassistant.util.percentage import (
+    ordered_list_item_to_percentage,
+    percentage_to_ordered_list_item,
+)
+import pytest
+
+from custom_components.lunos.catalog import load_compiled_codings
+from custom_components.lunos.const import (
+    CFM_TO_CMH,
+    SPEED_HIGH,
+    SPEED_LOW,
+    SPEED_MEDIUM,
+    SPEED_OFF,
+    SPEED_SILENT,
+    SPEED_TURBO,
+)
+from custom_components.lunos.profile import NO_METRICS, compile_profile
+
+
+def test_profile_is_interned(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test profiles with the same coding and fan count share one instance."""
+    first = compile_profile('e2-usa', dict(mock_lunos_codings['e2-usa']), 2)
+    second = compile_profile('e2-usa', dict(mock_lunos_codings['e2-usa']), 2)
+    single_fan = compile_profile('e2-usa', mock_lunos_codings['e2-usa'], 1)
+
+    assert first is second
+    assert first is not single_fan
+
+
+def test_unused_profiles_are_released(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test the intern table does not keep profiles alive after a catalog reload."""
+    edited = dict(mock_lunos_codings['e2-usa'], name='LUNOS e2 (edited)')
+    profile = compile_profile('e2-usa', edited, 2)
+    released = weakref.ref(profile)
+    assert compile_profile('e2-usa', dict(edited), 2) is profile
+
+    del profile
+    gc.collect()
+    assert released() is None
+
+
+def test_profile_is_immutable(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test profiles are frozen and slotted."""
+    profile = compile_profile('e2-usa', mock_lunos_codings['e2-usa'])
+
+    assert not hasattr(profile, '__dict__')
+    with pytest.raises(FrozenInstanceError):
+        profile.fan_count = 4  # type: ignore[misc]
+
+
+def test_cfm_metrics(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test cfm based behavior is converted to cmh and keeps decibels."""
+    profile = compile_profile('e2-usa', mock_lunos_codings['e2-usa'], 2)
+
+    low = profile.metrics_for(SPEED_LOW)
+    assert low.cfm == 10
+    assert low.cmh == pytest.approx(10 * CFM_TO_CMH)
+    assert low.db == 16.5
+
+    off = profile.metrics_for(SPEED_OFF)
+    assert off.watts == 0
+
+
+def test_cmh_metrics_scaled_by_fan_count(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test cmh based behavior is found and scaled by the number of fans."""
+    profile = compile_profile('ego', mock_lunos_codings['ego'], 2)
+
+    medium = profile.metrics_for(SPEED_MEDIUM)
+    assert medium.cmh == 20
+    assert medium.cfm == pytest.approx(20 / CFM_TO_CMH)
+
+    # explicitly specified values in both units are kept as-is
+    low = profile.metrics_for(SPEED_LOW)
+    assert low.cfm == 6
+    assert low.cmh == 10
+
+
+def test_four_speed_lowest_state_is_silent(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test the catalog 'off' behavior maps to silent when OFF is unsupported."""
+    profile = compile_profile('e2-4speed', mock_lunos_codings['e2-4speed'])
+
+    assert profile.fan_speeds == (SPEED_SILENT, SPEED_LOW, SPEED_MEDIUM, SPEED_HIGH)
+    assert profile.metrics_for(SPEED_SILENT).cmh == 15
+    assert profile.metrics_for(SPEED_OFF) is NO_METRICS
+
+
+@pytest.mark.parametrize(
+    ('coding', 'speed', 'metric', 'expected'),
+    [
+        ('e2-short-usa', SPEED_LOW, 'db', 16.5),  # 'db' spelling
+        ('e2-usa', SPEED_HIGH, 'db', 26.0),  # 'decibel' spelling
+        ('e2-60', SPEED_HIGH, 'cmh', 60),  # 'cmg' typo
+        ('e2-nz', SPEED_MEDIUM, 'watts', 2.8),
+    ],
+)
+def test_bundled_catalog_spellings_are_normalized(
+    coding: str, speed: str, metric: str, expected: float
+) -> None:
+    """Test the bundled catalog's alternate key spellings are normalized."""
+    codings = load_compiled_codings()
+    assert codings is not None
+
+    profile = compile_profile(coding, codings[coding])
+    assert getattr(profile.metrics_for(speed), metric) == expected
+
+
+def test_turbo_profile_lookup_tables() -> None:
+    """Test turbo models get a fifth speed and precomputed percentage tables."""
+    codings = load_compiled_codings()
+    assert codings is not None
+
+    profile = compile_profile('ego-4speed', codings['ego-4speed'])
+
+    assert profile.fan_speeds == (SPEED_SILENT, SPEED_LOW, SPEED_MEDIUM, SPEED_HIGH, SPEED_TURBO)
+    assert profile.speed_count == 5
+    assert profile.speed_percentages == {
+        SPEED_SILENT: 20,
+        SPEED_LOW: 40,
+        SPEED_MEDIUM: 60,
+        SPEED_HIGH: 80,
+        SPEED_TURBO: 100,
+    }
+    assert profile.speed_for_percentage(0) == SPEED_SILENT  # no OFF
+    assert profile.speed_for_percentage(61) == SPEED_HIGH
+    assert profile.speed_for_percentage(100) == SPEED_TURBO
+    assert profile.metrics_for(SPEED_TURBO).cmh == 60
+
+    # relays alone decode to HIGH; turbo is a W2 flip on top of it
+    assert profile.relay_states[SPEED_TURBO] == profile.relay_states[SPEED_HIGH]
+    assert profile.relay_speeds[('on', 'on')] == SPEED_HIGH
+
+
+def test_percentage_table_matches_home_assistant(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test the precomputed table agrees with HA's ordered list percentage helpers."""
+    profile = compile_profile('e2-usa', mock_lunos_codings['e2-usa'])
+    speeds = [SPEED_LOW, SPEED_MEDIUM, SPEED_HIGH]
+
+    assert profile.speed_for_percentage(0) == SPEED_OFF
+    for percentage in range(1, 101):
+        expected = percentage_to_ordered_list_item(speeds, percentage)
+        assert profile.speed_for_percentage(percentage) == expected
+    for speed in speeds:
+        assert profile.speed_percentages[speed] == ordered_list_item_to_percentage(speeds, speed)
+
+
+def test_speed_for_airflow(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test airflow targets bisect the fan count scaled airflow table."""
+    one_fan = compile_profile('ego', mock_lunos_codings['ego'], 1)
+    two_fans = compile_profile('ego', mock_lunos_codings['ego'], 2)
+
+    assert one_fan.airflow_cmh == (0, 5, 10, 20)
+    assert two_fans.airflow_cmh == (0, 10, 20, 40)
+    assert two_fans.speed_for_airflow(0) == (SPEED_OFF, True)
+    assert two_fans.speed_for_airflow(10) == (SPEED_LOW, True)
+    assert two_fans.speed_for_airflow(10.5) == (SPEED_MEDIUM, True)
+    assert one_fan.speed_for_airflow(10.5) == (SPEED_HIGH, True)
+    assert two_fans.speed_for_airflow(25) == (SPEED_HIGH, True)
+    assert one_fan.speed_for_airflow(25) == (SPEED_HIGH, False)
+
+    no_airflow = compile_profile('nameless', {'name': 'No behavior'})
+    assert no_airflow.speed_for_airflow(10) is None
@@ -0,0 +1,182 @@
+"""Tests for what LUNOS fans write to the recorder."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import timedelta
+from functools import partial
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.components.recorder import Recorder
+from homeassistant.components.recorder.history import get_significant_states
+from homeassistant.const import EVENT_STATE_CHANGED, SERVICE_TURN_OFF, SERVICE_TURN_ON
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.lunos import helpers
+from custom_components.lunos.const import DOMAIN
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_db_url: str, enable_custom_integrations: None) -> None:
+    """Enable the custom integration (with the recorder database prepared before hass)."""
+
+
+def _register_echoing_relays(hass: HomeAssistant) -> None:
+    """Register switch services whose relays report the new state after the call returned."""
+
+    async def _async_switch(call: ServiceCall) -> None:
+        state = 'on' if call.service == SERVICE_TURN_ON else 'off'
+        hass.loop.call_soon(hass.states.async_set, call.data['entity_id'], state)
+
+    hass.services.async_register('switch', SERVICE_TURN_ON, _async_switch)
+    hass.services.async_register('switch', SERVICE_TURN_OFF, _async_switch)
+
+
+async def test_pair_transition_records_one_state(
+    recorder_mock: Recorder,
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+    add_entry: Callable[[str, str], MockConfigEntry],
+) -> None:
+    """Test a speed change moving both relays is one fan state change and one recorder row."""
+    entry = add_entry('usa', 'e2-usa')  # medium: W1 off, W2 on
+    _register_echoing_relays(hass)
+
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+    entity_id = er.async_get(hass).async_get_entity_id('fan', DOMAIN, entry.unique_id)
+    await async_wait_recording_done(hass)
+
+    start = dt_util.utcnow()
+    fan_changes = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    # medium -> low writes W1 on, then W2 off
+    await hass.services.async_call(
+        'fan', 'set_percentage', {'entity_id': entity_id, 'percentage': 33}, blocking=True
+    )
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await async_wait_recording_done(hass)
+
+    assert hass.states.get('switch.usa_w1').state == 'on'
+    assert hass.states.get('switch.usa_w2').state == 'off'
+    assert [
+        event.data['new_state'].attributes['speed']
+        for event in fan_changes
+        if event.data['entity_id'] == entity_id
+    ] == ['low']
+
+    history = await recorder_mock.async_add_executor_job(
+        partial(
+            get_significant_states,
+            hass,
+            start,
+            entity_ids=[entity_id],
+            include_start_time_state=False,
+            significant_changes_only=False,
+        )
+    )
+    assert [state.attributes['speed'] for state in history[entity_id]] == ['low']
+
+
+async def test_external_pair_transition_records_one_state(
+    recorder_mock: Recorder,
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+    add_entry: Callable[[str, str], MockConfigEntry],
+) -> None:
+    """Test relays switched outside the integration are recorded once both relays moved."""
+    entry = add_entry('usa', 'e2-usa')  # medium: W1 off, W2 on
+
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+    entity_id = er.async_get(hass).async_get_entity_id('fan', DOMAIN, entry.unique_id)
+    await async_wait_recording_done(hass)
+    start = dt_util.utcnow()
+
+    # medium -> low by another automation: the fan waits for W2 instead of showing high
+    hass.states.async_set('switch.usa_w1', 'on')
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).attributes['speed'] == 'medium'
+    hass.states.async_set('switch.usa_w2', 'off')
+    await async_wait_recording_done(hass)
+    assert hass.states.get(entity_id).attributes['speed'] == 'low'
+
+    # a single relay change is committed when the pair window ends
+    hass.states.async_set('switch.usa_w1', 'off')
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).attributes['speed'] == 'low'
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await async_wait_recording_done(hass)
+
+    history = await recorder_mock.async_add_executor_job(
+        partial(
+            get_significant_states,
+            hass,
+            start,
+            entity_ids=[entity_id],
+            include_start_time_state=False,
+            significant_changes_only=False,
+        )
+    )
+    assert [state.attributes['speed'] for state in history[entity_id]] == ['low', 'off']
+
+
+async def test_static_attributes_not_recorded(
+    recorder_mock: Recorder,
+    hass: HomeAssistant,
+    mock_lunos_codings: dict[str, Any],
+    add_entry: Callable[[str, str], MockConfigEntry],
+) -> None:
+    """Test only the runtime attributes are recorded with each speed change."""
+    entry = add_entry('usa', 'e2-usa')
+    _register_echoing_relays(hass)
+
+    with patch.object(helpers, 'load_lunos_codings', return_value=mock_lunos_codings):
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+    entity_id = er.async_get(hass).async_get_entity_id('fan', DOMAIN, entry.unique_id)
+    await async_wait_recording_done(hass)
+    start = dt_util.utcnow()
+
+    await hass.services.async_call(
+        'fan', 'set_percentage', {'entity_id': entity_id, 'percentage': 33}, blocking=True
+    )
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await async_wait_recording_done(hass)
+
+    history = await recorder_mock.async_add_executor_job(
+        partial(
+            get_significant_states,
+            hass,
+            start,
+            entity_ids=[entity_id],
+            include_start_time_state=False,
+            significant_changes_only=False,
+        )
+    )
+    (recorded,) = history[entity_id]
+    attributes = hass.states.get(entity_id).attributes
+
+    # the static attributes stay on the entity state, but not in the recorder
+    static = {'model', 'controller_coding', 'relay_w1', 'relay_w2', 'fan_speeds', 'vent_modes'}
+    assert static <= attributes.keys()
+    assert not static & recorded.attributes.keys()
+    for attribute in ('speed', 'cfm', 'cmh', 'dB', 'watts', 'vent_mode'):
+        assert recorded.attributes[attribute] == attributes[attribute]
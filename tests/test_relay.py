@@ -0,0 +1,63 @@
+"""Tests for confirmed (closed-loop) LUNOS relay writes."""
+
+from __future__ import annotations
+
+from homeassistant.const import SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import issue_registry as ir
+import pytest
+
+from custom_components.lunos.const import DOMAIN
+from custom_components.lunos.relay import RelayWriteError, RelayWriter
+
+RELAY = 'switch.lunos_w1'
+
+
+def _register_relay(hass: HomeAssistant, drop: int) -> list[ServiceCall]:
+    """Register a turn_on service for RELAY that ignores the first `drop` calls."""
+    calls: list[ServiceCall] = []
+
+    async def turn_on(call: ServiceCall) -> None:
+        calls.append(call)
+        if len(calls) > drop:
+            hass.loop.call_soon(hass.states.async_set, RELAY, STATE_ON)
+
+    hass.services.async_register('switch', SERVICE_TURN_ON, turn_on)
+    hass.states.async_set(RELAY, STATE_OFF)
+    return calls
+
+
+async def test_write_waits_for_echo_and_retries(hass: HomeAssistant) -> None:
+    """Test a dropped write is re-sent until the relay reports the new state."""
+    calls = _register_relay(hass, drop=1)
+    writer = RelayWriter(hass, 'test', timeout=0.05, retries=2, backoff=0.01)
+
+    await writer.async_write('switch', SERVICE_TURN_ON, RELAY, STATE_ON)
+
+    assert len(calls) == 2
+    assert hass.states.get(RELAY).state == STATE_ON
+    assert writer.attributes[RELAY] == {
+        'writes': 1,
+        'retries': 1,
+        'failures': 0,
+        'last_error': None,
+    }
+
+
+async def test_unresponsive_relay_raises_repair_issue(hass: HomeAssistant) -> None:
+    """Test a relay that never confirms fails the write and raises a repair issue."""
+    calls = _register_relay(hass, drop=3)
+    writer = RelayWriter(hass, 'test', timeout=0.05, retries=2, backoff=0.01)
+    issues = ir.async_get(hass)
+
+    with pytest.raises(RelayWriteError):
+        await writer.async_write('switch', SERVICE_TURN_ON, RELAY, STATE_ON)
+
+    assert len(calls) == 3
+    assert writer.health[RELAY].failures == 1
+    assert issues.async_get_issue(DOMAIN, f'relay_unresponsive_{RELAY}') is not None
+
+    # the next confirmed write clears the issue
+    await writer.async_write('switch', SERVICE_TURN_ON, RELAY, STATE_ON)
+    assert writer.health[RELAY].last_error is None
+    assert issues.async_get_issue(DOMAIN, f'relay_unresponsive_{RELAY}') is None
@@ -0,0 +1,45 @@
+"""Tests for the deadline scheduled LUNOS relay flip sequencer."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.lunos.sequencer import ToggleSequenceAborted, ToggleSequencer
+
+
+async def test_flips_sent_at_planned_offsets(hass: HomeAssistant) -> None:
+    """Test flips are sent at fixed offsets from the start, not after each flip's latency."""
+    sequencer = ToggleSequencer(hass, 'test', interval=0.02, window=1.0)
+    sent: list[float] = []
+
+    async def slow_flip() -> None:
+        sent.append(hass.loop.time())
+        await asyncio.sleep(0.01)  # service call latency must not push out the next flip
+
+    report = await sequencer.async_run('toggle', [slow_flip] * 4)
+
+    assert [timing.planned for timing in report.timings] == pytest.approx([0, 0.02, 0.04, 0.06])
+    assert sent[-1] - sent[0] == pytest.approx(0.06, abs=0.015)
+    assert not report.aborted
+    assert sequencer.attributes['sent'] == 4
+    assert len(sequencer.attributes['jitter_ms']) == 4
+
+
+async def test_sequence_aborts_outside_window(hass: HomeAssistant) -> None:
+    """Test a sequence stops before a flip that would end it outside the window."""
+    sequencer = ToggleSequencer(hass, 'test', interval=0.01, window=0.06)
+    sent: list[int] = []
+
+    async def stalled_flip() -> None:
+        sent.append(len(sent))
+        await asyncio.sleep(0.05)  # e.g. an overloaded event loop
+
+    with pytest.raises(ToggleSequenceAborted):
+        await sequencer.async_run('toggle', [stalled_flip] * 6)
+
+    assert sent == [0]
+    assert sequencer.last.aborted
+    assert sequencer.attributes['sent'] == 1
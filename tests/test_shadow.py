@@ -0,0 +1,131 @@
+"""Tests for the shadow model of the LUNOS controller's relay input decoder."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.lunos.shadow import (
+    MODE_FILTER_RESET,
+    MODE_SUMMER_VENT_OFF,
+    MODE_TURBO,
+    ControllerShadow,
+)
+from custom_components.lunos.transition import W1, W2
+
+
+def test_isolated_changes_need_no_delay() -> None:
+    """Test relays that were quiet for a full window are written at once."""
+    shadow = ControllerShadow(window=3.0)
+    assert shadow.delay_before({W1: 1.0, W2: 1.0}, now=0.0) == 0
+
+    shadow.observe_edge(W1, now=10.0)
+    assert shadow.delay_before({W1: 0.5}, now=15.0) == 0
+    assert shadow.delay_before({W2: 0.5}, now=10.5) == 0  # the other relay is not delayed
+
+
+def test_speed_changes_are_not_a_filter_reset() -> None:
+    """Test W1 edges short of a mode sequence are neither delayed nor decoded."""
+    shadow = ControllerShadow(window=3.0)
+    for index in range(4):
+        shadow.observe_edge(W1, now=10.0 + index * 0.5)
+    assert shadow.toggles(W1, now=11.6) == 4
+    assert shadow.pending_mode(now=11.6) is None
+    assert shadow.delay_before({W1: 0.5}, now=11.6) == 0
+
+    # a fifth edge would leave the sixth one completing the sequence: wait for the oldest
+    shadow.observe_edge(W1, now=12.0)
+    assert shadow.delay_before({W1: 0.5}, now=12.0) == pytest.approx(1.5)
+    assert shadow.delay_before({W2: 0.5}, now=12.0) == 0  # the other relay is not delayed
+
+
+def test_edges_expire_one_by_one() -> None:
+    """Test each edge leaves the window on its own timestamp."""
+    shadow = ControllerShadow(window=3.0)
+    shadow.observe_edge(W2, now=10.0)
+    shadow.observe_edge(W2, now=12.0)
+    assert shadow.toggles(W2, now=13.5) == 1
+    assert shadow.toggles(W2, now=15.5) == 0
+
+
+def test_filter_reset_sequence() -> None:
+    """Test six W1 edges inside one window decode as a filter reset."""
+    shadow = ControllerShadow(window=3.0)
+    for index in range(6):
+        shadow.observe_edge(W1, now=index * 0.1)
+    assert shadow.pending_mode(now=1.0) == MODE_FILTER_RESET
+    assert shadow.toggles(W1, now=4.0) == 0
+    assert not shadow.summer_vent
+
+
+def test_flip_sequence_waits_for_an_empty_window() -> None:
+    """Test a deliberate flip sequence waits until no edge of its relay is left in the window."""
+    shadow = ControllerShadow(window=3.0)
+    shadow.observe_edge(W2, now=10.0)
+    shadow.observe_edge(W2, now=11.0)
+    assert shadow.delay_before({W2: 0.5}, now=11.0) == 0
+    assert shadow.delay_before({W2: 0.5}, now=11.0, sequence=True) == pytest.approx(3.5)
+
+
+def test_w2_flip_delays_in_summer_vent_and_turbo() -> None:
+    """Test a W2 edge waits when a second one would read as summer vent off or turbo."""
+    shadow = ControllerShadow(window=3.0, turbo=True)
+    shadow.observe_edge(W2, now=10.0)
+    assert shadow.delay_before({W2: 0.5}, now=10.5) == pytest.approx(3.0)
+    assert shadow.pending_mode(now=10.5) is None
+
+    shadow = ControllerShadow(window=3.0)
+    shadow.summer_vent = True
+    shadow.observe_edge(W2, now=10.0)
+    assert shadow.delay_before({W2: 0.5}, now=10.5) == pytest.approx(3.0)
+    assert shadow.delay_before({W1: 0.5}, now=10.5) == 0
+
+
+def test_commands_count_until_echoed() -> None:
+    """Test a command counts as an edge once, whether or not its echo arrives."""
+    shadow = ControllerShadow(window=3.0)
+    shadow.observe_command(W1, now=10.0)
+    assert shadow.toggles(W1, now=10.1) == 1
+    shadow.observe_edge(W1, now=10.2)  # the echo
+    assert shadow.toggles(W1, now=10.3) == 1
+
+    # an echo that never arrived does not swallow a later edge
+    shadow.observe_command(W2, now=10.0)
+    shadow.observe_edge(W2, now=14.0)
+    assert shadow.toggles(W2, now=14.1) == 1
+
+
+def test_device_sequence_holds_its_relay() -> None:
+    """Test a flip sequence run by the relay device delays its relay until the window closes."""
+    shadow = ControllerShadow(window=3.0)
+    shadow.observe_device_sequence(W1, until=12.0)
+    assert shadow.delay_before({W1: 0.5}, now=10.0) == pytest.approx(5.5)
+    assert shadow.delay_before({W2: 0.5}, now=10.0) == 0
+    assert shadow.delay_before({W1: 0.5}, now=15.5) == 0
+
+
+def test_summer_vent_state_follows_toggle_sequences() -> None:
+    """Test a W2 sequence turns summer ventilation on and a W2 off/on turns it off."""
+    shadow = ControllerShadow(window=3.0, turbo=True)
+    for index in range(6):
+        shadow.observe_edge(W2, now=index * 0.1)
+    assert not shadow.summer_vent
+    assert shadow.toggles(W2, now=1.0) == 6
+
+    # once the detection window closed the controller acted on the sequence
+    assert shadow.pending_mode(now=4.0) is None
+    assert shadow.summer_vent
+
+    shadow.observe_edge(W2, now=10.0)
+    shadow.observe_edge(W2, now=10.1)
+    assert shadow.pending_mode(now=10.2) == MODE_SUMMER_VENT_OFF
+    assert shadow.toggles(W2, now=14.0) == 0
+    assert not shadow.summer_vent
+
+    # outside summer ventilation a W2 off/on is read as turbo on turbo capable codings
+    shadow.observe_edge(W2, now=20.0)
+    shadow.observe_edge(W2, now=20.1)
+    assert shadow.pending_mode(now=20.2) == MODE_TURBO
+    assert shadow.attributes['summer_vent'] is False
+
+    shadow.turbo = False
+    assert shadow.pending_mode(now=20.2) is None
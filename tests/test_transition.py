@@ -0,0 +1,115 @@
+"""Tests for LUNOS relay transition planning."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE, STATE_UNKNOWN
+
+from custom_components.lunos.const import (
+    SPEED_HIGH,
+    SPEED_LOW,
+    SPEED_MEDIUM,
+    SPEED_OFF,
+    SPEED_SILENT,
+    SPEED_TURBO,
+)
+from custom_components.lunos.profile import compile_profile
+from custom_components.lunos.transition import (
+    SLOT_UNAVAILABLE,
+    SLOT_UNKNOWN,
+    W1,
+    W2,
+    RelayWrite,
+    relay_slot,
+)
+
+OFF = (STATE_OFF, STATE_OFF)
+LOW = (STATE_ON, STATE_OFF)
+MEDIUM = (STATE_OFF, STATE_ON)
+HIGH = (STATE_ON, STATE_ON)
+
+
+def test_only_changed_relays_are_written(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test relays already in their target state are not written."""
+    profile = compile_profile('e2-usa', mock_lunos_codings['e2-usa'])
+
+    assert profile.plan_transition(MEDIUM, SPEED_MEDIUM).writes == ()
+    assert profile.plan_transition(MEDIUM, SPEED_HIGH).writes == (RelayWrite(W1, STATE_ON),)
+    assert profile.plan_transition(LOW, SPEED_OFF).writes == (RelayWrite(W1, STATE_OFF),)
+
+    turbo = compile_profile(
+        'ra-15-60', mock_lunos_codings['e2-usa'] | {'supports_turbo_mode': True}
+    )
+    assert turbo.plan_transition(HIGH, SPEED_TURBO).writes == ()  # only the W2 flip remains
+
+
+def test_swaps_avoid_transient_off(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test low <-> medium passes through high rather than briefly stopping the fans."""
+    profile = compile_profile('e2-usa', mock_lunos_codings['e2-usa'])
+
+    up = profile.plan_transition(LOW, SPEED_MEDIUM)
+    assert up.writes == (RelayWrite(W2, STATE_ON), RelayWrite(W1, STATE_OFF))
+    assert up.transient == SPEED_HIGH
+
+    down = profile.plan_transition(MEDIUM, SPEED_LOW)
+    assert down.writes == (RelayWrite(W1, STATE_ON), RelayWrite(W2, STATE_OFF))
+    assert down.transient == SPEED_HIGH
+
+
+def test_transient_stays_between_speeds(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test every two-relay transition passes through a speed within or next to its range."""
+    profile = compile_profile('e2-usa', mock_lunos_codings['e2-usa'])
+    rank = {speed: index for index, speed in enumerate(profile.fan_speeds)}
+
+    for (current, target), plan in profile.transitions.items():
+        assert len(plan.writes) == sum(a != b for a, b in zip(current, target, strict=True))
+        if plan.transient is None:
+            continue
+        low, high = sorted(
+            (rank[profile.relay_speeds[current]], rank[profile.relay_speeds[target]])
+        )
+        assert low - 1 <= rank[plan.transient] <= high + 1
+        if high - low > 1:
+            assert low < rank[plan.transient] < high
+
+    assert profile.plan_transition(OFF, SPEED_HIGH).transient in (SPEED_LOW, SPEED_MEDIUM)
+
+
+def test_four_speed_models_avoid_transient_silent(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test the lowest speed is also avoided when it is SILENT rather than OFF."""
+    profile = compile_profile('e2-4speed', mock_lunos_codings['e2-usa'] | {'supports_off': False})
+
+    assert profile.fan_speeds[0] == SPEED_SILENT
+    assert profile.plan_transition(LOW, SPEED_MEDIUM).transient == SPEED_HIGH
+
+
+def test_unknown_relay_states_write_both(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test both relays are written when the current state cannot be trusted."""
+    profile = compile_profile('e2-usa', mock_lunos_codings['e2-usa'])
+    both = (RelayWrite(W1, STATE_OFF), RelayWrite(W2, STATE_ON))
+
+    assert profile.plan_transition(None, SPEED_MEDIUM).writes == both
+    assert profile.plan_transition((STATE_UNAVAILABLE, STATE_ON), SPEED_MEDIUM).writes == both
+
+
+def test_relay_slots() -> None:
+    """Test W1/W2 decode to a 2-bit slot, with sentinel slots for other states."""
+    assert [relay_slot(*states) for states in (OFF, LOW, MEDIUM, HIGH)] == [0, 1, 2, 3]
+    assert relay_slot(STATE_ON, STATE_UNKNOWN) == SLOT_UNKNOWN
+    assert relay_slot(None, STATE_OFF) == SLOT_UNKNOWN
+    assert relay_slot(STATE_UNAVAILABLE, STATE_UNKNOWN) == SLOT_UNAVAILABLE
+    assert relay_slot(STATE_OFF, STATE_UNAVAILABLE) == SLOT_UNAVAILABLE
+
+
+def test_speed_for_relays(mock_lunos_codings: dict[str, Any]) -> None:
+    """Test every W1/W2 pair decodes to its speed and the sentinel slots to None."""
+    profile = compile_profile('e2-usa', mock_lunos_codings['e2-usa'])
+    assert profile.speed_table == (SPEED_OFF, SPEED_LOW, SPEED_MEDIUM, SPEED_HIGH, None, None)
+    for states, speed in profile.relay_speeds.items():
+        assert profile.speed_for_relays(*states) == speed
+    assert profile.speed_for_relays(STATE_UNAVAILABLE, STATE_ON) is None
+    assert profile.speed_for_relays(STATE_ON, None) is None
+
+    four_speed = compile_profile('e2-4speed', mock_lunos_codings['e2-4speed'])
+    assert four_speed.speed_for_relays(*OFF) == SPEED_SILENT